@@ -1,15 +1,33 @@
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, Response, g, render_template, request, jsonify, send_file
 import os
 import json
-from werkzeug.utils import secure_filename
 import sqlite3
 from datetime import datetime
 import pandas as pd
 import io
+import time
 
+from utils import metrics
+from utils.profiling import MODES as PROFILE_MODES, RequestProfiler
 from utils.resume_parser import ResumeParser
+from utils.extraction import ParseBudget
 from utils.skill_extractor import SkillExtractor
 from utils.matcher import JobMatcher
+from utils.scoring import ScoringPipeline
+from utils.engine import MatchEngine
+from utils.feature_store import FeatureStore
+from utils.candidate_cache import CandidateCache, init_pool_version
+from utils.search import SearchQueryError, init_search_index, search_candidate_ids, search_candidates
+from utils.filters import CandidateFilters, FilterError, filter_candidate_ids, init_filter_indexes
+from utils.job_index import JobIndex, init_job_version
+from utils.batch import BackgroundBatch, BatchError
+from utils.uploads import UploadRejected, receive_upload
+from utils.job_import import JobImportError, import_jobs, read_job_rows
+from utils.reprocess import BackgroundReprocessor, Reprocessor, init_reprocess_schema
+from utils.singleflight import FlightGroup, init_flight_schema
+from utils.conditional import init_match_version, make_etag, read_versions
+from utils.semantic import (DEFAULT_FEATURES as SEMANTIC_DEFAULT_FEATURES, build_semantic, init_semantic_schema,
+                            read_df_version, rebuild_document_frequencies)
 
 # ------------------------
 # Flask App Setup
@@ -18,26 +36,183 @@ app = Flask(__name__, template_folder="templates", static_folder="static")
 app.config['SECRET_KEY'] = 'your-secret-key-here'
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+app.config['DATABASE'] = os.path.join('database', 'candidates.db')
+app.config['FEATURE_STORE'] = os.path.join('database', 'features')
+# Worker processes used to score candidates; 1 keeps matching in the request thread
+app.config['MATCH_WORKERS'] = int(os.environ.get('MATCH_WORKERS', 1))
+# Most full-text hits passed on to scoring when /match_candidates gets a query
+app.config['MATCH_SEARCH_LIMIT'] = 1000
+# Budgets for extracting resume text; over-budget documents come back truncated
+app.config['PARSE_MAX_PAGES'] = 30
+app.config['PARSE_MAX_CHARS'] = 100000
+app.config['PARSE_TIMEOUT'] = 15.0
+app.config['PARSE_MAX_MEMORY_MB'] = 512
+# Most job descriptions accepted by one bulk import
+app.config['JOB_IMPORT_MAX_ROWS'] = 10000
+# Stage timers feeding /metrics; counters and gauges are read at scrape time either way
+app.config['METRICS_ENABLED'] = os.environ.get('METRICS_ENABLED', '1') != '0'
+# Per-request stage breakdown in a Server-Timing response header
+app.config['SERVER_TIMING'] = True
+# Single requests are profiled when sent with 'X-Profile: pstats|speedscope' and this token
+# in X-Profile-Token; PROFILE_REQUESTS set to a mode profiles every request instead
+app.config['PROFILE_TOKEN'] = os.environ.get('PROFILE_TOKEN')
+app.config['PROFILE_REQUESTS'] = os.environ.get('PROFILE_REQUESTS')
+app.config['PROFILE_DIR'] = 'profiles'
+# Semantic score: 'tfidf' fits TF-IDF per resume/job pair; 'hashing' uses fixed-size hashed
+# vectors with document frequencies kept in the database (switching re-scores via /reprocess)
+app.config['SEMANTIC_ENGINE'] = os.environ.get('SEMANTIC_ENGINE', 'tfidf')
+app.config['SEMANTIC_HASH_FEATURES'] = int(os.environ.get('SEMANTIC_HASH_FEATURES', SEMANTIC_DEFAULT_FEATURES))
+# Identical /match_candidates requests arriving together share one scoring run: threads wait in
+# process, workers on a lease row; a dead leader's lease expires after MATCH_FLIGHT_LEASE seconds
+app.config['MATCH_FLIGHT_LEASE'] = 60.0
+app.config['MATCH_FLIGHT_RESULT_TTL'] = 5.0
+# Match, dashboard and export responses carry ETags built from version stamps; 'no-cache' lets
+# browsers and proxies keep them but revalidate ('private, no-cache' keeps shared caches out)
+app.config['HTTP_CACHE_CONTROL'] = 'no-cache'
 
 # Allowed file extensions
 ALLOWED_EXTENSIONS = {'pdf', 'docx'}
 
 # Initialize components
-resume_parser = ResumeParser()
+resume_parser = ResumeParser(budget=ParseBudget(
+    max_pages=app.config['PARSE_MAX_PAGES'],
+    max_chars=app.config['PARSE_MAX_CHARS'],
+    timeout=app.config['PARSE_TIMEOUT'],
+    max_memory_mb=app.config['PARSE_MAX_MEMORY_MB']
+))
 skill_extractor = SkillExtractor()
-job_matcher = JobMatcher()
+job_matcher = JobMatcher(semantic=build_semantic(app.config['SEMANTIC_ENGINE'], app.config['DATABASE'],
+                                                 app.config['SEMANTIC_HASH_FEATURES']))
+# Scores a job against all cached candidates at once with array operations
+scoring_pipeline = ScoringPipeline(job_matcher)
+feature_store = FeatureStore(app.config['FEATURE_STORE'])
+candidate_cache = CandidateCache(app.config['DATABASE'], job_matcher, pipeline=scoring_pipeline)
+job_index = JobIndex(app.config['DATABASE'], job_matcher)
+# Re-extracts skills and re-scores matches after the taxonomy or scorer changes
+reprocessor = BackgroundReprocessor(Reprocessor(app.config['DATABASE'], skill_extractor, job_matcher,
+                                                parser=resume_parser))
+# Scores every candidate against every job into matches, in the background
+batch_matcher = BackgroundBatch(app.config['DATABASE'], job_matcher)
+match_flights = FlightGroup(app.config['DATABASE'], lease_seconds=app.config['MATCH_FLIGHT_LEASE'],
+                            result_ttl=app.config['MATCH_FLIGHT_RESULT_TTL'])
+match_engine = None
+
+metrics.enable(app.config['METRICS_ENABLED'])
+metrics.REGISTRY.gauge('resume_screener_candidate_pool_size', 'Candidates in the in-process cache',
+                       lambda: len(candidate_cache.records_list))
+metrics.REGISTRY.gauge('resume_screener_job_index_size', 'Jobs in the job index', lambda: len(job_index.jobs))
+metrics.REGISTRY.gauge('resume_screener_job_index_terms', 'Distinct terms in the job index',
+                       lambda: len(job_index.term_ids))
+metrics.REGISTRY.counter('resume_screener_cache_requests_total', 'Cache freshness checks by result',
+                         lambda: [(('candidates', 'hit'), candidate_cache.hits),
+                                  (('candidates', 'miss'), candidate_cache.misses),
+                                  (('jobs', 'hit'), job_index.hits),
+                                  (('jobs', 'miss'), job_index.misses)],
+                         labels=['cache', 'result'])
+metrics.REGISTRY.counter('resume_screener_candidates_scored_total', 'Candidate-job pairs fully scored',
+                         lambda: job_matcher.scored_total)
+metrics.REGISTRY.counter('resume_screener_candidates_pruned_total', 'Candidates skipped by score-bound pruning',
+                         lambda: job_matcher.pruned_total)
+metrics.REGISTRY.counter('resume_screener_match_coalesced_total',
+                         'Match requests answered with a concurrent identical request\'s result',
+                         lambda: match_flights.coalesced_total)
 
 
 # ------------------------
 # Helper Functions
 # ------------------------
-def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+def get_match_engine():
+    """Create the sharded matching engine on first use"""
+    global match_engine
+    if match_engine is None:
+        match_engine = MatchEngine(app.config['DATABASE'], store=feature_store,
+                                   workers=app.config['MATCH_WORKERS'], matcher=job_matcher)
+    return match_engine
+
+
+def requested_profile_mode():
+    """Profiling mode asked for by this request, if it is allowed to ask"""
+    if app.config['PROFILE_REQUESTS'] in PROFILE_MODES:
+        return app.config['PROFILE_REQUESTS']
+    mode = request.headers.get('X-Profile')
+    token = app.config['PROFILE_TOKEN']
+    if mode in PROFILE_MODES and token and request.headers.get('X-Profile-Token') == token:
+        return mode
+    return None
+
+
+def template_stamp(name: str) -> int:
+    """Modification time of a template, so a redeploy changes the page's ETag"""
+    try:
+        return int(os.path.getmtime(os.path.join(app.root_path, app.template_folder, name)))
+    except OSError:
+        return 0
+
+
+def with_etag(response, etag: str):
+    """Attach a strong ETag and the cache policy to a response"""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = app.config['HTTP_CACHE_CONTROL']
+    return response
+
+
+def not_modified(etag: str):
+    """A 304 response if the client already holds this ETag, else None"""
+    if request.if_none_match.contains_weak(etag):
+        return with_etag(app.response_class(status=304), etag)
+    return None
+
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    if app.config['SERVER_TIMING']:
+        g.stage_token = metrics.collect_stages()
+
+    mode = requested_profile_mode()
+    if mode is not None:
+        profiler = RequestProfiler(mode)
+        if profiler.start():
+            g.profiler = profiler
+
+
+@app.after_request
+def record_request_time(response):
+    started = g.get('request_started')
+    if started is None:
+        return response
+    elapsed = time.perf_counter() - started
+
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.stop()
+        try:
+            path = profiler.save(app.config['PROFILE_DIR'], request.endpoint or 'unmatched')
+            response.headers['X-Profile-File'] = os.path.basename(path)
+        except OSError as e:
+            print(f"Profile save error: {e}")
+
+    if metrics.enabled():
+        metrics.REQUEST_SECONDS.observe(elapsed, request.endpoint or 'unmatched', str(response.status_code))
+    if 'stage_token' in g:
+        response.headers['Server-Timing'] = metrics.server_timing(elapsed)
+    return response
+
+
+@app.teardown_request
+def stop_request_timer(exc):
+    # Also runs when a request fails before after_request handlers
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.stop()
+    token = g.pop('stage_token', None)
+    if token is not None:
+        metrics.stop_collecting(token)
 
 
 def init_db():
     """Initialize SQLite database"""
-    conn = sqlite3.connect('database/candidates.db')
+    conn = sqlite3.connect(app.config['DATABASE'])
     cursor = conn.cursor()
 
     cursor.execute('''
@@ -52,10 +227,28 @@ def init_db():
             education TEXT,
             resume_path TEXT,
             uploaded_at TIMESTAMP,
-            raw_text TEXT
+            raw_text TEXT,
+            content_hash TEXT
         )
     ''')
 
+    # Databases created before uploads were hashed lack the column
+    cursor.execute('PRAGMA table_info(candidates)')
+    if 'content_hash' not in [column[1] for column in cursor.fetchall()]:
+        cursor.execute('ALTER TABLE candidates ADD COLUMN content_hash TEXT')
+
+    # One candidate per file: the unique index turns a concurrent second upload into a duplicate
+    cursor.execute('PRAGMA index_list(candidates)')
+    if not {index[1]: index[2] for index in cursor.fetchall()}.get('idx_candidates_content_hash'):
+        cursor.execute('DROP INDEX IF EXISTS idx_candidates_content_hash')
+        # Older databases may hold the same file twice; later copies keep their rows but lose the hash
+        cursor.execute('''
+            UPDATE candidates SET content_hash = NULL
+            WHERE content_hash IS NOT NULL
+              AND id NOT IN (SELECT MIN(id) FROM candidates WHERE content_hash IS NOT NULL GROUP BY content_hash)
+        ''')
+        cursor.execute('CREATE UNIQUE INDEX idx_candidates_content_hash ON candidates (content_hash)')
+
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS job_descriptions (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -87,7 +280,33 @@ def init_db():
         )
     ''')
 
+    # Change counter used to invalidate per-process candidate caches
+    init_pool_version(cursor)
+    init_job_version(cursor)
+    init_match_version(cursor)
+
+    # Full-text index over resume text and extracted skills
+    init_search_index(cursor)
+
+    # Indexes behind the candidate filters of matching and search
+    init_filter_indexes(cursor)
+
+    # Version stamps on derived data and progress of reprocessing runs
+    init_reprocess_schema(cursor)
+
+    # Document frequencies of the hashing semantic engine
+    init_semantic_schema(cursor)
+
+    # Leases coalescing identical match requests across workers
+    init_flight_schema(cursor)
+
     conn.commit()
+
+    # Candidates stored before the hashing engine was enabled were never counted
+    if job_matcher.semantic is not None:
+        candidates = cursor.execute('SELECT COUNT(*) FROM candidates').fetchone()[0]
+        if read_df_version(cursor)[0] != candidates:
+            rebuild_document_frequencies(app.config['DATABASE'], job_matcher)
     conn.close()
 
 
@@ -99,46 +318,77 @@ def index():
     return render_template('index.html')
 
 
-@app.route('/upload_resume', methods=['POST'])
-def upload_resume():
-    if 'resume' not in request.files:
-        return jsonify({'error': 'No file uploaded'}), 400
+def duplicate_response(upload, candidate_id, parsed_data=None):
+    """Response naming the candidate already created from this file, or None if it is gone
+
+    The new copy of the file is only discarded when the response is returned;
+    ``parsed_data`` stands in for a record the cache does not hold yet.
+    """
+    record = candidate_cache.get_many([candidate_id]).get(candidate_id)
+    if record is not None:
+        parsed = {
+            'contact_info': {'email': record.email, 'phone': record.phone, 'location': record.location},
+            'experience_years': record.experience_years,
+            'skills': record.skills,
+            'education': record.education
+        }
+    elif parsed_data is not None:
+        parsed = {key: parsed_data[key] for key in ('contact_info', 'experience_years', 'skills', 'education')}
+    else:
+        return None
 
-    file = request.files['resume']
-    if file.filename == '':
-        return jsonify({'error': 'No file selected'}), 400
+    upload.discard()
+    return jsonify({
+        'success': True,
+        'candidate_id': candidate_id,
+        'duplicate': True,
+        'parsed_data': parsed
+    })
 
-    if file and allowed_file(file.filename):
-        filename = secure_filename(file.filename)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_')
-        filename = timestamp + filename
 
-        # Ensure upload directory exists
-        resume_dir = os.path.join(app.config['UPLOAD_FOLDER'], 'resumes')
-        os.makedirs(resume_dir, exist_ok=True)
+@app.route('/upload_resume', methods=['POST'])
+def upload_resume():
+    # Stream the body to disk in chunks; type is sniffed from the content, not the extension
+    resume_dir = os.path.join(app.config['UPLOAD_FOLDER'], 'resumes')
+    try:
+        with metrics.timer('file_save'):
+            upload = receive_upload(request.stream, request.mimetype_params.get('boundary'), resume_dir,
+                                    allowed_types=ALLOWED_EXTENSIONS, max_bytes=app.config['MAX_CONTENT_LENGTH'])
+    except UploadRejected as e:
+        return jsonify({'error': str(e)}), 400
 
-        file_path = os.path.join(resume_dir, filename)
-        file.save(file_path)
+    file_path = upload.path
 
-        try:
-            # Parse resume
-            file_extension = filename.rsplit('.', 1)[1].lower()
-            parsed_data = resume_parser.parse_resume(file_path, file_extension)
+    # The same file uploaded again maps to the candidate created the first time
+    conn = sqlite3.connect(app.config['DATABASE'])
+    existing = conn.execute('SELECT id FROM candidates WHERE content_hash = ?', (upload.content_hash,)).fetchone()
+    conn.close()
+    if existing:
+        response = duplicate_response(upload, existing[0])
+        if response is not None:
+            return response
 
-            # Extract skills
-            skills = skill_extractor.extract_all_skills(parsed_data['raw_text'])
-            parsed_data['skills'] = skills
+    try:
+        # Parse resume
+        parsed_data = resume_parser.parse_resume(file_path, upload.file_type)
+
+        # Extract skills
+        skills = skill_extractor.extract_all_skills(parsed_data['raw_text'])
+        parsed_data['skills'] = skills
+        profile = job_matcher.build_candidate_profile(parsed_data)
 
-            # Save to database
-            conn = sqlite3.connect('database/candidates.db')
-            cursor = conn.cursor()
+        # Save to database
+        conn = sqlite3.connect(app.config['DATABASE'])
+        cursor = conn.cursor()
 
+        try:
             cursor.execute('''
                 INSERT INTO candidates 
-                (name, email, phone, location, experience_years, skills, education, resume_path, uploaded_at, raw_text)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                (name, email, phone, location, experience_years, skills, education, resume_path, uploaded_at,
+                raw_text, content_hash, skills_version)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''', (
-                request.form.get('name', 'Unknown'),
+                upload.form.get('name', 'Unknown'),
                 parsed_data['contact_info'].get('email'),
                 parsed_data['contact_info'].get('phone'),
                 parsed_data['contact_info'].get('location'),
@@ -147,28 +397,48 @@ def upload_resume():
                 json.dumps(parsed_data['education']),
                 file_path,
                 datetime.now(),
-                parsed_data['raw_text']
+                parsed_data['raw_text'],
+                upload.content_hash,
+                skill_extractor.taxonomy_version()
             ))
-
-            candidate_id = cursor.lastrowid
-            conn.commit()
+        except sqlite3.IntegrityError:
+            # Another upload of the same file committed while this one was being parsed
+            conn.rollback()
+            existing = cursor.execute('SELECT id FROM candidates WHERE content_hash = ?',
+                                      (upload.content_hash,)).fetchone()
             conn.close()
+            if existing is None:
+                raise
+            return duplicate_response(upload, existing[0], parsed_data)
 
-            return jsonify({
-                'success': True,
-                'candidate_id': candidate_id,
-                'parsed_data': {
-                    'contact_info': parsed_data['contact_info'],
-                    'experience_years': parsed_data['experience_years'],
-                    'skills': skills,
-                    'education': parsed_data['education']
-                }
-            })
+        candidate_id = cursor.lastrowid
+        job_matcher.record_documents(cursor, [profile['terms']])
+        with metrics.timer('db_write'):
+            conn.commit()
+        conn.close()
 
+        # Keep the shared feature store current for the matching engine
+        try:
+            with metrics.timer('feature_store_append'):
+                feature_store.append([(candidate_id, profile)], job_matcher.semantic_name())
         except Exception as e:
-            return jsonify({'error': f'Error processing resume: {str(e)}'}), 500
+            print(f"Feature store append error: {e}")
+
+        return jsonify({
+            'success': True,
+            'candidate_id': candidate_id,
+            'truncated': parsed_data['truncated'],
+            'truncation_reasons': parsed_data['truncation_reasons'],
+            'parsed_data': {
+                'contact_info': parsed_data['contact_info'],
+                'experience_years': parsed_data['experience_years'],
+                'skills': skills,
+                'education': parsed_data['education']
+            }
+        })
 
-    return jsonify({'error': 'Invalid file type'}), 400
+    except Exception as e:
+        return jsonify({'error': f'Error processing resume: {str(e)}'}), 500
 
 
 @app.route('/upload_job_description', methods=['POST'])
@@ -176,7 +446,7 @@ def upload_job_description():
     try:
         data = request.get_json()
 
-        conn = sqlite3.connect('database/candidates.db')
+        conn = sqlite3.connect(app.config['DATABASE'])
         cursor = conn.cursor()
 
         # Extract skills from job description
@@ -187,8 +457,9 @@ def upload_job_description():
 
         cursor.execute('''
             INSERT INTO job_descriptions 
-            (title, company, description, required_skills, required_experience, education_requirements, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
+            (title, company, description, required_skills, required_experience, education_requirements, created_at,
+            skills_version)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
         ''', (
             data['title'],
             data['company'],
@@ -196,11 +467,13 @@ def upload_job_description():
             json.dumps(all_jd_skills),
             data.get('required_experience', 0),
             json.dumps(data.get('education_requirements', [])),
-            datetime.now()
+            datetime.now(),
+            skill_extractor.taxonomy_version()
         ))
 
         job_id = cursor.lastrowid
-        conn.commit()
+        with metrics.timer('db_write'):
+            conn.commit()
         conn.close()
 
         return jsonify({
@@ -213,62 +486,282 @@ def upload_job_description():
         return jsonify({'error': f'Error processing job description: {str(e)}'}), 500
 
 
+@app.route('/upload_job_descriptions', methods=['POST'])
+def upload_job_descriptions():
+    # JSONL or CSV, either as an uploaded 'file' or as the raw request body
+    upload = request.files.get('file')
+    if upload is not None:
+        name, data = upload.filename or '', upload.read()
+    else:
+        name, data = '', request.get_data()
+    fmt = request.args.get('format') or name.rsplit('.', 1)[-1].lower()
+    if fmt not in ('jsonl', 'csv'):
+        fmt = 'csv' if request.mimetype == 'text/csv' else 'jsonl'
+
+    try:
+        rows = read_job_rows(data.decode('utf-8-sig', 'replace'), fmt)
+        if not rows:
+            return jsonify({'error': 'No job descriptions found'}), 400
+        if len(rows) > app.config['JOB_IMPORT_MAX_ROWS']:
+            return jsonify({'error': f"At most {app.config['JOB_IMPORT_MAX_ROWS']} job descriptions per import"}), 400
+
+        summary = import_jobs(app.config['DATABASE'], rows, skill_extractor)
+
+        # Build the new jobs' profiles and term vectors now rather than on the first match
+        job_index.refresh()
+
+        return jsonify(dict(summary, success=True, format=fmt))
+
+    except JobImportError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Error importing job descriptions: {str(e)}'}), 500
+
+
+# Fields of each row of a compact /match_candidates response, followed by extra component scores
+MATCH_SUMMARY_COLUMNS = ('id', 'name', 'email', 'location', 'overall_score', 'skill_score', 'semantic_score',
+                         'experience_score', 'education_score', 'diversity_bonus', 'matched_skill_count',
+                         'partial_skill_count', 'missing_skill_count', 'required_skill_count')
+
+
+def load_job(cursor, job_id):
+    """A job description row as a dictionary, or None"""
+    cursor.execute('SELECT * FROM job_descriptions WHERE id = ?', (job_id,))
+    job_data = cursor.fetchone()
+    if not job_data:
+        return None
+
+    return {
+        'id': job_data[0],
+        'title': job_data[1],
+        'company': job_data[2],
+        'description': job_data[3],
+        'required_skills': json.loads(job_data[4]) if job_data[4] else [],
+        'required_experience': job_data[5],
+        'education_requirements': json.loads(job_data[6]) if job_data[6] else []
+    }
+
+
+def score_job_candidates(job_id, job_dict, top_k, candidate_ids, view='compact', offset=0, min_score=None):
+    """Rank candidates for a job, store the match rows and return the response payload
+
+    The payload holds ``top_k`` matches from position ``offset`` of the
+    ranking and ``total``, the number of ranked candidates scoring at least
+    ``min_score``. The compact view sends each match as a row of ``columns``
+    (ids, names, scores and skill counts) and the job's weights once;
+    ``/match_detail`` gives one candidate's full breakdown. The full view
+    repeats the whole candidate and match result per row.
+    """
+    job_profile = scoring_pipeline.build_job_profile(job_dict)
+    if app.config['MATCH_WORKERS'] > 1:
+        # Score the pool across worker processes and load only the winners
+        if min_score is None:
+            wanted = None if top_k is None else offset + top_k
+            ranked, pruned = get_match_engine().match(job_dict, wanted, candidate_ids)
+            total = len(candidate_cache.records() if candidate_ids is None else
+                        candidate_cache.get_many(candidate_ids))
+        else:
+            ranked, pruned = get_match_engine().match(job_dict, None, candidate_ids)
+            ranked = [item for item in ranked if item[1]['overall_score'] >= min_score]
+            total = len(ranked)
+        ranked = ranked[offset:] if top_k is None else ranked[offset:offset + top_k]
+    else:
+        # Score the cached candidate block; the pool is only re-read when it changed
+        block = candidate_cache.block()
+        rows = None if candidate_ids is None else block.rows_for(candidate_ids)
+        total, ranked, pruned = scoring_pipeline.rank_page(job_profile, block, offset, top_k, rows, min_score)
+
+    records = candidate_cache.get_many(candidate_id for candidate_id, _ in ranked)
+    scored = [(records[candidate_id], match_result)
+              for candidate_id, match_result in ranked if candidate_id in records]
+
+    conn = sqlite3.connect(app.config['DATABASE'])
+    cursor = conn.cursor()
+    matched_candidates = []
+    columns = list(MATCH_SUMMARY_COLUMNS) + [f'{component.name}_score' for component in scoring_pipeline.extra]
+
+    for record, match_result in scored:
+        # Save match result to database
+        cursor.execute('''
+            INSERT INTO matches 
+            (candidate_id, job_id, overall_score, skill_score, experience_score, education_score, 
+            semantic_score, matched_skills, missing_skills, created_at, scorer_version)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            record.id,
+            job_id,
+            match_result['overall_score'],
+            match_result['skill_match']['score'] * 100,
+            match_result['experience_score'],
+            match_result['education_score'],
+            match_result['semantic_score'],
+            json.dumps(match_result['skill_match']['matched_skills']),
+            json.dumps(match_result['skill_match']['missing_skills']),
+            datetime.now(),
+            job_matcher.scorer_version()
+        ))
+
+        if view == 'full':
+            matched_candidates.append({
+                'candidate': record.to_dict(),
+                'match_result': match_result
+            })
+        else:
+            summary = dict(job_matcher.summarize_match(match_result),
+                           id=record.id, name=record.name, email=record.email, location=record.location)
+            matched_candidates.append([summary.get(column) for column in columns])
+
+    with metrics.timer('db_write'):
+        conn.commit()
+    conn.close()
+
+    payload = {
+        'success': True,
+        'job': job_dict,
+        'view': view,
+        'total': total,
+        'offset': offset,
+        'matches': matched_candidates,
+        'pruned': pruned
+    }
+    if view != 'full':
+        payload['columns'] = columns
+        payload['weights'] = job_profile['weights']
+    return payload
+
+
 @app.route('/match_candidates/<int:job_id>')
 def match_candidates(job_id):
     try:
-        conn = sqlite3.connect(os.path.join('database', 'candidates.db'))
+        # Same job, query, filters, pool and scorer give the same result: answer revalidations
+        # with 304 and let concurrent requests wait for one scoring run
+        top_k = request.args.get('top_k', type=int)
+        offset = max(0, request.args.get('offset', 0, type=int))
+        min_score = request.args.get('min_score', type=float)
+        query = request.args.get('q', '').strip()
+        view = 'full' if request.args.get('view') == 'full' else 'compact'
+        try:
+            filters = CandidateFilters.from_args(request.args, job_matcher)
+        except FilterError as e:
+            return jsonify({'error': f'Invalid filter: {str(e)}'}), 400
+
+        conn = sqlite3.connect(app.config['DATABASE'])
         cursor = conn.cursor()
+        try:
+            versions = read_versions(cursor)
+            etag = make_etag('match_candidates', job_id, top_k, offset, min_score, query, view, filters.stamp(),
+                             versions['pool'], versions['jobs'], job_matcher.scorer_version())
+            cached = not_modified(etag)
+            if cached is not None:
+                return cached
+
+            job_dict = load_job(cursor, job_id)
+            if job_dict is None:
+                return jsonify({'error': 'Job description not found'}), 404
+
+            # Optional full-text query and filters narrowing the pool before scoring
+            candidate_ids = None
+            if query:
+                try:
+                    candidate_ids = search_candidate_ids(cursor, query, app.config['MATCH_SEARCH_LIMIT'], filters)
+                except SearchQueryError as e:
+                    return jsonify({'error': f'Invalid search query: {str(e)}'}), 400
+            elif filters:
+                candidate_ids = filter_candidate_ids(cursor, filters)
+        finally:
+            conn.close()
 
-        # Get job description
-        cursor.execute('SELECT * FROM job_descriptions WHERE id = ?', (job_id,))
-        job_data = cursor.fetchone()
+        payload, _ = match_flights.run(
+            etag, lambda: score_job_candidates(job_id, job_dict, top_k, candidate_ids, view, offset, min_score)
+        )
+        return with_etag(jsonify(payload), etag)
 
-        if not job_data:
+    except Exception as e:
+        return jsonify({'error': f'Error matching candidates: {str(e)}'}), 500
+
+
+@app.route('/results/<int:job_id>')
+def results(job_id):
+    # The page loads its matches page by page from /match_candidates
+    conn = sqlite3.connect(app.config['DATABASE'])
+    try:
+        job_dict = load_job(conn.cursor(), job_id)
+    finally:
+        conn.close()
+    if job_dict is None:
+        return render_template('results.html', job=None), 404
+    return render_template('results.html', job=job_dict)
+
+
+@app.route('/match_detail/<int:job_id>/<int:candidate_id>')
+def match_detail(job_id, candidate_id):
+    try:
+        conn = sqlite3.connect(app.config['DATABASE'])
+        cursor = conn.cursor()
+        try:
+            versions = read_versions(cursor)
+            etag = make_etag('match_detail', job_id, candidate_id, versions['pool'], versions['jobs'],
+                             job_matcher.scorer_version())
+            cached = not_modified(etag)
+            if cached is not None:
+                return cached
+            job_dict = load_job(cursor, job_id)
+        finally:
+            conn.close()
+
+        if job_dict is None:
             return jsonify({'error': 'Job description not found'}), 404
+        records = candidate_cache.get_many([candidate_id])
+        if candidate_id not in records:
+            return jsonify({'error': 'Candidate not found'}), 404
+
+        # One row of the cached block, scored exactly as in the ranked list
+        block = candidate_cache.block()
+        ranked = scoring_pipeline.rank(scoring_pipeline.build_job_profile(job_dict), block, 1,
+                                       block.rows_for([candidate_id]))
+        if not ranked:
+            return jsonify({'error': 'Candidate not found'}), 404
+        match_result = ranked[0][1]
+
+        return with_etag(jsonify({
+            'success': True,
+            'job': job_dict,
+            'candidate': records[candidate_id].to_dict(),
+            'match_result': match_result,
+            'explanation': job_matcher.generate_match_explanation(match_result)
+        }), etag)
 
-        # Convert job tuple to dictionary
-        job_dict = {
-            'id': job_data[0],
-            'title': job_data[1],
-            'company': job_data[2],
-            'description': job_data[3],
-            'required_skills': json.loads(job_data[4]) if job_data[4] else [],
-            'required_experience': job_data[5],
-            'education_requirements': json.loads(job_data[6]) if job_data[6] else []
-        }
+    except Exception as e:
+        return jsonify({'error': f'Error explaining match: {str(e)}'}), 500
 
-        # Get all candidates
-        cursor.execute('SELECT * FROM candidates')
-        candidates = cursor.fetchall()
-
-        matched_candidates = []
-
-        for candidate in candidates:
-            # Convert candidate tuple to dictionary
-            candidate_dict = {
-                'id': candidate[0],
-                'name': candidate[1],
-                'email': candidate[2],
-                'phone': candidate[3],
-                'location': candidate[4],
-                'experience_years': candidate[5],
-                'skills': json.loads(candidate[6]) if candidate[6] else {},
-                'education': json.loads(candidate[7]) if candidate[7] else [],
-                'raw_text': candidate[10] if len(candidate) > 10 else ''
-            }
 
-            # Calculate match score
-            match_result = job_matcher.calculate_overall_match(candidate_dict, job_dict)
+@app.route('/match_jobs/<int:candidate_id>')
+def match_jobs(candidate_id):
+    try:
+        records = candidate_cache.get_many([candidate_id])
+        if candidate_id not in records:
+            return jsonify({'error': 'Candidate not found'}), 404
+        record = records[candidate_id]
+
+        top_k = request.args.get('top_k', 10, type=int)
 
-            # Save match result to database
+        # Every cached job is scored in one vectorized pass; only the top-K get full results
+        ranked = job_index.rank_jobs(record.profile, top_k)
+
+        conn = sqlite3.connect(app.config['DATABASE'])
+        cursor = conn.cursor()
+
+        matched_jobs = []
+
+        for job_dict, match_result in ranked:
             cursor.execute('''
                 INSERT INTO matches 
                 (candidate_id, job_id, overall_score, skill_score, experience_score, education_score, 
-                semantic_score, matched_skills, missing_skills, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                semantic_score, matched_skills, missing_skills, created_at, scorer_version)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''', (
-                candidate[0],
-                job_id,
+                candidate_id,
+                job_dict['id'],
                 match_result['overall_score'],
                 match_result['skill_match']['score'] * 100,
                 match_result['experience_score'],
@@ -276,36 +769,137 @@ def match_candidates(job_id):
                 match_result['semantic_score'],
                 json.dumps(match_result['skill_match']['matched_skills']),
                 json.dumps(match_result['skill_match']['missing_skills']),
-                datetime.now()
+                datetime.now(),
+                job_matcher.scorer_version()
             ))
 
-            matched_candidates.append({
-                'candidate': candidate_dict,
+            matched_jobs.append({
+                'job': job_dict,
                 'match_result': match_result
             })
 
-        # Sort by overall score
-        matched_candidates.sort(key=lambda x: x['match_result']['overall_score'], reverse=True)
-
-        conn.commit()
+        with metrics.timer('db_write'):
+            conn.commit()
         conn.close()
 
         return jsonify({
             'success': True,
-            'job': job_dict,
-            'matches': matched_candidates
+            'candidate': record.to_dict(),
+            'matches': matched_jobs,
+            'jobs_scored': len(job_index)
         })
 
     except Exception as e:
-        return jsonify({'error': f'Error matching candidates: {str(e)}'}), 500
+        return jsonify({'error': f'Error matching jobs: {str(e)}'}), 500
+
+
+@app.route('/batch_match', methods=['POST'])
+def batch_match():
+    try:
+        data = request.get_json(silent=True) or {}
+
+        # Scores every candidate against every job (or the given job ids) into matches
+        started = batch_matcher.start(job_ids=data.get('job_ids'), tile_size=data.get('tile_size'))
+        return jsonify({
+            'success': True,
+            'started': started,
+            'status': batch_matcher.status()
+        }), 202 if started else 200
+
+    except BatchError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Error starting batch match: {str(e)}'}), 500
+
+
+@app.route('/batch_match/status')
+def batch_match_status():
+    try:
+        return jsonify({'success': True, 'status': batch_matcher.status()})
+
+    except Exception as e:
+        return jsonify({'error': f'Error reading batch match status: {str(e)}'}), 500
+
+
+@app.route('/reprocess', methods=['POST'])
+def reprocess():
+    try:
+        # Runs in the background; reads keep being served from the current data meanwhile
+        started = reprocessor.start()
+        return jsonify({
+            'success': True,
+            'started': started,
+            'status': reprocessor.status()
+        }), 202 if started else 200
+
+    except Exception as e:
+        return jsonify({'error': f'Error starting reprocessing: {str(e)}'}), 500
+
+
+@app.route('/reprocess/status')
+def reprocess_status():
+    try:
+        return jsonify({'success': True, 'status': reprocessor.status()})
+
+    except Exception as e:
+        return jsonify({'error': f'Error reading reprocessing status: {str(e)}'}), 500
+
+
+@app.route('/metrics')
+def metrics_endpoint():
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
+@app.route('/search')
+def search():
+    query = request.args.get('q', '').strip()
+    try:
+        filters = CandidateFilters.from_args(request.args, job_matcher)
+    except FilterError as e:
+        return jsonify({'error': f'Invalid filter: {str(e)}'}), 400
+    if not query and not filters:
+        return jsonify({'error': 'No search query or filter given'}), 400
+
+    page = max(1, request.args.get('page', 1, type=int))
+    per_page = min(100, max(1, request.args.get('per_page', 20, type=int)))
+
+    try:
+        conn = sqlite3.connect(app.config['DATABASE'])
+        cursor = conn.cursor()
+        try:
+            total, hits = search_candidates(cursor, query, page, per_page, filters)
+        finally:
+            conn.close()
+
+        return jsonify({
+            'success': True,
+            'query': query,
+            'filters': filters.stamp(),
+            'total': total,
+            'page': page,
+            'per_page': per_page,
+            'candidates': hits
+        })
+
+    except SearchQueryError as e:
+        return jsonify({'error': f'Invalid search query: {str(e)}'}), 400
+    except Exception as e:
+        return jsonify({'error': f'Error searching candidates: {str(e)}'}), 500
 
 
 @app.route('/dashboard')
 def dashboard():
     try:
-        conn = sqlite3.connect(os.path.join('database', 'candidates.db'))
+        conn = sqlite3.connect(app.config['DATABASE'])
         cursor = conn.cursor()
 
+        versions = read_versions(cursor)
+        etag = make_etag('dashboard', versions, template_stamp('dashboard.html'))
+        cached = not_modified(etag)
+        if cached is not None:
+            conn.close()
+            return cached
+
         # Get statistics
         cursor.execute('SELECT COUNT(*) FROM candidates')
         total_candidates = cursor.fetchone()[0]
@@ -315,7 +909,9 @@ def dashboard():
 
         # Get recent matches
         cursor.execute('''
-            SELECT m.*, c.name, c.email, j.title, j.company
+            SELECT m.id, m.candidate_id, m.job_id, m.overall_score, m.skill_score, m.experience_score,
+                   m.education_score, m.semantic_score, m.matched_skills, m.missing_skills, m.created_at,
+                   c.name, c.email, j.title, j.company
             FROM matches m
             JOIN candidates c ON m.candidate_id = c.id
             JOIN job_descriptions j ON m.job_id = j.id
@@ -326,10 +922,10 @@ def dashboard():
 
         conn.close()
 
-        return render_template('dashboard.html',
-                               total_candidates=total_candidates,
-                               total_jobs=total_jobs,
-                               recent_matches=recent_matches)
+        return with_etag(app.make_response(render_template('dashboard.html',
+                                                           total_candidates=total_candidates,
+                                                           total_jobs=total_jobs,
+                                                           recent_matches=recent_matches)), etag)
 
     except Exception as e:
         print(f"Dashboard error: {e}")
@@ -343,9 +939,17 @@ def dashboard():
 @app.route('/download_results/<int:job_id>')
 def download_results(job_id):
     try:
-        conn = sqlite3.connect('database/candidates.db')
+        conn = sqlite3.connect(app.config['DATABASE'])
         cursor = conn.cursor()
 
+        versions = read_versions(cursor)
+        etag = make_etag('download_results', job_id, versions['pool'], versions['matches'],
+                         job_matcher.scorer_version())
+        cached = not_modified(etag)
+        if cached is not None:
+            conn.close()
+            return cached
+
         cursor.execute('''
             SELECT c.name, c.email, c.phone, c.location, c.experience_years,
                    m.overall_score, m.skill_score, m.experience_score, m.education_score
@@ -374,12 +978,12 @@ def download_results(job_id):
         mem.write(output.getvalue().encode())
         mem.seek(0)
 
-        return send_file(
+        return with_etag(send_file(
             mem,
             as_attachment=True,
             download_name=f'matching_results_job_{job_id}.csv',
             mimetype='text/csv'
-        )
+        ), etag)
 
     except Exception as e:
         return jsonify({'error': f'Error generating CSV: {str(e)}'}), 500
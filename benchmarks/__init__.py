@@ -0,0 +1,14 @@
+"""
+Reproducible performance benchmarks for the resume screener.
+
+- ``corpus.py`` writes a seeded synthetic corpus of PDF/DOCX resumes and
+  job descriptions drawn from the SkillExtractor taxonomy
+- ``micro.py`` times each processing stage in isolation
+- ``e2e.py`` times ingest and matching through the Flask test client
+- ``equivalence.py`` checks that every ranking path agrees with exhaustive
+  scoring and fingerprints the rankings so runs can be compared
+- ``load.py`` drives a concurrent request mix in-process or over HTTP and
+  sweeps gunicorn worker and thread counts
+
+Run ``python -m benchmarks --help`` for the command line.
+"""
@@ -0,0 +1,189 @@
+"""
+Command line for the benchmarks.
+
+    python -m benchmarks generate --out bench_corpus --resumes 1000 --jobs 50
+    python -m benchmarks run --corpus bench_corpus --output results.json [--baseline old.json]
+    python -m benchmarks compare old.json results.json
+    python -m benchmarks load --corpus bench_corpus --target gunicorn --workers 1,2,4 --threads 1,4
+
+``run`` exits non-zero when any ranking path disagrees with exhaustive
+scoring, or when the baseline was taken on the same corpus and its ranking
+fingerprint differs.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime
+
+from .corpus import generate_corpus, load_corpus
+from .e2e import REPO_ROOT, run_e2e
+from .load import SERVERS, format_points, parse_mix, run_sweep
+from .micro import run_micro
+
+SECTIONS = ('micro', 'e2e')
+
+
+def _log(message: str):
+    print(message, file=sys.stderr)
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def _meta(corpus) -> dict:
+    return {
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'corpus_id': corpus['corpus_id']
+    }
+
+
+def cmd_generate(args) -> int:
+    manifest = generate_corpus(args.out, args.resumes, args.jobs, args.seed, args.docx_share,
+                               progress=lambda done: _log(f'  {done} resumes written'))
+    _log(f"Corpus {manifest['corpus_id']} written to {args.out}")
+    return 0
+
+
+def cmd_run(args) -> int:
+    corpus = load_corpus(args.corpus)
+    results = {'meta': _meta(corpus)}
+    if 'micro' not in args.skip:
+        _log('Micro-benchmarks...')
+        results['micro'] = run_micro(corpus, args.sample, progress=lambda name: _log(f'  micro: {name}'))
+    if 'e2e' not in args.skip:
+        _log('End-to-end benchmark...')
+        results['e2e'] = run_e2e(args.corpus, args.ingest, args.top_k)
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    _log(f'Results written to {args.output}')
+
+    failed = False
+    equivalence = results.get('e2e', {}).get('equivalence')
+    if equivalence is not None:
+        for check in equivalence['checks']:
+            _log(f"  {check['check']}: {check['mismatches']} of {check['jobs']} rankings differ")
+        failed = not equivalence['passed']
+
+    if args.baseline and equivalence is not None:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        same_corpus = baseline.get('meta', {}).get('corpus_id') == corpus['corpus_id']
+        previous = baseline.get('e2e', {}).get('equivalence', {}).get('fingerprint')
+        if same_corpus and previous and previous != equivalence['fingerprint']:
+            _log(f"Ranking fingerprint changed since {baseline['meta'].get('commit')}: "
+                 f"{previous[:12]} -> {equivalence['fingerprint'][:12]}")
+            failed = True
+
+    if failed:
+        _log('Ranking equivalence FAILED')
+    return 1 if failed else 0
+
+
+def _rows(results: dict):
+    micro = results.get('micro', {})
+    for name, summary in micro.items():
+        yield f'micro.{name}', summary
+    for name, summary in results.get('e2e', {}).get('endpoints', {}).items():
+        yield f'e2e.{name}', summary
+
+
+def cmd_compare(args) -> int:
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+    previous = dict(_rows(before))
+    print(f"{'benchmark':<40} {'before ms':>12} {'after ms':>12} {'change':>9}")
+    for name, summary in _rows(after):
+        old = previous.get(name)
+        if old is None or not old.get('mean_ms'):
+            print(f"{name:<40} {'-':>12} {summary['mean_ms']:>12.4f} {'new':>9}")
+            continue
+        change = (summary['mean_ms'] - old['mean_ms']) / old['mean_ms'] * 100
+        print(f"{name:<40} {old['mean_ms']:>12.4f} {summary['mean_ms']:>12.4f} {change:>+8.1f}%")
+    return 0
+
+
+def _counts(text: str):
+    return [int(value) for value in text.split(',') if value.strip()]
+
+
+def cmd_load(args) -> int:
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        _log(str(e))
+        return 2
+    corpus = load_corpus(args.corpus)
+    points = run_sweep(args.corpus, args.target, _counts(args.concurrency), _counts(args.workers),
+                       _counts(args.threads), args.duration, mix, progress=lambda name: _log(f'  load: {name}'),
+                       seed_resumes=args.seed_resumes, seed_jobs=args.seed_jobs, top_k=args.top_k)
+    with open(args.output, 'w') as f:
+        json.dump({'meta': dict(_meta(corpus), target=args.target, mix=mix, duration=args.duration),
+                   'points': points}, f, indent=2)
+    print(format_points(points))
+    _log(f'Results written to {args.output}')
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Resume screener benchmarks')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    generate = commands.add_parser('generate', help='Write a seeded synthetic corpus')
+    generate.add_argument('--out', required=True)
+    generate.add_argument('--resumes', type=int, default=1000)
+    generate.add_argument('--jobs', type=int, default=50)
+    generate.add_argument('--seed', type=int, default=7)
+    generate.add_argument('--docx-share', type=float, default=0.3)
+    generate.set_defaults(handler=cmd_generate)
+
+    run = commands.add_parser('run', help='Run the benchmarks on a corpus')
+    run.add_argument('--corpus', required=True)
+    run.add_argument('--output', default='benchmark_results.json')
+    run.add_argument('--sample', type=int, default=200, help='Resumes used by the micro-benchmarks')
+    run.add_argument('--ingest', type=int, default=200, help='Resumes uploaded by the end-to-end benchmark')
+    run.add_argument('--top-k', type=int, default=20)
+    run.add_argument('--skip', action='append', choices=SECTIONS, default=[])
+    run.add_argument('--baseline', help='Earlier results; a changed ranking fingerprint fails the run')
+    run.set_defaults(handler=cmd_run)
+
+    compare = commands.add_parser('compare', help='Mean latency change between two result files')
+    compare.add_argument('before')
+    compare.add_argument('after')
+    compare.set_defaults(handler=cmd_compare)
+
+    load = commands.add_parser('load', help='Concurrent request mix against the app, swept over workers/threads')
+    load.add_argument('--corpus', required=True)
+    load.add_argument('--target', default='inprocess',
+                      help=f"inprocess, {' or '.join(SERVERS)} (started per sweep point), or a running server's URL")
+    load.add_argument('--concurrency', default='8', help='Client threads; comma-separated values are swept')
+    load.add_argument('--workers', default='1', help='gunicorn workers; comma-separated values are swept')
+    load.add_argument('--threads', default='1', help='gunicorn threads per worker; comma-separated values are swept')
+    load.add_argument('--duration', type=float, default=30.0, help='Seconds of load per sweep point')
+    load.add_argument('--mix', help='Endpoint weights, e.g. match_candidates=6,dashboard=2,upload_resume=1')
+    load.add_argument('--seed-resumes', type=int, default=100)
+    load.add_argument('--seed-jobs', type=int, default=10)
+    load.add_argument('--top-k', type=int, default=20)
+    load.add_argument('--output', default='load_results.json')
+    load.set_defaults(handler=cmd_load)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,257 @@
+"""
+Seeded generator of a synthetic resume and job description corpus.
+
+Every document is generated from its own seeded ``random.Random`` stream,
+so document N is the same whatever the corpus size, and two runs with the
+same seed produce the same documents (PDFs byte for byte). Skills are drawn
+from the SkillExtractor taxonomy and placed the way real resumes use them: a
+skills section, "worked with ..." context sentences and experience bullets.
+
+Layout of a corpus directory::
+
+    resumes/resume_000001.pdf | .docx
+    jobs.jsonl          one job per line, the bulk import format
+    manifest.json       seed, counts, and each resume's file and planted skills
+"""
+import hashlib
+import json
+import os
+import random
+from typing import Dict, List, Optional
+
+FIRST_NAMES = ['Aarav', 'Priya', 'Rohan', 'Ananya', 'Vikram', 'Sneha', 'Arjun', 'Kavya', 'Rahul', 'Meera',
+               'James', 'Maria', 'Chen', 'Fatima', 'Lucas', 'Amara', 'Noah', 'Sofia', 'Omar', 'Hana']
+LAST_NAMES = ['Sharma', 'Patel', 'Iyer', 'Reddy', 'Khan', 'Gupta', 'Nair', 'Das', 'Mehta', 'Joshi',
+              'Smith', 'Garcia', 'Wang', 'Okafor', 'Silva', 'Muller', 'Kim', 'Rossi', 'Haddad', 'Sato']
+CITIES = ['Mumbai', 'Pune', 'Bangalore', 'Hyderabad', 'Chennai', 'Delhi', 'London', 'Berlin',
+          'Toronto', 'Singapore', 'Austin', 'Seattle']
+COMPANIES = ['Acme Corp', 'Globex', 'Initech', 'Umbrella Labs', 'Stark Industries', 'Wayne Tech',
+             'Hooli', 'Pied Piper', 'Vandelay Systems', 'Cyberdyne', 'Tyrell Analytics', 'Soylent Data']
+ROLES = {
+    'programming_languages': 'Software Engineer',
+    'web_technologies': 'Full Stack Developer',
+    'databases': 'Database Engineer',
+    'cloud_platforms': 'DevOps Engineer',
+    'ai_ml': 'Machine Learning Engineer',
+    'tools': 'Platform Engineer',
+    'mobile_development': 'Mobile Developer',
+    'data_science': 'Data Scientist'
+}
+SENIORITY = [('Junior', 0, 2), ('', 2, 5), ('Senior', 5, 9), ('Lead', 8, 14), ('Principal', 12, 20)]
+DEGREES = ['Bachelor of Technology in Computer Science', 'Bachelor of Science in Information Technology',
+           'Master of Science in Computer Science', 'MBA in Technology Management', 'PhD in Machine Learning',
+           'Diploma in Software Engineering', 'Bachelor of Engineering in Electronics', 'MTech in Data Science']
+CONTEXT_PHRASES = ['Experience in', 'Proficient in', 'Worked with', 'Familiar with', 'Skilled in',
+                   'Knowledge of', 'Expertise in']
+VERBS = ['Built', 'Designed', 'Migrated', 'Optimized', 'Maintained', 'Automated', 'Launched', 'Scaled']
+OBJECTS = ['a payments platform', 'internal analytics dashboards', 'a recommendation service',
+           'the customer onboarding flow', 'real-time data pipelines', 'a mobile banking app',
+           'the search backend', 'CI/CD pipelines', 'a fraud detection model', 'microservices']
+FILLER = ['Collaborated with product and design teams.', 'Mentored two junior engineers.',
+          'Reduced latency by 40 percent.', 'Handled on-call rotations for production systems.',
+          'Wrote technical documentation and runbooks.', 'Presented results to senior leadership.']
+
+
+def load_taxonomy() -> Dict[str, List[str]]:
+    """The skill taxonomy of the current SkillExtractor"""
+    from utils.skill_extractor import SkillExtractor
+
+    return SkillExtractor().tech_skills
+
+
+def _rng(seed: int, kind: str, index: int) -> random.Random:
+    # A string seed is hashed deterministically (unlike hash(), which is salted per process)
+    return random.Random(f'{seed}:{kind}:{index}')
+
+
+def _pick_skills(rng: random.Random, taxonomy: Dict[str, List[str]], low: int, high: int):
+    categories = sorted(taxonomy)
+    primary = rng.sample(categories, rng.randint(1, 3))
+    pool = sorted({skill for category in primary for skill in taxonomy[category]})
+    extra = sorted({skill for category in categories for skill in taxonomy[category]} - set(pool))
+    count = rng.randint(low, high)
+    skills = rng.sample(pool, min(len(pool), count - count // 4))
+    skills += rng.sample(extra, min(len(extra), count - len(skills)))
+    return primary[0], skills
+
+
+def make_resume(seed: int, index: int, taxonomy: Dict[str, List[str]]) -> Dict:
+    """Sections of one synthetic resume, plus the skills planted in it"""
+    rng = _rng(seed, 'resume', index)
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    category, skills = _pick_skills(rng, taxonomy, 4, 14)
+    title, low, high = rng.choice(SENIORITY)
+    years = rng.randint(low, high)
+    role = f'{title} {ROLES.get(category, "Engineer")}'.strip()
+
+    header = [
+        f'{first} {last}',
+        f'{first.lower()}.{last.lower()}{index}@example.com | +91 98{rng.randint(10000000, 99999999)} | '
+        f'{rng.choice(CITIES)}',
+    ]
+    summary = [f'{role} with {years} years of experience delivering production software. '
+               f'{rng.choice(CONTEXT_PHRASES)} {", ".join(skills[:3])}.']
+
+    experience = []
+    remaining = years
+    for position in range(rng.randint(1, 4)):
+        span = max(1, remaining // 2) if remaining else 1
+        remaining = max(0, remaining - span)
+        used = rng.sample(skills, min(len(skills), rng.randint(1, 3)))
+        experience.append(f'{role if position == 0 else ROLES.get(rng.choice(sorted(ROLES)))} at '
+                          f'{rng.choice(COMPANIES)} ({span} years)')
+        experience.append(f'- {rng.choice(VERBS)} {rng.choice(OBJECTS)} using {" and ".join(used)}.')
+        experience.append(f'- {rng.choice(FILLER)}')
+
+    education = [rng.choice(DEGREES) + f', {rng.choice(CITIES)} University, {2024 - years - rng.randint(0, 3)}']
+    skill_lines = [f'Technical Skills: {", ".join(skills)}']
+
+    return {
+        'name': f'{first} {last}',
+        'sections': [('', header), ('Summary', summary), ('Experience', experience),
+                     ('Education', education), ('Skills', skill_lines)],
+        'skills': skills,
+        'experience_years': years
+    }
+
+
+def make_job(seed: int, index: int, taxonomy: Dict[str, List[str]]) -> Dict:
+    """One synthetic job description in the bulk import format"""
+    rng = _rng(seed, 'job', index)
+    category, skills = _pick_skills(rng, taxonomy, 3, 8)
+    title, low, high = rng.choice(SENIORITY)
+    years = rng.randint(low, min(high, low + 3))
+    role = f'{title} {ROLES.get(category, "Engineer")}'.strip()
+    company = rng.choice(COMPANIES)
+    description = ' '.join([
+        f'{company} is hiring a {role} to join our {rng.choice(CITIES)} team.',
+        f'You will work on {rng.choice(OBJECTS)} and {rng.choice(OBJECTS)}.',
+        f'Requirements: {years}+ years of experience, strong skills in {", ".join(skills)}.',
+        rng.choice(['Degree required.', 'Masters preferred.', 'Bachelor degree in computer science.', '']),
+        rng.choice(FILLER)
+    ]).strip()
+    return {
+        'title': role,
+        'company': company,
+        'description': description,
+        'required_experience': years,
+        'education_requirements': rng.choice([[], ['bachelor'], ['master'], ['bachelor', 'master']])
+    }
+
+
+def resume_lines(resume: Dict) -> List[str]:
+    lines = []
+    for heading, body in resume['sections']:
+        if heading:
+            lines.append('')
+            lines.append(heading)
+        lines.extend(body)
+    return lines
+
+
+def _wrap(line: str, width: int = 90) -> List[str]:
+    words, lines, current = line.split(' '), [], ''
+    for word in words:
+        if current and len(current) + 1 + len(word) > width:
+            lines.append(current)
+            current = word
+        else:
+            current = f'{current} {word}' if current else word
+    lines.append(current)
+    return lines
+
+
+def write_pdf(path: str, lines: List[str], lines_per_page: int = 48):
+    """Minimal text PDF (Helvetica, one content stream per page) readable by pdfplumber"""
+    wrapped = [piece for line in lines for piece in _wrap(line)]
+    pages = [wrapped[start:start + lines_per_page] for start in range(0, len(wrapped), lines_per_page)] or [[]]
+    font_id = 3 + 2 * len(pages)
+    objects = [b'<< /Type /Catalog /Pages 2 0 R >>',
+               f"<< /Type /Pages /Kids [{' '.join(f'{3 + 2 * i} 0 R' for i in range(len(pages)))}] "
+               f"/Count {len(pages)} >>".encode()]
+    for number, page in enumerate(pages):
+        text = ' '.join(
+            '(' + line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)') + ') Tj T*' for line in page
+        )
+        content = f'BT /F1 11 Tf 14 TL 56 760 Td {text} ET'.encode('latin-1', 'replace')
+        objects.append(f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {4 + 2 * number} 0 R '
+                       f'/Resources << /Font << /F1 {font_id} 0 R >> >> >>'.encode())
+        objects.append(b'<< /Length %d >>\nstream\n' % len(content) + content + b'\nendstream')
+    objects.append(b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>')
+
+    out, offsets = bytearray(b'%PDF-1.4\n'), []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    for offset in offsets:
+        out += b'%010d 00000 n \n' % offset
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    with open(path, 'wb') as f:
+        f.write(out)
+
+
+def write_docx(path: str, resume: Dict):
+    from docx import Document
+
+    document = Document()
+    for heading, body in resume['sections']:
+        if heading:
+            document.add_heading(heading, level=2)
+        for line in body:
+            document.add_paragraph(line)
+    document.save(path)
+
+
+def generate_corpus(out_dir: str, resumes: int = 1000, jobs: int = 50, seed: int = 7,
+                    docx_share: float = 0.3, taxonomy: Optional[Dict[str, List[str]]] = None,
+                    progress=None) -> Dict:
+    """Write a corpus to ``out_dir`` and return its manifest"""
+    taxonomy = taxonomy or load_taxonomy()
+    resume_dir = os.path.join(out_dir, 'resumes')
+    os.makedirs(resume_dir, exist_ok=True)
+
+    entries = []
+    for index in range(1, resumes + 1):
+        resume = make_resume(seed, index, taxonomy)
+        # The format choice has its own stream so it does not shift the content
+        file_type = 'docx' if _rng(seed, 'format', index).random() < docx_share else 'pdf'
+        filename = f'resume_{index:06d}.{file_type}'
+        path = os.path.join(resume_dir, filename)
+        if file_type == 'pdf':
+            write_pdf(path, resume_lines(resume))
+        else:
+            write_docx(path, resume)
+        entries.append({'file': f'resumes/{filename}', 'type': file_type, 'name': resume['name'],
+                        'skills': resume['skills'], 'experience_years': resume['experience_years']})
+        if progress is not None and index % 1000 == 0:
+            progress(index)
+
+    with open(os.path.join(out_dir, 'jobs.jsonl'), 'w') as f:
+        for index in range(1, jobs + 1):
+            f.write(json.dumps(make_job(seed, index, taxonomy)) + '\n')
+
+    taxonomy_digest = hashlib.sha1(json.dumps(taxonomy, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+    manifest = {
+        'seed': seed,
+        'resumes': resumes,
+        'jobs': jobs,
+        'docx_share': docx_share,
+        'taxonomy': taxonomy_digest,
+        'corpus_id': f'{seed}-{resumes}-{jobs}-{docx_share}-{taxonomy_digest}',
+        'entries': entries
+    }
+    with open(os.path.join(out_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f)
+    return manifest
+
+
+def load_corpus(corpus_dir: str) -> Dict:
+    """Manifest plus the job descriptions of a generated corpus"""
+    with open(os.path.join(corpus_dir, 'manifest.json')) as f:
+        manifest = json.load(f)
+    with open(os.path.join(corpus_dir, 'jobs.jsonl')) as f:
+        manifest['job_rows'] = [json.loads(line) for line in f if line.strip()]
+    manifest['root'] = corpus_dir
+    return manifest
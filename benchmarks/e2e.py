@@ -0,0 +1,142 @@
+"""
+End-to-end benchmark: ingest and matching through the Flask test client.
+
+The app binds its database and upload paths relative to the working
+directory at import, so the benchmark runs in a child process started in a
+scratch directory; the repository's own database is never touched. The
+child uploads corpus resumes one request at a time, bulk-imports the job
+descriptions, ranks candidates for every job and jobs for a sample of
+candidates, then checks the app's rankings against exhaustive scoring.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, Optional
+
+from .corpus import load_corpus
+from .timing import summarize
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Rankings without top_k score and return the whole pool; a few are enough
+FULL_RANKINGS = 3
+MATCH_JOBS_SAMPLE = 50
+
+
+class _Endpoint:
+    """Per-call latency and error count of one benchmarked endpoint"""
+
+    def __init__(self):
+        self.seconds = []
+        self.errors = 0
+
+    def call(self, fn, *args, **kwargs):
+        started = time.perf_counter()
+        response = fn(*args, **kwargs)
+        self.seconds.append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            self.errors += 1
+        return response
+
+    def summary(self) -> Dict:
+        return dict(summarize(self.seconds), errors=self.errors)
+
+
+def _ranking(payload: Dict):
+    columns = payload['columns']
+    id_column, score_column = columns.index('id'), columns.index('overall_score')
+    return [(match[id_column], match[score_column]) for match in payload['matches']]
+
+
+def run_in_process(corpus: Dict, ingest: int, top_k: int, progress=None) -> Dict:
+    """Run the benchmark against ``app`` imported in the current working directory"""
+    import app as screener
+    from .equivalence import check_equivalence
+
+    def step(name):
+        if progress is not None:
+            progress(name)
+
+    client = screener.app.test_client()
+    endpoints = {name: _Endpoint() for name in
+                 ('upload_resume', 'upload_job_descriptions', 'match_candidates_top_k', 'match_candidates_all',
+                  'match_jobs')}
+
+    step('ingest')
+    candidate_ids = []
+    for entry in corpus['entries'][:ingest]:
+        with open(os.path.join(corpus['root'], entry['file']), 'rb') as f:
+            response = endpoints['upload_resume'].call(
+                client.post, '/upload_resume', content_type='multipart/form-data',
+                data={'name': entry['name'], 'resume': (f, os.path.basename(entry['file']))})
+        if response.status_code == 200:
+            candidate_ids.append(response.get_json()['candidate_id'])
+
+    step('job import')
+    with open(os.path.join(corpus['root'], 'jobs.jsonl'), 'rb') as f:
+        response = endpoints['upload_job_descriptions'].call(
+            client.post, '/upload_job_descriptions?format=jsonl', data=f.read())
+    job_ids = [result['job_id'] for result in response.get_json().get('results', []) if result.get('success')]
+
+    step('matching')
+    observed = {}
+    for job_id in job_ids:
+        response = endpoints['match_candidates_top_k'].call(client.get, f'/match_candidates/{job_id}?top_k={top_k}')
+        if response.status_code == 200:
+            observed[job_id] = _ranking(response.get_json())
+    observed_all = {}
+    for job_id in job_ids[:FULL_RANKINGS]:
+        response = endpoints['match_candidates_all'].call(client.get, f'/match_candidates/{job_id}')
+        if response.status_code == 200:
+            observed_all[job_id] = _ranking(response.get_json())
+    for candidate_id in candidate_ids[:MATCH_JOBS_SAMPLE]:
+        endpoints['match_jobs'].call(client.get, f'/match_jobs/{candidate_id}?top_k={top_k}')
+
+    step('equivalence')
+    equivalence = check_equivalence(screener.app.config['DATABASE'], screener.job_matcher, top_k,
+                                    observed={'app_match_candidates_top_k': observed,
+                                              'app_match_candidates_all': observed_all})
+    return {
+        'ingested': len(candidate_ids),
+        'jobs': len(job_ids),
+        'endpoints': {name: endpoint.summary() for name, endpoint in endpoints.items() if endpoint.seconds},
+        'equivalence': equivalence
+    }
+
+
+def run_e2e(corpus_dir: str, ingest: int = 200, top_k: int = 20, workdir: Optional[str] = None) -> Dict:
+    """Run the end-to-end benchmark in a child process and return its results"""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [REPO_ROOT, env.get('PYTHONPATH')]))
+    with tempfile.TemporaryDirectory() as scratch:
+        cwd = workdir or scratch
+        out = os.path.join(scratch, 'e2e.json')
+        subprocess.run(
+            [sys.executable, '-m', 'benchmarks.e2e', '--corpus', os.path.abspath(corpus_dir),
+             '--ingest', str(ingest), '--top-k', str(top_k), '--json-out', out],
+            cwd=cwd, env=env, check=True
+        )
+        with open(out) as f:
+            return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='End-to-end benchmark child process; run from a scratch directory')
+    parser.add_argument('--corpus', required=True)
+    parser.add_argument('--ingest', type=int, default=200)
+    parser.add_argument('--top-k', type=int, default=20)
+    parser.add_argument('--json-out', required=True)
+    args = parser.parse_args()
+
+    results = run_in_process(load_corpus(args.corpus), args.ingest, args.top_k,
+                             progress=lambda name: print(f'  e2e: {name}', file=sys.stderr))
+    with open(args.json_out, 'w') as f:
+        json.dump(results, f)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+Ranking equivalence: every fast path must agree with exhaustive scoring.
+
+The reference ranks all candidates for every job with
+``JobMatcher.calculate_overall_match`` one pair at a time, ordered by score
+and then candidate id. Top-K pruning (``rank_profiles``), the vectorized
+JobIndex, the component pipeline and the rankings the app returned are
+compared to it exactly. The
+reference is also hashed into a fingerprint: two runs on the same corpus
+with different fingerprints scored something differently.
+"""
+import hashlib
+import json
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+
+from utils.candidate_cache import CANDIDATE_RECORD_QUERY, CandidateRecord
+from utils.job_index import JOB_RECORD_QUERY, JobIndex, job_from_row
+from utils.scoring import ScoringPipeline
+
+Ranking = List[Tuple[int, float]]
+
+# Mismatch examples kept per check
+MAX_EXAMPLES = 5
+
+
+def _load(db_path: str, matcher):
+    conn = sqlite3.connect(db_path)
+    try:
+        candidates = conn.execute(CANDIDATE_RECORD_QUERY + ' ORDER BY id').fetchall()
+        jobs = [job_from_row(row) for row in conn.execute(JOB_RECORD_QUERY + ' ORDER BY id')]
+    finally:
+        conn.close()
+    resumes = []
+    for row in candidates:
+        record = CandidateRecord(row, matcher)
+        resumes.append((record.id, {'experience_years': record.experience_years, 'skills': record.skills,
+                                    'education': record.education, 'raw_text': row[8] or ''}, record.profile))
+    return resumes, jobs
+
+
+def reference_rankings(resumes, jobs, matcher) -> Dict[int, Ranking]:
+    """Exhaustive pairwise ranking of every candidate for every job"""
+    rankings = {}
+    for job in jobs:
+        scored = [(candidate_id, matcher.calculate_overall_match(resume, job)['overall_score'])
+                  for candidate_id, resume, _ in resumes]
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        rankings[job['id']] = scored
+    return rankings
+
+
+def fingerprint(rankings: Dict[int, Ranking]) -> str:
+    payload = json.dumps(sorted(rankings.items()), separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _compare(name: str, expected: Dict[int, Ranking], actual: Dict[int, Ranking]) -> Dict:
+    mismatches = []
+    for job_id, ranking in sorted(actual.items()):
+        wanted = expected.get(job_id, [])[:len(ranking)]
+        if [(cid, score) for cid, score in ranking] != wanted:
+            mismatches.append({'job_id': job_id, 'expected': wanted[:5], 'actual': list(ranking)[:5]})
+    return {'check': name, 'jobs': len(actual), 'mismatches': len(mismatches),
+            'examples': mismatches[:MAX_EXAMPLES]}
+
+
+def check_equivalence(db_path: str, matcher, top_k: int = 20,
+                      observed: Optional[Dict[str, Dict[int, Ranking]]] = None) -> Dict:
+    """Compare every ranking path with the exhaustive reference
+
+    ``observed`` maps a check name to rankings obtained elsewhere (e.g. the
+    app's /match_candidates responses) that must also match.
+    """
+    resumes, jobs = _load(db_path, matcher)
+    reference = reference_rankings(resumes, jobs, matcher)
+    checks = []
+
+    pruned = {}
+    for job in jobs:
+        ranked, _ = matcher.rank_profiles(((cid, profile) for cid, _, profile in resumes),
+                                          matcher.build_job_profile(job), top_k)
+        pruned[job['id']] = [(cid, result['overall_score']) for cid, result in ranked]
+    checks.append(_compare('rank_profiles_top_k', reference, pruned))
+
+    pipeline = ScoringPipeline(matcher)
+    block = pipeline.extend(None, [(cid, profile) for cid, _, profile in resumes])
+    blocked = {}
+    for job in jobs:
+        ranked = pipeline.rank(pipeline.build_job_profile(job), block, top_k)
+        blocked[job['id']] = [(cid, result['overall_score']) for cid, result in ranked]
+    checks.append(_compare('scoring_pipeline_top_k', reference, blocked))
+
+    # The vectorized index scores the same pairs from the job side
+    index = JobIndex(db_path, matcher)
+    try:
+        index.refresh()
+        vectorized = {}
+        if resumes and index.jobs:
+            overall = index.score_tile([profile for _, _, profile in resumes])['overall']
+            for column, job in enumerate(index.jobs):
+                scored = [(cid, round(score * 100, 2))
+                          for (cid, _, _), score in zip(resumes, overall[:, column].tolist())]
+                scored.sort(key=lambda item: (-item[1], item[0]))
+                vectorized[job['id']] = scored
+        checks.append(_compare('job_index_all_pairs', reference, vectorized))
+    finally:
+        index.close()
+
+    for name, rankings in (observed or {}).items():
+        checks.append(_compare(name, reference, rankings))
+
+    return {
+        'candidates': len(resumes),
+        'jobs': len(jobs),
+        'fingerprint': fingerprint(reference),
+        'passed': all(check['mismatches'] == 0 for check in checks),
+        'checks': checks
+    }
@@ -0,0 +1,453 @@
+"""
+Load generator: concurrent clients driving a request mix against the app.
+
+Targets:
+
+- ``inprocess``: the app imported in a child process and driven through one
+  Flask test client per thread, so the numbers include Python-level
+  contention (GIL, SQLite locks) but no HTTP server
+- ``gunicorn`` / ``werkzeug``: the app served on a free localhost port from
+  a scratch directory, once per point of the worker x thread sweep
+  (werkzeug serves one process with a thread per request, so it only sweeps
+  client concurrency)
+- an ``http://`` URL: an already running server, driven as is
+
+Each point starts from a fresh database seeded with corpus resumes and jobs,
+then every client thread picks requests from the weighted mix until the
+duration is up. Per endpoint the report has throughput, p50/p95/p99 latency,
+errors by status, and responses that failed with "database is locked".
+"""
+import argparse
+import http.client
+import itertools
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from .corpus import load_corpus
+from .e2e import REPO_ROOT
+from .timing import summarize
+
+DEFAULT_MIX = {
+    'upload_resume': 1,
+    'upload_job_description': 1,
+    'match_candidates': 6,
+    'match_jobs': 2,
+    'dashboard': 2,
+    'download_results': 1
+}
+SERVERS = ('gunicorn', 'werkzeug')
+LOCKED = b'database is locked'
+SERVER_START_TIMEOUT = 60.0
+
+
+def parse_mix(text: Optional[str]) -> Dict[str, int]:
+    """'match_candidates=6,dashboard=2' -> weights; unnamed endpoints get no traffic"""
+    if not text:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for item in text.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise ValueError(f'Unknown endpoint {name!r}; choose from {", ".join(DEFAULT_MIX)}')
+        mix[name] = int(weight or 1)
+    if not any(mix.values()):
+        raise ValueError('The request mix needs at least one positive weight')
+    return mix
+
+
+def encode_multipart(fields: Dict[str, str], file_field: str, filename: str, content: bytes):
+    """(body, content type) of a multipart/form-data request with one file"""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{file_field}"; filename="{filename}"\r\n'
+                 f'Content-Type: application/octet-stream\r\n\r\n'.encode())
+    parts.append(content)
+    parts.append(f'\r\n--{boundary}--\r\n'.encode())
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+class InProcessTransport:
+    """One Flask test client per thread against the app imported here"""
+
+    def __init__(self, flask_app):
+        self.app = flask_app
+        self._local = threading.local()
+
+    def send(self, method: str, path: str, body: bytes = b'', content_type: Optional[str] = None):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.open(path, method=method, data=body, content_type=content_type)
+        return response.status_code, response.get_data()
+
+    def close(self):
+        pass
+
+
+class HttpTransport:
+    """One keep-alive HTTP connection per thread"""
+
+    def __init__(self, base_url: str, timeout: float = 120.0):
+        parsed = urlparse(base_url)
+        self.host = parsed.hostname
+        self.port = parsed.port or 80
+        self.prefix = parsed.path.rstrip('/')
+        self.timeout = timeout
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def send(self, method: str, path: str, body: bytes = b'', content_type: Optional[str] = None):
+        headers = {'Content-Type': content_type} if content_type else {}
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request(method, self.prefix + path, body=body or None, headers=headers)
+                response = conn.getresponse()
+                return response.status, response.read()
+            except (http.client.HTTPException, ConnectionError):
+                # The server closed a kept-alive connection; retry once on a new one
+                conn.close()
+                self._local.conn = None
+                if attempt:
+                    raise
+
+    def close(self):
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+
+
+class _Stats:
+    """Latencies and failures of one endpoint, shared by all client threads"""
+
+    def __init__(self):
+        self.seconds: List[float] = []
+        self.statuses: Dict[str, int] = {}
+        self.errors = 0
+        self.locked = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, status, body: bytes):
+        locked = LOCKED in body
+        with self._lock:
+            self.seconds.append(seconds)
+            self.statuses[str(status)] = self.statuses.get(str(status), 0) + 1
+            # Pages that render their error still count when the database was locked
+            if locked or not isinstance(status, int) or status >= 400:
+                self.errors += 1
+            if locked:
+                self.locked += 1
+
+    def summary(self, duration: float) -> Dict:
+        result = summarize(self.seconds)
+        result['ops_per_s'] = round(len(self.seconds) / duration, 2) if duration else 0.0
+        result.update(errors=self.errors, error_rate=round(self.errors / len(self.seconds), 4) if self.seconds else 0.0,
+                      locked=self.locked, statuses=self.statuses)
+        return result
+
+
+class LoadGenerator:
+    """Seeds a target and drives the request mix from concurrent client threads"""
+
+    def __init__(self, transport, corpus: Dict, mix: Dict[str, int], top_k: int = 20, seed: int = 7):
+        self.transport = transport
+        self.corpus = corpus
+        self.mix = mix
+        self.top_k = top_k
+        self.seed = seed
+        self.job_ids: List[int] = []
+        self.candidate_ids: List[int] = []
+        self._resumes = itertools.cycle(corpus['entries'])
+        self._jobs = itertools.cycle(corpus['job_rows'])
+        self._files: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def _next(self, iterator):
+        with self._lock:
+            return next(iterator)
+
+    def _resume_body(self, entry: Dict):
+        content = self._files.get(entry['file'])
+        if content is None:
+            with open(os.path.join(self.corpus['root'], entry['file']), 'rb') as f:
+                content = self._files[entry['file']] = f.read()
+        return encode_multipart({'name': entry['name']}, 'resume', os.path.basename(entry['file']), content)
+
+    def _upload_resume(self, rng):
+        body, content_type = self._resume_body(self._next(self._resumes))
+        status, payload = self.transport.send('POST', '/upload_resume', body, content_type)
+        if status == 200:
+            candidate_id = json.loads(payload)['candidate_id']
+            with self._lock:
+                self.candidate_ids.append(candidate_id)
+        return status, payload
+
+    def _upload_job_description(self, rng):
+        body = json.dumps(self._next(self._jobs)).encode()
+        status, payload = self.transport.send('POST', '/upload_job_description', body, 'application/json')
+        if status == 200:
+            job_id = json.loads(payload)['job_id']
+            with self._lock:
+                self.job_ids.append(job_id)
+        return status, payload
+
+    def _match_candidates(self, rng):
+        return self.transport.send('GET', f'/match_candidates/{rng.choice(self.job_ids)}?top_k={self.top_k}')
+
+    def _match_jobs(self, rng):
+        return self.transport.send('GET', f'/match_jobs/{rng.choice(self.candidate_ids)}?top_k={self.top_k}')
+
+    def _dashboard(self, rng):
+        return self.transport.send('GET', '/dashboard')
+
+    def _download_results(self, rng):
+        return self.transport.send('GET', f'/download_results/{rng.choice(self.job_ids)}')
+
+    def seed_target(self, resumes: int, jobs: int):
+        """Upload the first corpus resumes and bulk-import jobs before the timed run"""
+        for _ in range(min(resumes, len(self.corpus['entries']))):
+            status, payload = self._upload_resume(None)
+            if status != 200:
+                raise RuntimeError(f'Seeding a resume failed with {status}: {payload[:200]!r}')
+        rows = [self._next(self._jobs) for _ in range(jobs)]
+        body = '\n'.join(json.dumps(row) for row in rows).encode()
+        status, payload = self.transport.send('POST', '/upload_job_descriptions?format=jsonl', body,
+                                              'application/x-ndjson')
+        if status != 200:
+            raise RuntimeError(f'Seeding jobs failed with {status}: {payload[:200]!r}')
+        self.job_ids.extend(result['job_id'] for result in json.loads(payload)['results'] if result['success'])
+        if not self.job_ids or not self.candidate_ids:
+            raise RuntimeError('Seeding needs at least one resume and one job')
+
+    def run(self, concurrency: int, duration: float) -> Dict:
+        """Drive the mix from ``concurrency`` threads for ``duration`` seconds"""
+        names = [name for name, weight in self.mix.items() if weight > 0]
+        weights = [self.mix[name] for name in names]
+        stats = {name: _Stats() for name in names}
+        handlers = {name: getattr(self, f'_{name}') for name in names}
+        deadline = time.perf_counter() + duration
+
+        def client(number):
+            rng = random.Random(f'{self.seed}-{number}')
+            clock = time.perf_counter
+            while clock() < deadline:
+                name = rng.choices(names, weights)[0]
+                started = clock()
+                try:
+                    status, body = handlers[name](rng)
+                except (OSError, http.client.HTTPException) as e:
+                    status, body = type(e).__name__, str(e).encode()
+                stats[name].record(clock() - started, status, body)
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=client, args=(number,), daemon=True) for number in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        endpoints = {name: stat.summary(elapsed) for name, stat in stats.items() if stat.seconds}
+        overall = summarize([seconds for stat in stats.values() for seconds in stat.seconds])
+        requests = overall['calls']
+        errors = sum(stat.errors for stat in stats.values())
+        return {
+            'concurrency': concurrency,
+            'seconds': round(elapsed, 3),
+            'requests': requests,
+            'throughput': round(requests / elapsed, 2) if elapsed else 0.0,
+            'errors': errors,
+            'error_rate': round(errors / requests, 4) if requests else 0.0,
+            'locked': sum(stat.locked for stat in stats.values()),
+            'p50_ms': overall['p50_ms'],
+            'p95_ms': overall['p95_ms'],
+            'p99_ms': overall['p99_ms'],
+            'endpoints': endpoints
+        }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _child_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [REPO_ROOT, env.get('PYTHONPATH')]))
+    return env
+
+
+def _wait_until_up(base_url: str, process: subprocess.Popen):
+    transport = HttpTransport(base_url, timeout=5.0)
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    try:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f'Server exited with {process.returncode} before accepting requests')
+            try:
+                if transport.send('GET', '/metrics')[0] == 200:
+                    return
+            except OSError:
+                pass
+            time.sleep(0.25)
+        raise RuntimeError(f'Server did not start within {SERVER_START_TIMEOUT:.0f}s')
+    finally:
+        transport.close()
+
+
+def _stop_server(process: subprocess.Popen):
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+    except ProcessLookupError:
+        pass
+
+
+def _server_command(server: str, port: int, workers: int, threads: int) -> List[str]:
+    if server == 'gunicorn':
+        return [sys.executable, '-m', 'gunicorn', 'app:app', '--bind', f'127.0.0.1:{port}',
+                '--workers', str(workers), '--threads', str(threads), '--timeout', '300', '--log-level', 'warning']
+    return [sys.executable, '-m', 'benchmarks.load', '--serve', str(port)]
+
+
+def run_point(corpus_dir: str, target: str, concurrency: int, duration: float, mix: Dict[str, int],
+              seed_resumes: int = 100, seed_jobs: int = 10, workers: int = 1, threads: int = 1,
+              top_k: int = 20) -> Dict:
+    """One load run against a fresh target; see the module docstring for targets"""
+    corpus_dir = os.path.abspath(corpus_dir)
+    point = {'target': target, 'workers': workers, 'threads': threads}
+    with tempfile.TemporaryDirectory() as scratch:
+        if target == 'inprocess':
+            out = os.path.join(scratch, 'load.json')
+            subprocess.run(
+                [sys.executable, '-m', 'benchmarks.load', '--corpus', corpus_dir, '--concurrency', str(concurrency),
+                 '--duration', str(duration), '--mix', ','.join(f'{k}={v}' for k, v in mix.items()),
+                 '--seed-resumes', str(seed_resumes), '--seed-jobs', str(seed_jobs), '--top-k', str(top_k),
+                 '--json-out', out],
+                cwd=scratch, env=_child_env(), check=True
+            )
+            with open(out) as f:
+                point.update(json.load(f))
+            return point
+
+        process = None
+        if target in SERVERS:
+            port = _free_port()
+            base_url = f'http://127.0.0.1:{port}'
+            # Own process group, so stopping it also stops workers and their extraction processes
+            process = subprocess.Popen(_server_command(target, port, workers, threads), cwd=scratch,
+                                       env=_child_env(), start_new_session=True)
+        else:
+            base_url = target
+        transport = HttpTransport(base_url)
+        try:
+            if process is not None:
+                _wait_until_up(base_url, process)
+            generator = LoadGenerator(transport, load_corpus(corpus_dir), mix, top_k)
+            generator.seed_target(seed_resumes, seed_jobs)
+            point.update(generator.run(concurrency, duration))
+        finally:
+            transport.close()
+            if process is not None:
+                _stop_server(process)
+        return point
+
+
+def run_sweep(corpus_dir: str, target: str, concurrency: List[int], workers: List[int], threads: List[int],
+              duration: float, mix: Dict[str, int], progress=None, **kwargs) -> List[Dict]:
+    """Every workers x threads x concurrency combination the target supports"""
+    if target != 'gunicorn':
+        # Only gunicorn has worker and thread settings to sweep
+        workers, threads = [1], [1]
+    points = []
+    for worker_count, thread_count, clients in itertools.product(workers, threads, concurrency):
+        if progress is not None:
+            progress(f'workers={worker_count} threads={thread_count} concurrency={clients}')
+        points.append(run_point(corpus_dir, target, clients, duration, mix, workers=worker_count,
+                                threads=thread_count, **kwargs))
+    return points
+
+
+def format_points(points: List[Dict]) -> str:
+    """Throughput, tail latency and failures per sweep point and endpoint"""
+    lines = [f"{'workers':>7} {'threads':>7} {'clients':>7} {'endpoint':<24} {'req/s':>8} {'p50 ms':>9} "
+             f"{'p95 ms':>9} {'p99 ms':>9} {'err %':>6} {'locked':>6}"]
+    for point in points:
+        rows = [('all', dict(point, ops_per_s=point['throughput']))] + sorted(point['endpoints'].items())
+        for name, summary in rows:
+            lines.append(
+                f"{point['workers']:>7} {point['threads']:>7} {point['concurrency']:>7} {name:<24} "
+                f"{summary['ops_per_s']:>8.2f} {summary.get('p50_ms', 0):>9.1f} {summary.get('p95_ms', 0):>9.1f} "
+                f"{summary.get('p99_ms', 0):>9.1f} {summary['error_rate'] * 100:>6.1f} {summary['locked']:>6}"
+            )
+    return '\n'.join(lines)
+
+
+def _serve(port: int):
+    import logging
+
+    from werkzeug.serving import make_server
+
+    import app as screener
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    make_server('127.0.0.1', port, screener.app, threaded=True).serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load generator child process; run from a scratch directory')
+    parser.add_argument('--serve', type=int, help='Serve the app with werkzeug on this port')
+    parser.add_argument('--corpus')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=30.0)
+    parser.add_argument('--mix')
+    parser.add_argument('--seed-resumes', type=int, default=100)
+    parser.add_argument('--seed-jobs', type=int, default=10)
+    parser.add_argument('--top-k', type=int, default=20)
+    parser.add_argument('--json-out')
+    args = parser.parse_args()
+
+    if args.serve:
+        _serve(args.serve)
+        return
+
+    import app as screener
+
+    generator = LoadGenerator(InProcessTransport(screener.app), load_corpus(args.corpus), parse_mix(args.mix),
+                              args.top_k)
+    generator.seed_target(args.seed_resumes, args.seed_jobs)
+    results = generator.run(args.concurrency, args.duration)
+    with open(args.json_out, 'w') as f:
+        json.dump(results, f)
+
+
+if __name__ == '__main__':
+    main()
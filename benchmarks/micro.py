@@ -0,0 +1,153 @@
+"""
+Micro-benchmarks: each processing stage timed in isolation on corpus documents.
+
+Inputs for later stages are prepared untimed from earlier ones (texts from
+extraction, Docs from spaCy, skills from extraction), so every number is the
+cost of that stage alone.
+"""
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List
+
+from .timing import time_calls
+
+CANDIDATES_SCHEMA = '''
+    CREATE TABLE candidates (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, email TEXT, phone TEXT, location TEXT,
+        experience_years INTEGER, skills TEXT, education TEXT, resume_path TEXT, uploaded_at TIMESTAMP,
+        raw_text TEXT, content_hash TEXT, skills_version TEXT
+    )
+'''
+
+CANDIDATE_INSERT = '''
+    INSERT INTO candidates
+    (name, email, phone, location, experience_years, skills, education, resume_path, uploaded_at, raw_text,
+    content_hash, skills_version)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+def _flatten(skills: Dict[str, List[str]]) -> List[str]:
+    return [skill for category_skills in skills.values() for skill in category_skills]
+
+
+def _db_benchmarks(rows: List[tuple]) -> Dict[str, Dict]:
+    """Candidate inserts with the app's triggers: one commit per row, and one bulk transaction"""
+    from utils.candidate_cache import init_pool_version
+    from utils.search import init_search_index
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ('db_insert_row', 'db_insert_batch'):
+            conn = sqlite3.connect(os.path.join(tmp, f'{name}.db'))
+            cursor = conn.cursor()
+            cursor.execute(CANDIDATES_SCHEMA)
+            init_pool_version(cursor)
+            init_search_index(cursor)
+            conn.commit()
+
+            if name == 'db_insert_row':
+                def insert(row):
+                    cursor.execute(CANDIDATE_INSERT, row)
+                    conn.commit()
+                results[name] = time_calls(insert, rows, warmup=0)
+            else:
+                # One transaction for every row, reported per row for comparison
+                started = time.perf_counter()
+                cursor.executemany(CANDIDATE_INSERT, rows)
+                conn.commit()
+                total = time.perf_counter() - started
+                results[name] = {'calls': len(rows), 'total_s': round(total, 6),
+                                 'ops_per_s': round(len(rows) / total, 2) if total else 0.0,
+                                 'mean_ms': round(total / max(len(rows), 1) * 1000, 4)}
+            conn.close()
+    return results
+
+
+def run_micro(corpus: Dict, sample: int = 200, progress=None) -> Dict[str, Dict]:
+    """Time every stage on the first ``sample`` resumes of the corpus"""
+    from utils.matcher import JobMatcher
+    from utils.scoring import ScoringPipeline
+    from utils.resume_parser import ResumeParser
+    from utils.skill_extractor import SkillExtractor
+
+    def step(name):
+        if progress is not None:
+            progress(name)
+
+    parser = ResumeParser()
+    extractor = SkillExtractor()
+    matcher = JobMatcher()
+    entries = corpus['entries'][:sample]
+    paths = {entry['file']: os.path.join(corpus['root'], entry['file']) for entry in entries}
+    results = {}
+
+    step('extraction')
+    pdfs = [paths[entry['file']] for entry in entries if entry['type'] == 'pdf']
+    docxs = [paths[entry['file']] for entry in entries if entry['type'] == 'docx']
+    if pdfs:
+        results['extract_pdf'] = time_calls(parser.extract_text_from_pdf, pdfs)
+    if docxs:
+        results['extract_docx'] = time_calls(parser.extract_text_from_docx, docxs)
+
+    texts = [parser.extract_text(paths[entry['file']], entry['type'])[0] for entry in entries]
+    jobs = corpus['job_rows']
+    job_texts = [job['description'] for job in jobs]
+
+    step('spacy')
+    results['spacy'] = time_calls(extractor.nlp, texts)
+    docs = [extractor.nlp(text) for text in texts]
+    pairs = list(zip(texts, docs))
+
+    step('skill extraction')
+    results['skills_keyword'] = time_calls(extractor.extract_skills_keyword_matching, texts)
+    results['skills_ner'] = time_calls(lambda pair: extractor.extract_skills_ner(*pair), pairs)
+    results['skills_context'] = time_calls(extractor.extract_skills_context, texts)
+    results['skills_section'] = time_calls(extractor.extract_skills_section_based, texts)
+    results['extract_all_skills'] = time_calls(lambda pair: extractor.extract_all_skills(*pair), pairs)
+
+    skills = [extractor.extract_all_skills(text, doc) for text, doc in pairs]
+    job_skills = [_flatten(extracted) for extracted in extractor.extract_all_skills_many(job_texts)]
+    resumes = [
+        {'experience_years': parser.extract_experience_years(text), 'skills': extracted,
+         'education': parser.extract_education(text), 'raw_text': text}
+        for text, extracted in zip(texts, skills)
+    ]
+    job_data = [dict(job, required_skills=required) for job, required in zip(jobs, job_skills)]
+    matched = [(index, index % len(jobs)) for index in range(len(resumes))]
+
+    step('scoring')
+    results['calculate_skill_match'] = time_calls(
+        lambda pair: matcher.calculate_skill_match(_flatten(skills[pair[0]]), job_skills[pair[1]]), matched)
+    results['semantic_tfidf'] = time_calls(
+        lambda pair: matcher.calculate_semantic_similarity(texts[pair[0]], job_texts[pair[1]]), matched)
+    results['build_candidate_profile'] = time_calls(matcher.build_candidate_profile, resumes)
+    profiles = [matcher.build_candidate_profile(resume) for resume in resumes]
+    job_profiles = [matcher.build_job_profile(job) for job in job_data]
+    results['semantic_terms'] = time_calls(
+        lambda pair: matcher.semantic_similarity_from_terms(profiles[pair[0]]['terms'],
+                                                            job_profiles[pair[1]]['terms']), matched)
+    results['score_profiles'] = time_calls(
+        lambda pair: matcher.score_profiles(profiles[pair[0]], job_profiles[pair[1]]), matched)
+
+    # One job against the whole sample: per-pair loop with pruning vs. the component pipeline
+    pool = list(enumerate(profiles, 1))
+    pipeline = ScoringPipeline(matcher)
+    block = pipeline.extend(None, pool)
+    results['rank_profiles_top20'] = time_calls(lambda job: matcher.rank_profiles(pool, job, 20), job_profiles)
+    results['pipeline_rank_top20'] = time_calls(lambda job: pipeline.rank(job, block, 20), job_profiles)
+
+    step('database')
+    now = datetime.now()
+    rows = [
+        (entry['name'], None, None, None, resume['experience_years'], json.dumps(resume['skills']),
+         json.dumps(resume['education']), paths[entry['file']], now, resume['raw_text'], None,
+         extractor.taxonomy_version())
+        for entry, resume in zip(entries, resumes)
+    ]
+    results.update(_db_benchmarks(rows))
+    return results
@@ -0,0 +1,42 @@
+"""Timing helpers shared by the benchmarks"""
+import math
+import time
+from typing import Callable, Dict, Iterable, List
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted values"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(seconds: List[float]) -> Dict:
+    """Count, throughput and latency percentiles (milliseconds) of per-call timings"""
+    ordered = sorted(seconds)
+    total = sum(ordered)
+    return {
+        'calls': len(ordered),
+        'total_s': round(total, 6),
+        'ops_per_s': round(len(ordered) / total, 2) if total else 0.0,
+        'mean_ms': round(total / len(ordered) * 1000, 4) if ordered else 0.0,
+        'p50_ms': round(percentile(ordered, 0.50) * 1000, 4),
+        'p95_ms': round(percentile(ordered, 0.95) * 1000, 4),
+        'p99_ms': round(percentile(ordered, 0.99) * 1000, 4),
+        'max_ms': round(ordered[-1] * 1000, 4) if ordered else 0.0
+    }
+
+
+def time_calls(fn: Callable, inputs: Iterable, warmup: int = 2) -> Dict:
+    """Call ``fn(item)`` for every input, timing each call after a short warm-up"""
+    inputs = list(inputs)
+    for item in inputs[:warmup]:
+        fn(item)
+    seconds = []
+    clock = time.perf_counter
+    for item in inputs:
+        started = clock()
+        fn(item)
+        seconds.append(clock() - started)
+    return summarize(seconds)
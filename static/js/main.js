@@ -126,15 +126,11 @@ async function matchCandidates(jobId) {
     try {
         showLoading(true);
         
-        const response = await fetch(`/match_candidates/${jobId}`);
-        const result = await response.json();
-        
-        if (result.success) {
-            displayMatchResults(result.matches, result.job);
-            showNotification('Candidates matched successfully!', 'success');
-        } else {
-            showNotification('Error matching candidates: ' + result.error, 'error');
-        }
+        // Only the first page is awaited; the list loads the rest as it scrolls
+        const list = new MatchList(jobId);
+        const firstPage = await list.fetchPage(0);
+        displayMatchResults(list, firstPage.job);
+        showNotification('Candidates matched successfully!', 'success');
         
     } catch (error) {
         showNotification('Error matching candidates: ' + error.message, 'error');
@@ -201,108 +197,303 @@ function displayJobResults(extractedSkills) {
     resultsDiv.classList.remove('hidden');
 }
 
-function displayMatchResults(matches, job) {
+function displayMatchResults(list, job) {
     const matchSection = document.getElementById('matchSection');
     const resultsDiv = document.getElementById('matchResults');
     
     let html = `
         <div class="mb-6 p-4 bg-blue-50 rounded-lg">
             <h3 class="text-lg font-semibold text-blue-800">
-                ${job.title} at ${job.company}
+                ${escapeHtml(job.title)} at ${escapeHtml(job.company)}
             </h3>
-            <p class="text-blue-600">Found ${matches.length} candidates</p>
+            <p class="text-blue-600">Found ${list.total} candidates</p>
         </div>
     `;
     
-    if (matches.length === 0) {
+    if (list.total === 0) {
         html += `
             <div class="text-center py-12">
                 <i class="fas fa-users-slash text-6xl text-gray-300 mb-4"></i>
                 <p class="text-gray-500">No candidates found. Upload some resumes first!</p>
             </div>
         `;
+        resultsDiv.innerHTML = html;
     } else {
-        html += '<div class="space-y-4">';
-        
-        matches.forEach((match, index) => {
-            const candidate = match.candidate;
-            const result = match.match_result;
-            
-            const scoreColor = result.overall_score >= 80 ? 'green' : 
-                             result.overall_score >= 60 ? 'yellow' : 'red';
-            
-            html += `
-                <div class="border border-gray-200 rounded-lg p-4 hover:shadow-md transition-shadow">
-                    <div class="flex justify-between items-start mb-3">
-                        <div>
-                            <h4 class="text-lg font-semibold text-gray-800">${candidate.name}</h4>
-                            <p class="text-gray-600">${candidate.email || 'No email'}</p>
-                            <p class="text-sm text-gray-500">${candidate.location || 'Location not specified'}</p>
-                        </div>
-                        <div class="text-right">
-                            <div class="text-2xl font-bold text-${scoreColor}-600 mb-1">
-                                ${result.overall_score}%
-                            </div>
-                            <div class="text-sm text-gray-500">Overall Match</div>
-                        </div>
-                    </div>
-                    
-                    <div class="grid grid-cols-2 md:grid-cols-4 gap-4 mb-4">
-                        <div class="text-center">
-                            <div class="text-lg font-semibold text-blue-600">${result.skill_match.score * 100}%</div>
-                            <div class="text-xs text-gray-500">Skills</div>
-                        </div>
-                        <div class="text-center">
-                            <div class="text-lg font-semibold text-purple-600">${result.semantic_score}%</div>
-                            <div class="text-xs text-gray-500">Semantic</div>
-                        </div>
-                        <div class="text-center">
-                            <div class="text-lg font-semibold text-orange-600">${result.experience_score}%</div>
-                            <div class="text-xs text-gray-500">Experience</div>
-                        </div>
-                        <div class="text-center">
-                            <div class="text-lg font-semibold text-teal-600">${result.education_score}%</div>
-                            <div class="text-xs text-gray-500">Education</div>
-                        </div>
-                    </div>
-                    
-                    <div class="border-t pt-3">
-                        <div class="grid md:grid-cols-2 gap-4">
-                            <div>
-                                <h5 class="font-semibold text-green-700 mb-2">Matched Skills:</h5>
-                                <div class="flex flex-wrap gap-1">
-            `;
-            
-            result.skill_match.matched_skills.forEach(skill => {
-                html += `<span class="px-2 py-1 bg-green-100 text-green-700 rounded text-xs">${skill}</span>`;
-            });
-            
-            html += `
-                                </div>
-                            </div>
-                            <div>
-                                <h5 class="font-semibold text-red-700 mb-2">Missing Skills:</h5>
-                                <div class="flex flex-wrap gap-1">
-            `;
-            
-            result.skill_match.missing_skills.forEach(skill => {
-                html += `<span class="px-2 py-1 bg-red-100 text-red-700 rounded text-xs">${skill}</span>`;
+        html += '<div id="matchList"></div>';
+        resultsDiv.innerHTML = html;
+        list.mount(document.getElementById('matchList'));
+    }
+    
+    matchSection.classList.remove('hidden');
+}
+
+// ------------------------
+// Virtualized match list
+// ------------------------
+const MATCH_PAGE_SIZE = 100;
+const MATCH_ROW_HEIGHT = 150;
+const MATCH_DETAIL_HEIGHT = 230;
+const MATCH_OVERSCAN = 4;
+
+class MatchList {
+    // Ranked matches of one job, fetched a page at a time from /match_candidates.
+    // Only the rows in view (plus a few around them) exist in the DOM; a row's
+    // full breakdown is fetched from /match_detail when it is first expanded.
+    constructor(jobId, params = {}) {
+        this.jobId = jobId;
+        this.params = params;
+        this.total = 0;
+        this.rows = new Map();
+        this.pages = new Map();
+        this.details = new Map();
+        this.expanded = [];
+        this.viewport = null;
+        this.frame = null;
+    }
+    
+    fetchPage(page) {
+        if (!this.pages.has(page)) {
+            const query = new URLSearchParams(Object.assign({}, this.params, {
+                top_k: MATCH_PAGE_SIZE,
+                offset: page * MATCH_PAGE_SIZE
+            }));
+            const request = fetch(`/match_candidates/${this.jobId}?${query}`)
+                .then(response => response.json())
+                .then(result => {
+                    if (!result.success) {
+                        throw new Error(result.error);
+                    }
+                    this.total = result.total;
+                    result.matches.forEach((row, index) => {
+                        const match = {};
+                        result.columns.forEach((column, position) => { match[column] = row[position]; });
+                        this.rows.set(result.offset + index, match);
+                    });
+                    this.scheduleRender();
+                    return result;
+                })
+                .catch(error => {
+                    // Forget the failed page so scrolling back to it retries
+                    this.pages.delete(page);
+                    throw error;
+                });
+            this.pages.set(page, request);
+        }
+        return this.pages.get(page);
+    }
+    
+    mount(container) {
+        container.innerHTML = `
+            <div class="match-viewport border border-gray-200 rounded-lg" style="height: 70vh; overflow-y: auto;">
+                <div class="match-spacer" style="position: relative;"></div>
+            </div>
+        `;
+        this.viewport = container.querySelector('.match-viewport');
+        this.spacer = container.querySelector('.match-spacer');
+        this.viewport.addEventListener('scroll', () => this.scheduleRender());
+        this.spacer.addEventListener('click', event => this.handleClick(event));
+        this.render();
+    }
+    
+    scheduleRender() {
+        if (this.viewport && this.frame === null) {
+            this.frame = requestAnimationFrame(() => {
+                this.frame = null;
+                this.render();
             });
-            
-            html += `
-                                </div>
-                            </div>
-                        </div>
-                    </div>
+        }
+    }
+    
+    expandedBefore(index) {
+        // Number of expanded rows above a row; this.expanded is kept sorted
+        let low = 0;
+        let high = this.expanded.length;
+        while (low < high) {
+            const middle = (low + high) >> 1;
+            if (this.expanded[middle] < index) {
+                low = middle + 1;
+            } else {
+                high = middle;
+            }
+        }
+        return low;
+    }
+    
+    rowTop(index) {
+        return index * MATCH_ROW_HEIGHT + this.expandedBefore(index) * MATCH_DETAIL_HEIGHT;
+    }
+    
+    firstRowBelow(offset) {
+        // First row whose bottom edge is below a scroll offset
+        let low = 0;
+        let high = this.total;
+        while (low < high) {
+            const middle = (low + high) >> 1;
+            if (this.rowTop(middle + 1) <= offset) {
+                low = middle + 1;
+            } else {
+                high = middle;
+            }
+        }
+        return low;
+    }
+    
+    render() {
+        if (!this.viewport) {
+            return;
+        }
+        this.spacer.style.height = `${this.rowTop(this.total)}px`;
+        
+        const top = this.viewport.scrollTop;
+        const bottom = top + this.viewport.clientHeight;
+        const start = Math.max(0, this.firstRowBelow(top) - MATCH_OVERSCAN);
+        const end = Math.min(this.total, this.firstRowBelow(bottom) + 1 + MATCH_OVERSCAN);
+        
+        let html = '';
+        for (let index = start; index < end; index++) {
+            const match = this.rows.get(index);
+            if (match) {
+                html += this.renderRow(match, index);
+            } else {
+                html += `
+                    <div style="position: absolute; top: ${this.rowTop(index)}px; left: 0; right: 0; height: ${MATCH_ROW_HEIGHT}px;"
+                         class="p-4 text-gray-400">Loading candidate ${index + 1}...</div>
+                `;
+                this.fetchPage(Math.floor(index / MATCH_PAGE_SIZE))
+                    .catch(error => showNotification('Error loading candidates: ' + error.message, 'error'));
+            }
+        }
+        this.spacer.innerHTML = html;
+    }
+    
+    renderRow(match, index) {
+        const expanded = this.expandedBefore(index + 1) > this.expandedBefore(index);
+        const height = MATCH_ROW_HEIGHT + (expanded ? MATCH_DETAIL_HEIGHT : 0);
+        const scoreColor = match.overall_score >= 80 ? 'green' : 
+                         match.overall_score >= 60 ? 'yellow' : 'red';
+        
+        let detail = '';
+        if (expanded) {
+            const loaded = this.details.get(match.id);
+            detail = `
+                <div class="match-detail border-t pt-3 overflow-y-auto" style="height: ${MATCH_DETAIL_HEIGHT - 16}px;">
+                    ${loaded ? renderMatchDetail(loaded) : '<p class="text-gray-500 text-sm">Loading details...</p>'}
                 </div>
             `;
-        });
+        }
         
-        html += '</div>';
+        return `
+            <div style="position: absolute; top: ${this.rowTop(index)}px; left: 0; right: 0; height: ${height}px;"
+                 class="border-b border-gray-200 px-4 pt-3 bg-white hover:bg-gray-50">
+                <div class="flex justify-between items-start mb-2">
+                    <div>
+                        <h4 class="text-lg font-semibold text-gray-800">${index + 1}. ${escapeHtml(match.name)}</h4>
+                        <p class="text-sm text-gray-600">
+                            ${escapeHtml(match.email || 'No email')} · ${escapeHtml(match.location || 'Location not specified')}
+                        </p>
+                    </div>
+                    <div class="text-right">
+                        <div class="text-2xl font-bold text-${scoreColor}-600">${match.overall_score}%</div>
+                        <div class="text-xs text-gray-500">Overall Match</div>
+                    </div>
+                </div>
+                
+                <div class="grid grid-cols-4 gap-4 mb-2 text-center">
+                    <div><span class="font-semibold text-blue-600">${match.skill_score}%</span> <span class="text-xs text-gray-500">Skills</span></div>
+                    <div><span class="font-semibold text-purple-600">${match.semantic_score}%</span> <span class="text-xs text-gray-500">Semantic</span></div>
+                    <div><span class="font-semibold text-orange-600">${match.experience_score}%</span> <span class="text-xs text-gray-500">Experience</span></div>
+                    <div><span class="font-semibold text-teal-600">${match.education_score}%</span> <span class="text-xs text-gray-500">Education</span></div>
+                </div>
+                
+                <div class="flex justify-between items-center text-sm pb-2">
+                    <span class="text-gray-600">
+                        <span class="text-green-700">${match.matched_skill_count} matched</span> ·
+                        <span class="text-yellow-700">${match.partial_skill_count} partial</span> ·
+                        <span class="text-red-700">${match.missing_skill_count} missing</span>
+                        of ${match.required_skill_count} required skills
+                    </span>
+                    <button class="match-detail-toggle text-blue-600 hover:text-blue-800" data-index="${index}">
+                        ${expanded ? 'Hide details' : 'Show details'}
+                    </button>
+                </div>
+                ${detail}
+            </div>
+        `;
     }
     
-    resultsDiv.innerHTML = html;
-    matchSection.classList.remove('hidden');
+    handleClick(event) {
+        const button = event.target.closest('.match-detail-toggle');
+        if (!button) {
+            return;
+        }
+        const index = parseInt(button.dataset.index, 10);
+        const position = this.expandedBefore(index);
+        if (this.expanded[position] === index) {
+            this.expanded.splice(position, 1);
+        } else {
+            this.expanded.splice(position, 0, index);
+            this.loadDetail(this.rows.get(index).id);
+        }
+        this.render();
+    }
+    
+    async loadDetail(candidateId) {
+        // The full breakdown is only fetched the first time a row is opened
+        if (this.details.has(candidateId)) {
+            return;
+        }
+        try {
+            const response = await fetch(`/match_detail/${this.jobId}/${candidateId}`);
+            const result = await response.json();
+            if (!result.success) {
+                throw new Error(result.error);
+            }
+            this.details.set(candidateId, result);
+            this.scheduleRender();
+        } catch (error) {
+            showNotification('Error loading details: ' + error.message, 'error');
+        }
+    }
+}
+
+function renderMatchDetail(detail) {
+    const skillMatch = detail.match_result.skill_match;
+    const candidate = detail.candidate;
+    const chips = (skills, color) => skills.map(skill =>
+        `<span class="px-2 py-1 bg-${color}-100 text-${color}-700 rounded text-xs">${escapeHtml(skill)}</span>`
+    ).join('');
+    const contact = candidate.email
+        ? `<a href="mailto:${encodeURIComponent(candidate.email)}" class="text-green-700 hover:text-green-900"><i class="fas fa-envelope mr-1"></i>Contact</a>`
+        : '';
+    
+    return `
+        <div class="flex justify-between items-start mb-2">
+            <p class="text-gray-700">${escapeHtml(detail.explanation)}</p>
+            <div class="text-sm whitespace-nowrap ml-4">${contact}</div>
+        </div>
+        <p class="text-sm text-gray-500 mb-3">
+            ${candidate.experience_years} years experience${candidate.phone ? ' · ' + escapeHtml(candidate.phone) : ''}
+        </p>
+        <div class="grid md:grid-cols-2 gap-4">
+            <div>
+                <h5 class="font-semibold text-green-700 mb-2">Matched Skills:</h5>
+                <div class="flex flex-wrap gap-1">${chips(skillMatch.matched_skills, 'green')}</div>
+            </div>
+            <div>
+                <h5 class="font-semibold text-red-700 mb-2">Missing Skills:</h5>
+                <div class="flex flex-wrap gap-1">${chips(skillMatch.missing_skills, 'red')}</div>
+            </div>
+        </div>
+    `;
+}
+
+function escapeHtml(text) {
+    return String(text === null || text === undefined ? '' : text)
+        .replace(/&/g, '&amp;')
+        .replace(/</g, '&lt;')
+        .replace(/>/g, '&gt;')
+        .replace(/"/g, '&quot;')
+        .replace(/'/g, '&#39;');
 }
 
 function downloadResults() {
@@ -0,0 +1,119 @@
+import json
+import os
+import random
+import sqlite3
+import tempfile
+
+from test_matcher import JOB, SKILLS, WORDS, create_pool, make_candidates
+from utils.batch import BackgroundBatch, BatchError, run_batch, tile_size_for
+from utils.job_index import init_job_version
+from utils.matcher import JobMatcher
+from utils.reprocess import init_reprocess_schema
+
+
+def batch_pool(db_path, candidates, jobs):
+    """A candidate pool plus the job and match tables batch matching writes to"""
+    create_pool(db_path, candidates)
+    conn = sqlite3.connect(db_path)
+    conn.execute('''
+        CREATE TABLE job_descriptions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT, company TEXT, description TEXT,
+            required_skills TEXT, required_experience INTEGER, education_requirements TEXT,
+            created_at TIMESTAMP
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE matches (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, candidate_id INTEGER, job_id INTEGER,
+            overall_score REAL, skill_score REAL, experience_score REAL, education_score REAL,
+            semantic_score REAL, matched_skills TEXT, missing_skills TEXT, created_at TIMESTAMP
+        )
+    ''')
+    init_job_version(conn.cursor())
+    for job in jobs:
+        conn.execute(
+            'INSERT INTO job_descriptions (title, company, description, required_skills, '
+            'required_experience, education_requirements) VALUES (?, ?, ?, ?, ?, ?)',
+            (job['title'], job['company'], job['description'], json.dumps(job['required_skills']),
+             job['required_experience'], json.dumps(job['education_requirements']))
+        )
+    init_reprocess_schema(conn.cursor())
+    conn.commit()
+    conn.close()
+
+
+def test_batch_scores_equal_pairwise_scoring():
+    print("🧪 Testing all-pairs batch matching...")
+    matcher = JobMatcher()
+    rng = random.Random(5)
+    jobs = [dict(JOB, description=' '.join(rng.choice(WORDS) for _ in range(rng.randint(0, 60))),
+                 required_skills=rng.sample(SKILLS + ['ml', 'React'], rng.randint(0, 4)),
+                 required_experience=rng.randint(0, 8),
+                 education_requirements=rng.choice([[], ['bachelor degree'], ['master', 'phd']]))
+            for _ in range(12)]
+    candidates = make_candidates(30)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'candidates.db')
+        batch_pool(db_path, candidates, jobs)
+
+        stats = run_batch(db_path, matcher, tile_size=7)
+        assert stats['pairs'] == len(candidates) * len(jobs) and stats['tiles'] == 5
+
+        # A job subset is scored on its own and sized by its own job count
+        subset = run_batch(db_path, matcher, job_ids=[9, 2, 5, 404])
+        assert subset['jobs'] == 3 and subset['pairs'] == len(candidates) * 3
+        assert subset['tile_size'] == tile_size_for(3, 64 * 1024 * 1024) > tile_size_for(len(jobs), 64 * 1024 * 1024)
+
+        conn = sqlite3.connect(db_path)
+        rows = conn.execute('SELECT candidate_id, job_id, overall_score, skill_score, experience_score, '
+                            'education_score, semantic_score, matched_skills, missing_skills '
+                            'FROM matches ORDER BY candidate_id, job_id').fetchall()
+        conn.close()
+        assert len(rows) == stats['pairs'] + subset['pairs']
+
+        job_profiles = [matcher.build_job_profile(job) for job in jobs]
+        for candidate_id, job_id, overall, skill, experience, education, semantic, matched, missing in rows:
+            profile = matcher.build_candidate_profile(candidates[candidate_id - 1])
+            expected = matcher.score_profiles(profile, job_profiles[job_id - 1])
+            assert (overall, experience, education, semantic) == (
+                expected['overall_score'], expected['experience_score'], expected['education_score'],
+                expected['semantic_score']), (candidate_id, job_id)
+            assert abs(skill - expected['skill_match']['score'] * 100) < 1e-9
+            assert json.loads(matched) == expected['skill_match']['matched_skills']
+            assert json.loads(missing) == expected['skill_match']['missing_skills']
+
+    print("✅ Batch scores equal pairwise scoring")
+
+
+def test_batch_rejects_bad_arguments():
+    print("🧪 Testing batch argument validation...")
+    matcher = JobMatcher()
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'candidates.db')
+        batch_pool(db_path, make_candidates(5), [JOB])
+
+        background = BackgroundBatch(db_path, matcher)
+        for job_ids, tile_size in ((None, 0), (None, -3), (None, True), (None, '50'), (None, 2.5),
+                                   (None, 10 ** 9), ('1', None), ([1, 'two'], None), ([True], None)):
+            for start in (lambda: run_batch(db_path, matcher, job_ids, tile_size),
+                          lambda: background.start(job_ids, tile_size)):
+                try:
+                    start()
+                    assert False, (job_ids, tile_size)
+                except BatchError:
+                    pass
+        assert not background.running and background.status()['run'] is None
+
+        assert background.start([1], 2)
+        background.join(30)
+        run = background.status()['run']
+        assert not background.status()['running'] and run['error'] is None and run['finished_at']
+        assert run['stats']['pairs'] == 5 and run['stats']['tiles'] == 3
+
+    print("✅ Bad job ids and tile sizes are rejected before any work starts")
+
+
+if __name__ == "__main__":
+    test_batch_scores_equal_pairwise_scoring()
+    test_batch_rejects_bad_arguments()
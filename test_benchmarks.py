@@ -0,0 +1,83 @@
+import filecmp
+import io
+import os
+import tempfile
+
+from benchmarks.corpus import generate_corpus, load_corpus, make_resume
+from benchmarks.equivalence import fingerprint
+from benchmarks.load import DEFAULT_MIX, encode_multipart, parse_mix
+from utils.resume_parser import ResumeParser
+from utils.uploads import receive_upload
+
+TAXONOMY = {
+    'programming_languages': ['python', 'java', 'go', 'rust', 'kotlin'],
+    'databases': ['postgresql', 'mongodb', 'redis', 'sqlite'],
+    'cloud_platforms': ['aws', 'docker', 'kubernetes', 'terraform']
+}
+
+
+def test_seeded_corpus():
+    print("🧪 Testing seeded benchmark corpus...")
+    with tempfile.TemporaryDirectory() as tmp:
+        first = generate_corpus(os.path.join(tmp, 'a'), resumes=6, jobs=3, seed=11, docx_share=0.5,
+                                taxonomy=TAXONOMY)
+        second = generate_corpus(os.path.join(tmp, 'b'), resumes=6, jobs=3, seed=11, docx_share=0.5,
+                                 taxonomy=TAXONOMY)
+        assert first == second
+        assert {entry['type'] for entry in first['entries']} == {'pdf', 'docx'}
+
+        # Document N does not depend on the corpus size
+        assert make_resume(11, 4, TAXONOMY) == make_resume(11, 4, TAXONOMY)
+        assert make_resume(11, 4, TAXONOMY) != make_resume(12, 4, TAXONOMY)
+
+        parser = ResumeParser()
+        for entry in first['entries']:
+            path_a = os.path.join(tmp, 'a', entry['file'])
+            if entry['type'] == 'pdf':
+                assert filecmp.cmp(path_a, os.path.join(tmp, 'b', entry['file']), shallow=False)
+            text, _ = parser.extract_text(path_a, entry['type'])
+            assert entry['name'] in text
+            for skill in entry['skills']:
+                assert skill in text.lower(), (entry['file'], skill)
+
+        corpus = load_corpus(os.path.join(tmp, 'a'))
+        assert len(corpus['job_rows']) == 3
+        assert all(row['title'] and row['description'] for row in corpus['job_rows'])
+    print("✅ Same seed gives the same corpus, and every planted skill is extractable")
+
+
+def test_ranking_fingerprint():
+    print("🧪 Testing ranking fingerprints...")
+    rankings = {1: [(3, 91.5), (1, 80.0)], 2: [(1, 70.25)]}
+    assert fingerprint(rankings) == fingerprint({2: [(1, 70.25)], 1: [(3, 91.5), (1, 80.0)]})
+    assert fingerprint(rankings) != fingerprint({1: [(1, 80.0), (3, 91.5)], 2: [(1, 70.25)]})
+    assert fingerprint(rankings) != fingerprint({1: [(3, 91.51), (1, 80.0)], 2: [(1, 70.25)]})
+    print("✅ Fingerprints follow ranking order and scores, not job order")
+
+
+def test_load_requests():
+    print("🧪 Testing load generator requests...")
+    assert parse_mix(None) == DEFAULT_MIX
+    assert parse_mix('match_candidates=4,dashboard') == {'match_candidates': 4, 'dashboard': 1}
+    for bad in ('bogus=1', 'dashboard=0'):
+        try:
+            parse_mix(bad)
+            assert False, 'mix should be rejected'
+        except ValueError:
+            pass
+
+    # Upload bodies are what the app's streaming parser accepts
+    pdf = b'%PDF-1.4\n' + b'x' * 5000
+    body, content_type = encode_multipart({'name': 'Asha Rao'}, 'resume', 'resume.pdf', pdf)
+    with tempfile.TemporaryDirectory() as tmp:
+        upload = receive_upload(io.BytesIO(body), content_type.split('boundary=')[1], tmp)
+        assert upload.file_type == 'pdf' and upload.form == {'name': 'Asha Rao'}
+        with open(upload.path, 'rb') as f:
+            assert f.read() == pdf
+    print("✅ Request mixes parse and upload bodies round-trip")
+
+
+if __name__ == "__main__":
+    test_seeded_corpus()
+    test_ranking_fingerprint()
+    test_load_requests()
@@ -0,0 +1,41 @@
+import os
+import sqlite3
+import tempfile
+
+from test_matcher import create_pool, make_candidates
+from utils.conditional import init_match_version, make_etag, read_versions
+from utils.job_index import init_job_version
+
+
+def test_version_stamps_follow_writes():
+    print("🧪 Testing conditional response version stamps...")
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'candidates.db')
+        create_pool(db_path, make_candidates(3))
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+        assert read_versions(cursor) == {'pool': (0, 0), 'jobs': (0, 0), 'matches': (0,)}
+
+        cursor.execute('CREATE TABLE job_descriptions (id INTEGER PRIMARY KEY, title TEXT)')
+        cursor.execute('CREATE TABLE matches (id INTEGER PRIMARY KEY, candidate_id INTEGER, job_id INTEGER)')
+        init_job_version(cursor)
+        init_match_version(cursor)
+        conn.commit()
+        before = read_versions(cursor)
+        assert before['pool'] == (3, 0)
+
+        cursor.execute("INSERT INTO job_descriptions (title) VALUES ('ML')")
+        cursor.execute('INSERT INTO matches (candidate_id, job_id) VALUES (1, 1)')
+        cursor.execute('DELETE FROM matches')
+        conn.commit()
+        after = read_versions(cursor)
+        assert after == {'pool': (3, 0), 'jobs': (1, 0), 'matches': (2,)}
+        conn.close()
+
+        assert make_etag('match', 1, before['pool']) == make_etag('match', 1, after['pool'])
+        assert make_etag('dashboard', before) != make_etag('dashboard', after)
+    print("✅ Stamps move only with the tables they cover")
+
+
+if __name__ == "__main__":
+    test_version_stamps_follow_writes()
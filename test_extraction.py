@@ -0,0 +1,50 @@
+import os
+import re
+import tempfile
+import time
+import zipfile
+
+from docx import Document
+
+from utils.extraction import ExtractionSupervisor, ParseBudget
+
+
+def test_budgeted_extraction():
+    print("🧪 Testing budgeted text extraction...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'resume.docx')
+        document = Document()
+        for index in range(200):
+            document.add_paragraph(f'Python developer, line {index} & more')
+        document.save(path)
+
+        supervisor = ExtractionSupervisor(ParseBudget(max_chars=1000, timeout=1, fallback_timeout=5))
+        result = supervisor.extract(path, 'docx')
+        assert result.reasons == ['chars'] and len(result.text) == 1000
+        supervisor.close()
+
+        # python-docx parses the whole of a long document before the first paragraph
+        slow = os.path.join(tmp, 'long.docx')
+        with zipfile.ZipFile(path) as source, zipfile.ZipFile(slow, 'w') as target:
+            for item in source.infolist():
+                data = source.read(item)
+                if item.filename == 'word/document.xml':
+                    body = ''.join(f'<w:p><w:r><w:t>Python developer, line {index} &amp; more</w:t></w:r></w:p>'
+                                   for index in range(200000))
+                    data = re.sub(rb'<w:body>.*<w:sectPr', f'<w:body>{body}<w:sectPr'.encode(), data, flags=re.S)
+                target.writestr(item, data)
+        supervisor = ExtractionSupervisor(ParseBudget(max_chars=1000, timeout=0.05, fallback_timeout=5))
+        try:
+            started = time.time()
+            result = supervisor.extract(slow, 'docx')
+        finally:
+            supervisor.close()
+        assert time.time() - started < 10
+        assert result.reasons == ['timeout', 'chars']
+        assert 'Python developer, line 0 & more' in result.text
+
+    print("✅ Over-budget documents fall back to fast extraction")
+
+
+if __name__ == "__main__":
+    test_budgeted_extraction()
@@ -0,0 +1,127 @@
+import os
+import random
+import sqlite3
+import tempfile
+from datetime import date, datetime, timedelta
+
+from werkzeug.datastructures import MultiDict
+
+from test_matcher import JOB, create_pool, make_candidates
+from utils.filters import CandidateFilters, FilterError, filter_candidate_ids, init_filter_indexes
+from utils.matcher import JobMatcher
+from utils.scoring import ScoringPipeline
+from utils.search import init_search_index, search_candidate_ids, search_candidates
+
+LOCATIONS = [None, 'Mumbai, India', 'Pune', 'London, UK', 'Remote']
+START = datetime(2025, 1, 1, 9, 30)
+
+
+def filtered_pool(tmp, count=200):
+    """A pool with locations, upload times and aliased skill spellings"""
+    rng = random.Random(11)
+    candidates = make_candidates(count)
+    for candidate in candidates:
+        if rng.random() < 0.2:
+            candidate['skills']['ai_ml'] = [rng.choice(['ML', ' js', 'K8s', 'kubernetes', 'c++'])]
+    db_path = os.path.join(tmp, 'candidates.db')
+    create_pool(db_path, candidates)
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    for index, candidate in enumerate(candidates):
+        candidate['location'] = rng.choice(LOCATIONS)
+        candidate['uploaded_at'] = START + timedelta(days=rng.randint(0, 30), hours=rng.randint(0, 12))
+        cursor.execute('UPDATE candidates SET location = ?, uploaded_at = ? WHERE id = ?',
+                       (candidate['location'], candidate['uploaded_at'], index + 1))
+    init_search_index(cursor)
+    init_filter_indexes(cursor)
+    conn.commit()
+    return candidates, conn
+
+
+def expected_ids(matcher, candidates, min_exp=None, max_exp=None, locations=(), skills=(), after=None,
+                 before=None, education=None):
+    ids = []
+    for index, candidate in enumerate(candidates):
+        profile = matcher.build_candidate_profile(candidate)
+        uploaded = candidate['uploaded_at'].date()
+        location = (candidate['location'] or '').lower()
+        if ((min_exp is None or candidate['experience_years'] >= min_exp) and
+                (max_exp is None or candidate['experience_years'] <= max_exp) and
+                (not locations or any(place in location for place in locations)) and
+                all(matcher.normalize_skill_name(skill) in profile['skills'] for skill in skills) and
+                (after is None or uploaded >= after) and (before is None or uploaded <= before) and
+                (education is None or profile['education_level'] >= matcher.education_levels[education])):
+            ids.append(index + 1)
+    return ids
+
+
+def test_sql_filters_match_profiles():
+    print("🧪 Testing SQL candidate filters...")
+    matcher = JobMatcher()
+    with tempfile.TemporaryDirectory() as tmp:
+        candidates, conn = filtered_pool(tmp)
+        cursor = conn.cursor()
+        cases = [
+            ({'min_experience': '3', 'max_experience': '8'}, dict(min_exp=3, max_exp=8)),
+            (MultiDict([('location', 'mumbai,LONDON'), ('location', 'pune')]),
+             dict(locations=('mumbai', 'london', 'pune'))),
+            ({'skill': 'Python, docker'}, dict(skills=('python', 'docker'))),
+            ({'skill': 'machine learning'}, dict(skills=('machine learning',))),
+            ({'skill': 'javascript'}, dict(skills=('javascript',))),
+            ({'skill': 'kubernetes'}, dict(skills=('kubernetes',))),
+            ({'skill': 'c++'}, dict(skills=('c++',))),
+            ({'uploaded_after': '2025-01-10', 'uploaded_before': '2025-01-20'},
+             dict(after=date(2025, 1, 10), before=date(2025, 1, 20))),
+            ({'education': 'Master'}, dict(education='master')),
+            ({'education': 'bachelor', 'min_experience': '5', 'location': 'pune', 'skill': 'sql'},
+             dict(education='bachelor', min_exp=5, locations=('pune',), skills=('sql',))),
+        ]
+        for args, expected in cases:
+            filters = CandidateFilters.from_args(MultiDict(args), matcher)
+            assert filters
+            assert filter_candidate_ids(cursor, filters) == expected_ids(matcher, candidates, **expected), args
+
+        assert not CandidateFilters.from_args(MultiDict(), matcher)
+        for bad in ({'min_experience': 'ten'}, {'uploaded_after': '01/02/2025'}, {'education': 'wizard'},
+                    {'min_experience': '9', 'max_experience': '2'}):
+            try:
+                CandidateFilters.from_args(MultiDict(bad), matcher)
+                assert False, bad
+            except FilterError:
+                pass
+
+        # Full-text search and the match pre-filter only see filtered candidates
+        filters = CandidateFilters.from_args(MultiDict({'min_experience': '6'}), matcher)
+        allowed = set(filter_candidate_ids(cursor, filters))
+        total, hits = search_candidates(cursor, 'python', 1, 500, filters)
+        assert total == len(hits) and hits and {hit['id'] for hit in hits} <= allowed
+        assert set(search_candidate_ids(cursor, 'python', 500, filters)) == {hit['id'] for hit in hits}
+        total, hits = search_candidates(cursor, '', 1, 500, filters)
+        assert total == len(allowed) and {hit['id'] for hit in hits} == allowed
+        conn.close()
+    print("✅ Filters select exactly the candidates their profiles allow")
+
+
+def test_rank_scores_only_selected_rows():
+    print("🧪 Testing ranking of a filtered subset...")
+    matcher = JobMatcher()
+    pipeline = ScoringPipeline(matcher)
+    candidates = make_candidates(120)
+    block = pipeline.extend(None, [(index + 1, pipeline.build_candidate_profile(c))
+                                   for index, c in enumerate(candidates)])
+    job_profile = pipeline.build_job_profile(JOB)
+    wanted = [candidate_id for candidate_id in range(1, 121) if candidate_id % 3 == 0]
+
+    full = pipeline.rank(job_profile, block)
+    expected = [(candidate_id, result) for candidate_id, result in full if candidate_id in wanted][:10]
+    before = matcher.scored_total + matcher.pruned_total
+    ranked = pipeline.rank(job_profile, block, 10, block.rows_for(wanted))
+    assert matcher.scored_total + matcher.pruned_total - before == len(wanted)
+    assert [(cid, r['overall_score']) for cid, r in ranked] == [(cid, r['overall_score']) for cid, r in expected]
+    assert pipeline.rank(job_profile, block, 10, block.rows_for([])) == []
+    print("✅ Only the filtered rows are scored and they rank as in the full pool")
+
+
+if __name__ == "__main__":
+    test_sql_filters_match_profiles()
+    test_rank_scores_only_selected_rows()
@@ -0,0 +1,66 @@
+import json
+import os
+import sqlite3
+import tempfile
+
+from utils.job_import import JobImportError, import_jobs, read_job_rows
+
+
+class KeywordExtractor:
+    """Stands in for SkillExtractor: skills are the known words found in the text"""
+
+    def taxonomy_version(self):
+        return 'test'
+
+    def extract_all_skills_many(self, texts, batch_size=64, n_process=1):
+        return [{'tools': [skill for skill in ('python', 'docker') if skill in text.lower()]} for text in texts]
+
+
+def test_bulk_job_import():
+    print("🧪 Testing bulk job description import...")
+    jsonl = '\n'.join([
+        json.dumps({'title': 'Backend', 'company': 'Acme', 'description': 'Python and Docker',
+                    'required_experience': 3, 'education_requirements': ['bachelor']}),
+        '{"title": "broken',
+        json.dumps({'title': 'No description'}),
+        '',
+        json.dumps({'title': 'Ops', 'description': 'Docker everywhere', 'required_experience': 'n/a'})
+    ])
+    csv_data = ('title,company,description,required_experience,education_requirements\n'
+                'Data,Acme,Python pipelines,2,bachelor;master\n')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'candidates.db')
+        conn = sqlite3.connect(db_path)
+        conn.execute('''
+            CREATE TABLE job_descriptions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT, company TEXT, description TEXT,
+                required_skills TEXT, required_experience INTEGER, education_requirements TEXT,
+                created_at TIMESTAMP, skills_version TEXT
+            )
+        ''')
+        conn.commit()
+
+        summary = import_jobs(db_path, read_job_rows(jsonl, 'jsonl'), KeywordExtractor())
+        assert (summary['imported'], summary['failed']) == (1, 3)
+        assert [result['success'] for result in summary['results']] == [True, False, False, False]
+        assert summary['results'][0]['extracted_skills'] == ['python', 'docker']
+        assert 'Invalid JSON' in summary['results'][1]['error']
+
+        summary = import_jobs(db_path, read_job_rows(csv_data, 'csv'), KeywordExtractor())
+        assert summary['imported'] == 1 and summary['results'][0]['job_id'] == 2
+        row = conn.execute('SELECT required_skills, required_experience, education_requirements, skills_version '
+                           'FROM job_descriptions WHERE id = 2').fetchone()
+        assert row == ('["python"]', 2, '["bachelor", "master"]', 'test')
+        conn.close()
+
+    try:
+        read_job_rows('title,description', 'xml')
+        assert False, 'unknown formats should be rejected'
+    except JobImportError:
+        pass
+    print("✅ Valid rows are imported together; bad rows report their own errors")
+
+
+if __name__ == "__main__":
+    test_bulk_job_import()
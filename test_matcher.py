@@ -0,0 +1,232 @@
+import os
+import json
+import random
+import sqlite3
+import tempfile
+
+from utils.matcher import JobMatcher
+from utils.engine import MatchEngine
+from utils.feature_store import FeatureStore
+from utils.candidate_cache import CandidateCache, init_pool_version
+from utils.job_index import JobIndex, init_job_version
+
+WORDS = (
+    "python java senior developer machine learning tensorflow docker aws cloud data "
+    "engineer the of and with experience years team lead build deploy models react sql"
+).split()
+SKILLS = ['python', 'java', 'docker', 'aws', 'react', 'machine learning', 'sql', 'react native']
+
+JOB = {
+    'title': 'ML Engineer',
+    'company': 'TechCorp',
+    'description': 'Senior machine learning engineer with python, tensorflow and docker to deploy models on aws',
+    'required_skills': ['Python', 'Machine Learning', 'TensorFlow', 'Docker', 'AWS'],
+    'required_experience': 3,
+    'education_requirements': ['bachelor degree']
+}
+
+
+def make_candidates(count, seed=7):
+    rng = random.Random(seed)
+    return [{
+        'experience_years': rng.randint(0, 12),
+        'skills': {'programming_languages': rng.sample(SKILLS, rng.randint(0, 6))},
+        'education': rng.choice([[], ['btech in computer science'], ['master of science'], ['phd']]),
+        'raw_text': ' '.join(rng.choice(WORDS) for _ in range(rng.randint(10, 200)))
+    } for _ in range(count)]
+
+
+def create_pool(db_path, candidates):
+    conn = sqlite3.connect(db_path)
+    conn.execute('''
+        CREATE TABLE candidates (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, email TEXT, phone TEXT,
+            location TEXT, experience_years INTEGER, skills TEXT, education TEXT,
+            resume_path TEXT, uploaded_at TIMESTAMP, raw_text TEXT
+        )
+    ''')
+    init_pool_version(conn.cursor())
+    for index, candidate in enumerate(candidates):
+        conn.execute(
+            'INSERT INTO candidates (name, experience_years, skills, education, raw_text) VALUES (?, ?, ?, ?, ?)',
+            (f'Candidate {index}', candidate['experience_years'], json.dumps(candidate['skills']),
+             json.dumps(candidate['education']), candidate['raw_text'])
+        )
+    conn.commit()
+    conn.close()
+
+
+def test_semantic_terms_match_pair_fit():
+    print("🧪 Testing term-count semantic similarity...")
+    matcher = JobMatcher()
+    for candidate in make_candidates(50):
+        expected = matcher.calculate_semantic_similarity(candidate['raw_text'], JOB['description'])
+        actual = matcher.semantic_similarity_from_terms(
+            matcher.build_term_counts(candidate['raw_text']),
+            matcher.build_term_counts(JOB['description'])
+        )
+        assert abs(expected - actual) < 1e-9
+    print("✅ Term-count similarity matches the pairwise TF-IDF fit")
+
+
+def test_sharded_engine_matches_exhaustive_ranking():
+    print("🧪 Testing sharded matching engine...")
+    matcher = JobMatcher()
+    candidates = make_candidates(120)
+    expected = [(index + 1, matcher.calculate_overall_match(candidate, JOB))
+                for index, candidate in enumerate(candidates)]
+    expected.sort(key=lambda item: item[1]['overall_score'], reverse=True)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'candidates.db')
+        create_pool(db_path, candidates)
+
+        engine = MatchEngine(db_path, workers=1, shards_per_worker=5)
+        assert engine.match(JOB)[0] == expected
+        assert engine.match(JOB, top_k=10)[0] == expected[:10]
+
+    print("✅ Sharded top-K matches exhaustive scoring")
+
+
+def test_top_k_pruning_keeps_exhaustive_ranking():
+    print("🧪 Testing top-K upper-bound pruning...")
+    matcher = JobMatcher()
+    job_profile = matcher.build_job_profile(JOB)
+    profiles = [(index + 1, matcher.build_candidate_profile(c)) for index, c in enumerate(make_candidates(300))]
+
+    exhaustive, pruned = matcher.rank_profiles(profiles, job_profile)
+    assert pruned == 0
+    for top_k in (1, 5, 25):
+        ranked, pruned = matcher.rank_profiles(profiles, job_profile, top_k)
+        assert ranked == exhaustive[:top_k]
+        assert pruned > 0
+    print("✅ Pruned top-K equals exhaustive ranking")
+
+
+def test_feature_store_appends_incrementally():
+    print("🧪 Testing feature store appends...")
+    matcher = JobMatcher()
+    candidates = make_candidates(30)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = FeatureStore(os.path.join(tmp, 'features'))
+        store.append((index + 1, matcher.build_candidate_profile(c)) for index, c in enumerate(candidates[:20]))
+        first = store.view()
+        store.append((index + 21, matcher.build_candidate_profile(c)) for index, c in enumerate(candidates[20:]))
+        view = store.view()
+
+        assert len(first) == 20 and len(view) == 30
+        assert view.manifest['generation'] == first.manifest['generation']
+
+        term_vocab = view.term_vocab
+        for row, candidate in enumerate(candidates):
+            profile = matcher.build_candidate_profile(candidate)
+            stored = view.candidate_profile(row)
+            assert stored['skills'] == profile['skills']
+            assert stored['education_text'] == profile['education_text']
+            assert {term_vocab[t]: c for t, c in stored['terms'].items()} == profile['terms']
+
+    print("✅ Appended rows read back through the memory-mapped view")
+
+
+def test_candidate_cache_refreshes_incrementally():
+    print("🧪 Testing candidate cache...")
+    matcher = JobMatcher()
+    candidates = make_candidates(10)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'candidates.db')
+        create_pool(db_path, candidates)
+        cache = CandidateCache(db_path, matcher)
+
+        assert [record.id for record in cache.records()] == list(range(1, 11))
+        cache.records()
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        conn = sqlite3.connect(db_path)
+        conn.execute("INSERT INTO candidates (name, skills) VALUES ('New', '{}')")
+        conn.commit()
+        assert cache.records()[-1].name == 'New' and cache.misses == 2
+
+        conn.execute("UPDATE candidates SET name = 'Renamed' WHERE id = 1")
+        conn.commit()
+        conn.close()
+        records = cache.records()
+        assert records[0].name == 'Renamed' and len(records) == 11
+        cache.close()
+
+    print("✅ Cache skips unchanged pools and reloads after rewrites")
+
+
+def test_job_index_matches_pairwise_scoring():
+    print("🧪 Testing reverse matching job index...")
+    matcher = JobMatcher()
+    rng = random.Random(3)
+    jobs = [dict(JOB, description=' '.join(rng.choice(WORDS) for _ in range(rng.randint(0, 60))),
+                 required_skills=rng.sample(SKILLS, rng.randint(0, 4)),
+                 required_experience=rng.randint(0, 8),
+                 education_requirements=rng.choice([[], ['bachelor degree'], ['master', 'phd']]))
+            for _ in range(40)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'candidates.db')
+        conn = sqlite3.connect(db_path)
+        conn.execute('''
+            CREATE TABLE job_descriptions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT, company TEXT, description TEXT,
+                required_skills TEXT, required_experience INTEGER, education_requirements TEXT,
+                created_at TIMESTAMP
+            )
+        ''')
+        init_job_version(conn.cursor())
+        for job in jobs:
+            conn.execute(
+                'INSERT INTO job_descriptions (title, company, description, required_skills, '
+                'required_experience, education_requirements) VALUES (?, ?, ?, ?, ?, ?)',
+                (job['title'], job['company'], job['description'], json.dumps(job['required_skills']),
+                 job['required_experience'], json.dumps(job['education_requirements']))
+            )
+        conn.commit()
+        conn.close()
+
+        index = JobIndex(db_path, matcher)
+        for candidate in make_candidates(10):
+            expected = [(job_id, matcher.calculate_overall_match(candidate, job))
+                        for job_id, job in enumerate(jobs, 1)]
+            expected.sort(key=lambda item: (-item[1]['overall_score'], item[0]))
+            ranked = index.rank_jobs(matcher.build_candidate_profile(candidate), top_k=5)
+            assert [(job['id'], result) for job, result in ranked] == expected[:5]
+        index.close()
+
+    print("✅ Vectorized job ranking equals pairwise scoring")
+
+
+def test_match_summary_keeps_scores_and_counts():
+    print("🧪 Testing compact match summaries...")
+    matcher = JobMatcher()
+    for job in (JOB, dict(JOB, required_skills=[])):
+        for candidate in make_candidates(20):
+            result = matcher.calculate_overall_match(candidate, job)
+            summary = matcher.summarize_match(result)
+            skill_match = result['skill_match']
+            for key in ('overall_score', 'semantic_score', 'experience_score', 'education_score',
+                        'diversity_bonus'):
+                assert summary[key] == result[key]
+            assert summary['skill_score'] == round(skill_match['score'] * 100, 2)
+            assert summary['matched_skill_count'] == len(skill_match['matched_skills'])
+            assert summary['missing_skill_count'] == len(skill_match['missing_skills'])
+            assert summary['partial_skill_count'] == len(skill_match['partial_matches'])
+            assert summary['required_skill_count'] == len(job['required_skills'])
+            assert not any(isinstance(value, (list, dict)) for value in summary.values())
+            assert matcher.generate_match_explanation(result).endswith('.')
+    print("✅ Summaries carry every score and skill count, and no lists")
+
+
+if __name__ == "__main__":
+    test_semantic_terms_match_pair_fit()
+    test_sharded_engine_matches_exhaustive_ranking()
+    test_top_k_pruning_keeps_exhaustive_ranking()
+    test_feature_store_appends_incrementally()
+    test_candidate_cache_refreshes_incrementally()
+    test_job_index_matches_pairwise_scoring()
+    test_match_summary_keeps_scores_and_counts()
@@ -0,0 +1,81 @@
+import json
+import os
+import pstats
+import tempfile
+
+from utils import metrics
+from utils.profiling import RequestProfiler
+
+
+def test_prometheus_rendering():
+    print("🧪 Testing metrics rendering...")
+    histogram = metrics.Histogram('test_stage_seconds', 'Stage time', ['stage'], buckets=(0.01, 0.1))
+    histogram.observe(0.005, 'parse')
+    histogram.observe(0.05, 'parse')
+    histogram.observe(3.0, 'parse')
+    counter = metrics.Counter('test_documents_total', 'Documents', ['type'])
+    counter.inc('pdf')
+    counter.inc('pdf', amount=2)
+
+    registry = metrics.Registry()
+    registry.register(histogram)
+    registry.register(counter)
+    registry.gauge('test_pool_size', 'Pool size', lambda: 42)
+    registry.gauge('test_broken', 'Fails at scrape time', lambda: 1 / 0)
+    text = registry.render()
+
+    assert '# TYPE test_stage_seconds histogram' in text
+    assert 'test_stage_seconds_bucket{stage="parse",le="0.01"} 1' in text
+    assert 'test_stage_seconds_bucket{stage="parse",le="0.1"} 2' in text
+    assert 'test_stage_seconds_bucket{stage="parse",le="+Inf"} 3' in text
+    assert 'test_stage_seconds_count{stage="parse"} 3' in text
+    assert 'test_documents_total{type="pdf"} 3' in text
+    assert 'test_pool_size 42' in text
+    assert 'test_broken' not in text
+
+    # Disabled timers record nothing
+    before = metrics.STAGE_SECONDS.count('test_disabled')
+    metrics.enable(False)
+    try:
+        with metrics.timer('test_disabled'):
+            pass
+    finally:
+        metrics.enable(True)
+    assert metrics.STAGE_SECONDS.count('test_disabled') == before
+    print("✅ Histograms, counters and gauges render in Prometheus text format")
+
+
+def test_request_stages_and_profiles():
+    print("🧪 Testing Server-Timing stages and request profiles...")
+    token = metrics.collect_stages()
+    try:
+        metrics.observe('spacy', 0.002)
+        metrics.observe('spacy', 0.003)
+        metrics.observe('db_write', 0.010)
+        header = metrics.server_timing(0.020)
+    finally:
+        metrics.stop_collecting(token)
+    assert header == 'db_write;dur=10.00;desc="1x", spacy;dur=5.00;desc="2x", total;dur=20.00'
+    assert metrics.collected_stages() == {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ('pstats', 'speedscope'):
+            profiler = RequestProfiler(mode)
+            assert profiler.start()
+            sum(index * index for index in range(200000))
+            profiler.stop()
+            path = profiler.save(tmp, 'match/candidates')
+            assert os.path.basename(path).endswith('_match_candidates.' + ('pstats' if mode == 'pstats'
+                                                                          else 'speedscope.json'))
+            if mode == 'pstats':
+                assert pstats.Stats(path).total_calls > 0
+            else:
+                with open(path) as f:
+                    profile = json.load(f)['profiles'][0]
+                assert profile['type'] == 'sampled' and len(profile['samples']) == len(profile['weights'])
+    print("✅ Stages are summed per request and profiles are saved in both formats")
+
+
+if __name__ == "__main__":
+    test_prometheus_rendering()
+    test_request_stages_and_profiles()
@@ -0,0 +1,33 @@
+import spacy
+from spacy.language import Language
+
+from utils.nlp_batch import pipe_docs
+
+
+@Language.component('fail_on_marker')
+def fail_on_marker(doc):
+    if 'BROKEN' in doc.text:
+        raise ValueError('cannot process document')
+    return doc
+
+
+def test_pipe_docs_isolates_errors():
+    print("🧪 Testing batched spaCy processing...")
+    nlp = spacy.blank('en')
+    nlp.add_pipe('fail_on_marker')
+
+    texts = [f'resume number {index}' for index in range(25)]
+    texts[7] = texts[19] = 'BROKEN resume'
+    docs = list(pipe_docs(nlp, texts, batch_size=4))
+
+    assert len(docs) == len(texts)
+    for text, doc in zip(texts, docs):
+        if 'BROKEN' in text:
+            assert isinstance(doc, ValueError)
+        else:
+            assert doc.text == text
+    print("✅ Failed texts yield their errors; the rest keep their order")
+
+
+if __name__ == "__main__":
+    test_pipe_docs_isolates_errors()
@@ -0,0 +1,206 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+
+from utils.matcher import JobMatcher
+from utils.reprocess import Reprocessor, init_reprocess_schema, latest_run
+from utils.semantic import HashingSemantic, init_semantic_schema, read_df_version, rebuild_document_frequencies
+
+
+class KeywordExtractor:
+    """Stands in for SkillExtractor: skills are the taxonomy words found in the text"""
+
+    def __init__(self, skills):
+        self.skills = skills
+
+    def taxonomy_version(self):
+        return ','.join(self.skills)
+
+    def extract_all_skills_many(self, texts, batch_size=64, n_process=1):
+        return [{'tools': [skill for skill in self.skills if skill in text.lower()]} for text in texts]
+
+
+class FlakyExtractor(KeywordExtractor):
+    """Fails on texts mentioning 'unreadable', like a document spaCy cannot process"""
+
+    def extract_all_skills_many(self, texts, batch_size=64, n_process=1):
+        skills = super().extract_all_skills_many(texts, batch_size, n_process)
+        return [ValueError('unreadable') if 'unreadable' in text else found for text, found in zip(texts, skills)]
+
+
+class TextFileParser:
+    """Stands in for ResumeParser: resume files are plain text"""
+
+    def extract_text(self, path, file_type):
+        with open(path) as f:
+            return f.read(), []
+
+
+def make_db(path):
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE candidates (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, email TEXT, phone TEXT,
+            location TEXT, experience_years INTEGER, skills TEXT, education TEXT,
+            resume_path TEXT, uploaded_at TIMESTAMP, raw_text TEXT
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE job_descriptions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT, company TEXT, description TEXT,
+            required_skills TEXT, required_experience INTEGER, education_requirements TEXT, created_at TIMESTAMP
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE matches (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, candidate_id INTEGER, job_id INTEGER,
+            overall_score REAL, skill_score REAL, experience_score REAL, education_score REAL,
+            semantic_score REAL, matched_skills TEXT, missing_skills TEXT, created_at TIMESTAMP
+        )
+    ''')
+    for index in range(5):
+        cursor.execute('INSERT INTO candidates (name, experience_years, skills, raw_text) VALUES (?, ?, ?, ?)',
+                       (f'Candidate {index}', index, json.dumps({'tools': ['git']}),
+                        'Python developer using docker and git' if index % 2 else 'Git and jira'))
+    cursor.execute('INSERT INTO job_descriptions (title, description, required_skills, required_experience) '
+                   "VALUES ('Backend', 'Python services deployed with docker', '[\"git\"]', 2)")
+    for candidate_id in range(1, 6):
+        cursor.execute('INSERT INTO matches (candidate_id, job_id, overall_score) VALUES (?, 1, 0)',
+                       (candidate_id,))
+    # Existing databases get their stamp columns added
+    init_reprocess_schema(cursor)
+    conn.commit()
+    return conn
+
+
+def test_reprocess_resumes_and_rescores():
+    print("🧪 Testing background reprocessing...")
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'candidates.db')
+        conn = make_db(db_path)
+        matcher = JobMatcher()
+        extractor = KeywordExtractor(['python', 'docker', 'git'])
+        reprocessor = Reprocessor(db_path, extractor, matcher, batch_size=2)
+        assert reprocessor.stale_counts(conn.cursor()) == {'jobs': 1, 'candidates': 5, 'matches': 5}
+
+        # Pause after the job batch and the first candidate batch, then resume
+        stop = threading.Event()
+        paused = reprocessor.run(stop, progress=lambda run: run['candidates_updated'] and stop.set())
+        assert paused['status'] == 'paused' and paused['phase'] == 'candidates'
+        assert paused['candidates_updated'] == 2
+
+        run = reprocessor.run()
+        assert run['id'] == paused['id'] and run['status'] == 'done'
+        assert (run['jobs_updated'], run['candidates_updated'], run['matches_rescored']) == (1, 5, 5)
+        assert reprocessor.stale_counts(conn.cursor()) == {'jobs': 0, 'candidates': 0, 'matches': 0}
+
+        skills = json.loads(conn.execute('SELECT skills FROM candidates WHERE id = 2').fetchone()[0])
+        assert skills == {'tools': ['python', 'docker', 'git']}
+        required = json.loads(conn.execute('SELECT required_skills FROM job_descriptions').fetchone()[0])
+        assert required == ['python', 'docker']
+
+        # Stored scores are exactly what matching the new data gives
+        overall, matched = conn.execute('SELECT overall_score, matched_skills FROM matches WHERE candidate_id = 2').fetchone()
+        expected = matcher.calculate_overall_match(
+            {'experience_years': 1, 'skills': skills, 'education': [], 'raw_text': 'Python developer using docker and git'},
+            {'description': 'Python services deployed with docker', 'required_skills': required,
+             'required_experience': 2, 'education_requirements': []}
+        )
+        assert overall == expected['overall_score']
+        assert json.loads(matched) == expected['skill_match']['matched_skills']
+
+        # A taxonomy change that leaves some skills as they were only re-scores affected pairs
+        reprocessor = Reprocessor(db_path, KeywordExtractor(['python', 'docker', 'git', 'jira']), matcher)
+        run = reprocessor.run()
+        assert (run['candidates_updated'], run['matches_rescored']) == (5, 3)
+        assert latest_run(conn.cursor())['id'] == run['id']
+        conn.close()
+    print("✅ Runs pause, resume and re-score only stale matches")
+
+
+def df_rows(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute('SELECT bucket, docs FROM semantic_df WHERE bucket >= 0 ORDER BY bucket').fetchall()
+    finally:
+        conn.close()
+
+
+def reprocessor_runs(conn):
+    return conn.execute('SELECT id, status, owner FROM reprocess_runs ORDER BY id').fetchall()
+
+
+def test_recovered_text_and_failed_rows():
+    print("🧪 Testing recovered resume text and failed rows...")
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'candidates.db')
+        resume_path = os.path.join(tmp, 'resume.txt')
+        with open(resume_path, 'w') as f:
+            f.write('Python engineer shipping docker images')
+        conn = make_db(db_path)
+        conn.execute("INSERT INTO candidates (name, experience_years, skills, raw_text, resume_path) "
+                     "VALUES ('No text', 3, '{}', '', ?)", (resume_path,))
+        conn.execute("INSERT INTO candidates (name, experience_years, skills, raw_text) "
+                     "VALUES ('Broken', 3, '{}', 'unreadable scan')")
+        init_semantic_schema(conn.cursor())
+        conn.commit()
+        matcher = JobMatcher(semantic=HashingSemantic(1024, db_path))
+        assert rebuild_document_frequencies(db_path, matcher) == 7
+
+        reprocessor = Reprocessor(db_path, FlakyExtractor(['python', 'docker', 'git']), matcher,
+                                  parser=TextFileParser(), batch_size=3)
+        run = reprocessor.run()
+        assert run['status'] == 'done_with_errors' and run['errors'] == 1 and run['error']
+        assert reprocessor.stale_counts(conn.cursor())['candidates'] == 1
+
+        # The recovered text's terms are counted once, in the document the upload already counted
+        assert read_df_version(conn.cursor())[0] == 7
+        counted = df_rows(db_path)
+        rebuild_document_frequencies(db_path, matcher)
+        assert df_rows(db_path) == counted
+
+        # The failed row keeps its stamp, so the next run retries it
+        conn.execute("UPDATE candidates SET raw_text = 'readable scan of git work' WHERE name = 'Broken'")
+        conn.commit()
+        retry = reprocessor.run()
+        assert retry['id'] != run['id'] and retry['status'] == 'done' and retry['candidates_updated'] == 1
+        assert reprocessor.stale_counts(conn.cursor()) == {'jobs': 0, 'candidates': 0, 'matches': 0}
+        conn.close()
+    print("✅ Recovered text is counted once and failed rows are retried")
+
+
+def test_one_process_works_on_a_run():
+    print("🧪 Testing reprocessing leases...")
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'candidates.db')
+        conn = make_db(db_path)
+        matcher = JobMatcher()
+        extractor = KeywordExtractor(['python', 'docker', 'git'])
+        other = Reprocessor(db_path, extractor, matcher, batch_size=2)
+
+        # A second process asking while the first holds the lease is turned away
+        turned_away = []
+        holder = Reprocessor(db_path, extractor, matcher, batch_size=2)
+        run = holder.run(progress=lambda run: turned_away or turned_away.append(other.run()))
+        assert turned_away == [None] and run['status'] == 'done'
+
+        # A process that stalls past its lease loses the run to the one that takes it over
+        conn.execute('UPDATE candidates SET skills_version = NULL')
+        conn.commit()
+        taken_over = []
+        stalled = Reprocessor(db_path, extractor, matcher, batch_size=2, lease_seconds=-1)
+        assert stalled.run(progress=lambda run: taken_over or taken_over.append(other.run())) is None
+        assert taken_over[0]['status'] == 'done'
+        assert reprocessor_runs(conn) == [(run['id'], 'done', None), (taken_over[0]['id'], 'done', None)]
+        assert other.stale_counts(conn.cursor()) == {'jobs': 0, 'candidates': 0, 'matches': 0}
+        conn.close()
+    print("✅ Runs are leased to one process at a time")
+
+
+if __name__ == "__main__":
+    test_reprocess_resumes_and_rescores()
+    test_recovered_text_and_failed_rows()
+    test_one_process_works_on_a_run()
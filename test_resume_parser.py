@@ -0,0 +1,58 @@
+import random
+import re
+
+from utils.resume_parser import FieldScanner, ResumeParser, header_region
+
+EXPERIENCE_PATTERNS = [
+    r'(\d+)\+?\s*years?\s*(?:of\s*)?experience',
+    r'experience\s*(?:of\s*)?(\d+)\+?\s*years?',
+    r'(\d+)\+?\s*yrs?\s*(?:of\s*)?experience',
+]
+WORDS = ("2 years experience 10 of yrs yr year experienceexperience 3+ \n master bachelor ba\nma phd "
+         "computer science 12years 4yrs Experience").split(' ')
+
+
+def test_field_scanner_matches_pattern_passes():
+    print("🧪 Testing single-pass field scanner...")
+    scanner = FieldScanner()
+    rng = random.Random(5)
+    for _ in range(2000):
+        text = rng.choice(['', ' ', '  ']).join(rng.choice(WORDS) for _ in range(rng.randint(1, 30)))
+        lowered = text.lower()
+        years = [int(match) for pattern in EXPERIENCE_PATTERNS for match in re.findall(pattern, lowered)]
+        assert scanner.experience_years(lowered) == (max(years) if years else 0), text
+
+        lines = {line.strip() for line in lowered.split('\n')
+                 if any(keyword in line for keyword in FieldScanner.EDUCATION_KEYWORDS)}
+        assert sorted(scanner.education_lines(lowered)) == sorted(lines), text
+
+    fields = scanner.scan('Asha Rao\nasha.rao@example.com | +1 (555) 123-4567 | Pune\n\nExperience\n'
+                          '2 years experience at Acme, then 5+ yrs of experience in Pune\nB.Tech, Computer Science')
+    assert fields['email'] == 'asha.rao@example.com'
+    assert fields['phone'] == '+1 (555) 123-4567'
+    assert fields['experience_years'] == 5
+    assert fields['education'] == ['b.tech, computer science']
+    assert fields['header'] == 'Asha Rao\nasha.rao@example.com | +1 (555) 123-4567 | Pune\n'
+    assert header_region('Asha Rao\nSkills:\nPython') == 'Asha Rao'
+    print("✅ Scanner agrees with the per-pattern passes; the header stops at the first section")
+
+
+def test_phone_is_the_whole_number():
+    print("🧪 Testing stored phone numbers...")
+    parser = ResumeParser()
+    cases = [
+        ('Call 555-123-4567 after 5pm', '555-123-4567'),
+        ('Phone: +44 207 946 0958', '+44 207 946 0958'),
+        ('Mobile (555) 123 4567 / (555) 999 0000', '(555) 123 4567'),
+        ('No number here, only 2024', None),
+    ]
+    for text, phone in cases:
+        # The first match in full; re.findall used to keep only the optional country code group
+        assert parser.extract_contact_info(text)['phone'] == phone, text
+    assert re.findall(FieldScanner.PHONE, 'Call 555-123-4567') == ['']
+    print("✅ The first phone number is stored whole, not just its country code")
+
+
+if __name__ == "__main__":
+    test_field_scanner_matches_pattern_passes()
+    test_phone_is_the_whole_number()
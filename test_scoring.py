@@ -0,0 +1,153 @@
+import os
+import sqlite3
+import tempfile
+
+import numpy as np
+
+from test_matcher import JOB, create_pool, make_candidates
+from utils.candidate_cache import CandidateCache
+from utils.matcher import JobMatcher
+from utils.scoring import ScoringComponent, ScoringPipeline
+from utils.semantic import HashingSemantic
+
+JOBS = [
+    JOB,
+    dict(JOB, required_skills=['React', 'React Native', 'SQL', 'sql'], required_experience=0,
+         education_requirements=['masters in computer science', 'phd preferred'],
+         description='Junior frontend developer building react apps with the team'),
+    dict(JOB, required_skills=[], required_experience=8, education_requirements=[],
+         description='Principal data engineer, lead the cloud data team')
+]
+
+
+def expected_ranking(matcher, candidates, job):
+    ranking = [(index + 1, matcher.calculate_overall_match(candidate, job))
+               for index, candidate in enumerate(candidates)]
+    ranking.sort(key=lambda item: (-item[1]['overall_score'], item[0]))
+    return ranking
+
+
+def test_pipeline_ranks_like_pairwise_scoring():
+    print("🧪 Testing vectorized scoring pipeline...")
+    candidates = make_candidates(150)
+    for semantic in (None, HashingSemantic(2048)):
+        matcher = JobMatcher(semantic=semantic)
+        pipeline = ScoringPipeline(matcher)
+        profiles = [(index + 1, pipeline.build_candidate_profile(c)) for index, c in enumerate(candidates)]
+        matcher.record_documents(None, [profile['terms'] for _, profile in profiles])
+
+        # Extending block by block packs the same columns as one block
+        block = pipeline.extend(pipeline.extend(None, profiles[:60]), profiles[60:])
+        other = ScoringPipeline(matcher)
+        whole = other.extend(None, profiles)
+        for job in JOBS:
+            job_profile = pipeline.build_job_profile(job)
+            expected = expected_ranking(matcher, candidates, job)
+            assert pipeline.rank(job_profile, block) == expected
+            assert pipeline.rank(job_profile, block, top_k=10) == expected[:10]
+            for name, scores in pipeline.score_many(job_profile, block).items():
+                assert np.allclose(scores, other.score_many(job_profile, whole)[name]), name
+
+            subset = [5, 17, 42, 150, 999]
+            rows = block.rows_for(subset)
+            assert block.ids[rows].tolist() == [5, 17, 42, 150]
+            assert pipeline.rank(job_profile, block, rows=rows) == [
+                item for item in expected if item[0] in subset
+            ]
+    print("✅ Block scores equal per-pair scores for both semantic engines")
+
+
+class RemoteFriendly(ScoringComponent):
+    """Example extra component: full credit to candidates whose location mentions 'remote'"""
+
+    name = 'remote'
+    candidate_keys = ('remote',)
+
+    def candidate_features(self, resume_data):
+        return {'remote': 'remote' in (resume_data.get('location') or '').lower()}
+
+    def weight(self, job_profile):
+        return 0.1
+
+    def pack(self, previous, profiles):
+        flags = np.array([p['remote'] for p in profiles], dtype=np.float64)
+        return {'flags': flags if previous is None else np.concatenate([previous['flags'], flags])}
+
+    def score_many(self, job_profile, block):
+        return block.columns[self.name]['flags']
+
+
+def test_extra_component_and_cached_block():
+    print("🧪 Testing extra scoring components and the cached block...")
+    candidates = make_candidates(40, seed=3)
+    matcher = JobMatcher()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'candidates.db')
+        create_pool(db_path, candidates)
+        conn = sqlite3.connect(db_path)
+        conn.execute("UPDATE candidates SET location = 'Remote, India' WHERE id % 4 = 0")
+        conn.commit()
+
+        pipeline = ScoringPipeline(matcher, [RemoteFriendly(matcher)])
+        cache = CandidateCache(db_path, matcher, pipeline=pipeline)
+        block = cache.block()
+        assert len(block) == 40 and cache.records()[3].profile['remote']
+
+        job_profile = pipeline.build_job_profile(JOB)
+        plain = {cid: result for cid, result in expected_ranking(matcher, candidates, JOB)}
+        for candidate_id, result in pipeline.rank(job_profile, block):
+            bonus = 10.0 if candidate_id % 4 == 0 else 0.0
+            assert result['remote_score'] == bonus * 10
+            assert abs(result['overall_score'] - min(100.0, plain[candidate_id]['overall_score'] + bonus)) < 0.011
+
+        # New rows extend the cached block; the old block is left as it was
+        conn.execute("INSERT INTO candidates (name, experience_years, skills, education, raw_text) "
+                     "VALUES ('New', 5, '{}', '[]', 'python docker')")
+        conn.commit()
+        conn.close()
+        assert len(cache.block()) == 41 and len(block) == 40
+        cache.close()
+
+        try:
+            ScoringPipeline(matcher, [RemoteFriendly(matcher), RemoteFriendly(matcher)])
+            assert False, 'duplicate component names should be rejected'
+        except ValueError:
+            pass
+    print("✅ Extra components add to the overall score and blocks grow with the pool")
+
+
+def test_rank_pages_slice_the_full_ranking():
+    print("🧪 Testing paged ranking...")
+    matcher = JobMatcher()
+    pipeline = ScoringPipeline(matcher)
+    block = pipeline.extend(None, [(index + 1, pipeline.build_candidate_profile(c))
+                                   for index, c in enumerate(make_candidates(230, seed=5))])
+    job_profile = pipeline.build_job_profile(JOB)
+    full = [(cid, result['overall_score']) for cid, result in pipeline.rank(job_profile, block)]
+
+    paged = []
+    for offset in range(0, 250, 50):
+        total, page, _ = pipeline.rank_page(job_profile, block, offset, 50)
+        assert total == 230
+        paged += [(cid, result['overall_score']) for cid, result in page]
+    assert paged == full
+
+    # Rows that cannot make the first page are pruned before semantic and education scoring
+    before = matcher.pruned_total
+    total, page, pruned = pipeline.rank_page(job_profile, block, 0, 10)
+    assert total == 230 and pruned > 0 and matcher.pruned_total - before == pruned
+    assert [(cid, result['overall_score']) for cid, result in page] == full[:10]
+
+    threshold = full[60][1]
+    passing = [item for item in full if item[1] >= threshold]
+    total, page, pruned = pipeline.rank_page(job_profile, block, 40, 100, min_score=threshold)
+    assert total == len(passing) and pruned > 0
+    assert [(cid, result['overall_score']) for cid, result in page] == passing[40:140]
+    print("✅ Pages and score thresholds are slices of the full ranking")
+
+
+if __name__ == "__main__":
+    test_pipeline_ranks_like_pairwise_scoring()
+    test_extra_component_and_cached_block()
+    test_rank_pages_slice_the_full_ranking()
@@ -0,0 +1,130 @@
+import csv
+import json
+import os
+import random
+import tempfile
+
+from docx import Document
+
+import utils.screener as screener
+from utils.matcher import JobMatcher
+from utils.resume_parser import ResumeParser
+from utils.screener import Checkpoint, run_screening
+from utils.skill_extractor import SkillExtractor
+
+SKILLS = ['python', 'java', 'sql', 'docker', 'aws', 'react', 'machine learning', 'kubernetes']
+JOBS = [
+    {'id': 1, 'title': 'Backend Engineer', 'description': 'Python and SQL services on AWS with Docker',
+     'required_skills': ['python', 'sql', 'docker', 'aws'], 'required_experience': 4,
+     'education_requirements': ['bachelor']},
+    {'id': 2, 'title': 'Frontend Engineer', 'description': 'React applications with Java backends',
+     'required_skills': ['react', 'java'], 'required_experience': 2, 'education_requirements': []}
+]
+
+
+def write_resumes(root, count=10):
+    rng = random.Random(5)
+    for index in range(count):
+        document = Document()
+        document.add_paragraph(f'Candidate {index}')
+        document.add_paragraph(f'candidate{index}@example.com')
+        document.add_paragraph(f'{rng.randint(1, 10)} years of experience')
+        document.add_paragraph('Skills: ' + ', '.join(rng.sample(SKILLS, rng.randint(1, 5))))
+        document.add_paragraph(rng.choice(['Bachelor of Science', 'Master of Engineering', 'High school']))
+        document.save(os.path.join(root, f'resume_{index:02d}.docx'))
+
+
+class InterruptedCheckpoint(Checkpoint):
+    """Stops the run after a few files are recorded, like Ctrl-C"""
+
+    def record(self, record):
+        super().record(record)
+        if sum(1 for _ in open(self.path)) >= 4:
+            raise KeyboardInterrupt
+
+
+def test_interrupted_run_resumes_from_checkpoint():
+    print("🧪 Testing an interrupted screening run...")
+    with tempfile.TemporaryDirectory() as tmp:
+        resume_dir, out_dir = os.path.join(tmp, 'resumes'), os.path.join(tmp, 'out')
+        os.makedirs(resume_dir)
+        write_resumes(resume_dir)
+        results_path = os.path.join(out_dir, 'results.jsonl')
+
+        screener.Checkpoint = InterruptedCheckpoint
+        try:
+            run_screening(resume_dir, JOBS, out_dir, workers=1, log_every=0, chunk_size=1)
+            assert False, 'the run should have been interrupted'
+        except KeyboardInterrupt:
+            pass
+        finally:
+            screener.Checkpoint = Checkpoint
+        with open(results_path) as f:
+            recorded = len(f.readlines())
+        assert recorded >= 4
+        with open(results_path, 'a') as f:
+            f.write('{"file": "resume_')
+
+        stats = run_screening(resume_dir, JOBS, out_dir, workers=1, log_every=0, chunk_size=1)
+        assert stats['skipped'] == recorded and stats['processed'] == 10 - recorded and stats['failed'] == 0
+        with open(results_path) as f:
+            files = [json.loads(line)['file'] for line in f]
+        assert sorted(files) == [f'resume_{index:02d}.docx' for index in range(10)]
+
+        # ranked.csv orders each job's candidates like score_profiles
+        parser, extractor, matcher = ResumeParser(), SkillExtractor(), JobMatcher()
+        profiles = {}
+        for file in files:
+            parsed = parser.parse_resume(os.path.join(resume_dir, file), 'docx')
+            parsed['skills'] = extractor.extract_all_skills(parsed['raw_text'])
+            profiles[file] = matcher.build_candidate_profile(parsed)
+        with open(os.path.join(out_dir, 'ranked.csv'), newline='') as f:
+            rows = list(csv.DictReader(f))
+        for job in JOBS:
+            job_profile = matcher.build_job_profile(job)
+            expected = sorted(((matcher.score_profiles(profile, job_profile)['overall_score'], file)
+                               for file, profile in profiles.items()), key=lambda item: (-item[0], item[1]))
+            ranked = [(float(row['overall_score']), row['file']) for row in rows if row['job_id'] == str(job['id'])]
+            assert ranked == expected
+    print("✅ The rerun skips checkpointed files and ranks like score_profiles")
+
+
+def test_broken_pool_records_every_lost_chunk():
+    print("🧪 Testing a pool that breaks with several chunks in flight...")
+    with tempfile.TemporaryDirectory() as tmp:
+        resume_dir, out_dir = os.path.join(tmp, 'resumes'), os.path.join(tmp, 'out')
+        os.makedirs(resume_dir)
+        write_resumes(resume_dir)
+
+        # A job the workers cannot profile fails every initializer, breaking each pool started
+        stats = run_screening(resume_dir, [dict(JOBS[0], required_skills=3)], out_dir, workers=2, log_every=0,
+                              chunk_size=1)
+        assert stats['processed'] == 10 and stats['failed'] == 10 and stats['ranked_rows'] == 0
+        with open(os.path.join(out_dir, 'results.jsonl')) as f:
+            records = [json.loads(line) for line in f]
+        assert sorted(record['file'] for record in records) == [f'resume_{index:02d}.docx' for index in range(10)]
+        assert {record['error'] for record in records} == {'worker process died'}
+    print("✅ Every chunk lost with the pool is recorded once for --retry-errors")
+
+
+def test_checkpoint_keeps_records_after_a_damaged_line():
+    print("🧪 Testing checkpoint recovery...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'results.jsonl')
+        lines = [json.dumps({'file': 'a.pdf', 'size': 1, 'mtime_ns': 1}), '{"file": "b.pdf", "si',
+                 json.dumps({'file': 'c.pdf', 'size': 3, 'mtime_ns': 3, 'error': 'boom'})]
+        with open(path, 'w') as f:
+            f.write('\n'.join(lines) + '\n{"file": "d.p')
+
+        checkpoint = Checkpoint(path)
+        checkpoint.close()
+        assert set(checkpoint.done) == {'a.pdf', 'c.pdf'} and checkpoint.failed == {'c.pdf'}
+        with open(path) as f:
+            assert f.read() == '\n'.join(lines) + '\n'
+    print("✅ Only a partial last line is cut from the checkpoint")
+
+
+if __name__ == "__main__":
+    test_interrupted_run_resumes_from_checkpoint()
+    test_broken_pool_records_every_lost_chunk()
+    test_checkpoint_keeps_records_after_a_damaged_line()
@@ -0,0 +1,58 @@
+import json
+import sqlite3
+
+from utils.candidate_cache import init_pool_version
+from utils.search import SearchQueryError, init_search_index, search_candidate_ids, search_candidates
+
+
+def make_db():
+    conn = sqlite3.connect(':memory:')
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE candidates (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, email TEXT, phone TEXT,
+            location TEXT, experience_years INTEGER, skills TEXT, education TEXT,
+            resume_path TEXT, uploaded_at TIMESTAMP, raw_text TEXT
+        )
+    ''')
+    # Existing rows are backfilled when the index is created
+    cursor.execute("INSERT INTO candidates (name, skills, raw_text) VALUES (?, ?, ?)",
+                   ('Asha', json.dumps({'ai_ml': ['tensorflow'], 'cloud_platforms': []}), 'Built models in Pune'))
+    init_pool_version(cursor)
+    init_search_index(cursor)
+    cursor.execute("INSERT INTO candidates (name, skills, raw_text) VALUES (?, ?, ?)",
+                   ('Ravi', json.dumps({'web_technologies': ['react native']}), 'Mobile apps for clients in Mumbai'))
+    return conn, cursor
+
+
+def test_fts_search():
+    print("🧪 Testing full-text candidate search...")
+    conn, cursor = make_db()
+
+    total, hits = search_candidates(cursor, 'tensorflow')
+    assert total == 1 and hits[0]['name'] == 'Asha'
+    assert '<mark>' in hits[0]['snippet']
+
+    # Category keys of the skills JSON are not indexed
+    assert search_candidates(cursor, 'cloud')[0] == 0
+    assert sorted(search_candidate_ids(cursor, 'skills: "react native" OR pune')) == [1, 2]
+
+    cursor.execute("UPDATE candidates SET raw_text = 'Relocated to Chennai' WHERE id = 2")
+    assert search_candidate_ids(cursor, 'chennai') == [2]
+    assert search_candidate_ids(cursor, 'mumbai') == []
+
+    cursor.execute("DELETE FROM candidates WHERE id = 1")
+    assert search_candidate_ids(cursor, 'tensorflow') == []
+
+    try:
+        search_candidates(cursor, 'AND (')
+        assert False, 'malformed query should be rejected'
+    except SearchQueryError:
+        pass
+
+    conn.close()
+    print("✅ FTS5 index follows inserts, updates and deletes")
+
+
+if __name__ == "__main__":
+    test_fts_search()
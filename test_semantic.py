@@ -0,0 +1,72 @@
+import os
+import sqlite3
+import tempfile
+
+from test_matcher import JOB, create_pool, make_candidates
+from utils.engine import MatchEngine
+from utils.matcher import JobMatcher
+from utils.semantic import HashingSemantic, init_semantic_schema, read_df_version, rebuild_document_frequencies
+
+
+def test_hashed_vectors_are_independent():
+    print("🧪 Testing hashed semantic vectors...")
+    matcher = JobMatcher(semantic=HashingSemantic(1024))
+    text = 'Senior Python developer building machine learning models on AWS'
+    before = matcher.build_term_counts(text)
+    assert before and all(0 <= bucket < 1024 for bucket in before)
+
+    # Counting other documents changes the weights, never a document's own vector
+    matcher.record_documents(None, [matcher.build_term_counts(f'word{index} python') for index in range(500)])
+    assert matcher.build_term_counts(text) == before
+    assert matcher.semantic.docs == 500 and matcher.semantic.doc_freq.shape == (1024,)
+    assert abs(matcher.calculate_semantic_similarity(text, text) - 1.0) < 1e-9
+    assert matcher.calculate_semantic_similarity(text, 'unrelated cooking recipes') == 0.0
+
+    # Rare shared terms count for more than common ones
+    rare = matcher.semantic_similarity_from_terms(matcher.build_term_counts('python kubernetes'),
+                                                  matcher.build_term_counts('kubernetes java'))
+    common = matcher.semantic_similarity_from_terms(matcher.build_term_counts('python kubernetes'),
+                                                    matcher.build_term_counts('python java'))
+    assert rare > common
+    assert matcher.scorer_version() != JobMatcher().scorer_version()
+    print("✅ Vectors depend only on their own text, weights on the counted pool")
+
+
+def test_hashing_engine_ranks_like_exhaustive_scoring():
+    print("🧪 Testing hashing engine rankings...")
+    candidates = make_candidates(120)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'candidates.db')
+        create_pool(db_path, candidates)
+        matcher = JobMatcher(semantic=HashingSemantic(4096, db_path))
+        assert rebuild_document_frequencies(db_path, matcher) == 120
+        matcher.refresh_semantic()
+        assert matcher.semantic.docs == 120
+
+        expected = [(index + 1, matcher.calculate_overall_match(candidate, JOB))
+                    for index, candidate in enumerate(candidates)]
+        expected.sort(key=lambda item: (-item[1]['overall_score'], item[0]))
+        profiles = [(index + 1, matcher.build_candidate_profile(c)) for index, c in enumerate(candidates)]
+        assert matcher.rank_profiles(profiles, matcher.build_job_profile(JOB), 10)[0] == expected[:10]
+
+        engine = MatchEngine(db_path, workers=1, shards_per_worker=5, matcher=matcher)
+        assert engine.match(JOB, top_k=10)[0] == expected[:10]
+
+        # Another writer's documents are picked up on the next refresh
+        conn = sqlite3.connect(db_path)
+        init_semantic_schema(conn.cursor())
+        matcher.record_documents(conn.cursor(), [matcher.build_term_counts(JOB['description'])])
+        conn.commit()
+        assert read_df_version(conn.cursor()) == (121, 1)
+        conn.close()
+        matcher.refresh_semantic()
+        assert matcher.semantic.docs == 121
+        matcher.semantic.close()
+
+    print("✅ Top-K and sharded rankings equal exhaustive hashed scoring")
+
+
+if __name__ == "__main__":
+    test_hashed_vectors_are_independent()
+    test_hashing_engine_ranks_like_exhaustive_scoring()
@@ -0,0 +1,132 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from utils.singleflight import FlightGroup, init_flight_schema
+
+
+def run_threads(count, target):
+    results = [None] * count
+    threads = [threading.Thread(target=lambda i=i: results.__setitem__(i, target())) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_threads_share_one_computation():
+    print("🧪 Testing in-process request coalescing...")
+    group = FlightGroup()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return {'matches': [1, 2, 3]}
+
+    results = run_threads(8, lambda: group.run('job-1', compute))
+    assert len(calls) == 1
+    assert all(result == {'matches': [1, 2, 3]} for result, _ in results)
+    assert sorted(shared for _, shared in results) == [False] + [True] * 7
+    assert group.coalesced_total == 7
+
+    # Once the flight landed, the next call computes again
+    group.run('job-1', compute)
+    assert len(calls) == 2
+
+    def fail():
+        time.sleep(0.2)
+        raise RuntimeError('scoring failed')
+
+    def call_failing():
+        try:
+            group.run('job-2', fail)
+        except RuntimeError as e:
+            return str(e)
+
+    assert run_threads(4, call_failing) == ['scoring failed'] * 4
+    print("✅ Concurrent identical calls cost one computation and share its result or error")
+
+
+def test_processes_share_through_lease():
+    print("🧪 Testing cross-process request coalescing...")
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'flights.db')
+        conn = sqlite3.connect(db_path)
+        init_flight_schema(conn.cursor())
+        conn.commit()
+        conn.close()
+
+        # Two groups stand in for two gunicorn workers
+        leader = FlightGroup(db_path, poll_interval=0.01)
+        follower = FlightGroup(db_path, poll_interval=0.01)
+        started, release = threading.Event(), threading.Event()
+
+        def slow():
+            started.set()
+            release.wait()
+            return {'matches': [7]}
+
+        outcome = {}
+        thread = threading.Thread(target=lambda: outcome.update(leader=leader.run('job-1', slow)))
+        thread.start()
+        started.wait()
+        waited = {}
+        follower_thread = threading.Thread(
+            target=lambda: waited.update(result=follower.run('job-1', lambda: {'matches': ['recomputed']})))
+        follower_thread.start()
+        time.sleep(0.1)
+        # The waiting worker joined once and polls without holding the write lock
+        writer = sqlite3.connect(db_path, timeout=0)
+        for _ in range(5):
+            writer.execute('BEGIN IMMEDIATE')
+            assert writer.execute("SELECT waiters FROM match_flights WHERE key = 'job-1'").fetchone() == (1,)
+            writer.rollback()
+            time.sleep(0.02)
+        release.set()
+        follower_thread.join()
+        thread.join()
+        assert waited['result'] == ({'matches': [7]}, True)
+        assert outcome['leader'] == ({'matches': [7]}, False)
+
+        # Without waiters the leader only marks its flight finished
+        assert leader.run('job-4', lambda: {'matches': [10]}) == ({'matches': [10]}, False)
+        assert writer.execute("SELECT result, finished_at IS NOT NULL FROM match_flights "
+                              "WHERE key = 'job-4'").fetchone() == (None, 1)
+        writer.close()
+
+        # A leader that fails gives the lease up and a waiting worker computes instead
+        started.clear()
+        release.clear()
+
+        def broken():
+            started.set()
+            release.wait()
+            raise RuntimeError('worker failed')
+
+        def lead_and_fail():
+            try:
+                leader.run('job-2', broken)
+            except RuntimeError:
+                pass
+
+        thread = threading.Thread(target=lead_and_fail)
+        thread.start()
+        started.wait()
+        threading.Timer(0.1, release.set).start()
+        assert follower.run('job-2', lambda: {'matches': [8]}) == ({'matches': [8]}, False)
+        thread.join()
+
+        # A lease left behind by a dead worker is taken over once it expires
+        stale = FlightGroup(db_path, lease_seconds=0.1)
+        stale._acquire('job-3')
+        assert follower.run('job-3', lambda: {'matches': [9]}) == ({'matches': [9]}, False)
+    print("✅ Workers wait on one lease holder and take over from failed or dead ones")
+
+
+if __name__ == "__main__":
+    test_threads_share_one_computation()
+    test_processes_share_through_lease()
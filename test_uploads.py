@@ -0,0 +1,45 @@
+import io
+import os
+import tempfile
+
+from utils.uploads import UploadRejected, receive_upload
+
+BOUNDARY = 'testboundary'
+
+
+def multipart_body(filename, content, name='Asha'):
+    return (
+        f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="resume"; filename="{filename}"\r\n'
+        f'Content-Type: application/octet-stream\r\n\r\n'.encode() + content +
+        f'\r\n--{BOUNDARY}\r\nContent-Disposition: form-data; name="name"\r\n\r\n{name}\r\n'
+        f'--{BOUNDARY}--\r\n'.encode()
+    )
+
+
+def test_streamed_upload():
+    print("🧪 Testing streamed resume uploads...")
+    pdf = b'%PDF-1.4\n' + os.urandom(200000)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Small chunks exercise parts split across reads; the extension is corrected from the content
+        upload = receive_upload(io.BytesIO(multipart_body('resume.docx', pdf)), BOUNDARY, tmp, chunk_size=997)
+        assert upload.file_type == 'pdf' and upload.path.endswith('.pdf')
+        assert upload.form == {'name': 'Asha'} and upload.size == len(pdf)
+        with open(upload.path, 'rb') as f:
+            assert f.read() == pdf
+
+        for content, max_bytes in ((b'MZ' + b'\0' * 5000, None), (pdf, 1000)):
+            try:
+                receive_upload(io.BytesIO(multipart_body('resume.pdf', content)), BOUNDARY, tmp, max_bytes=max_bytes)
+                assert False, 'upload should be rejected'
+            except UploadRejected:
+                pass
+
+        # Rejected uploads leave no temporary files behind
+        assert os.listdir(tmp) == [os.path.basename(upload.path)]
+
+    print("✅ Uploads stream to disk with sniffed types")
+
+
+if __name__ == "__main__":
+    test_streamed_upload()
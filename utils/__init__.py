@@ -6,19 +6,49 @@ This package contains utility modules for:
 - Resume parsing (resume_parser.py)
 - Skill extraction (skill_extractor.py) 
 - Job matching algorithms (matcher.py)
+- Sharded multi-process matching (engine.py)
+- Memory-mapped candidate feature store (feature_store.py)
+- Process-local candidate cache (candidate_cache.py)
+- Full-text candidate search (search.py)
+- Job-side index for reverse matching (job_index.py)
+- All-pairs batch matching (batch.py)
+- Offline batch screener, run as `python -m utils` (screener.py)
+- Streaming resume uploads (uploads.py)
+- Budgeted text extraction in worker processes (extraction.py)
+- Background reprocessing after taxonomy or scorer changes (reprocess.py)
+- Bulk job description import (job_import.py)
+- Stage timers and Prometheus metrics (metrics.py)
+- Single-request cProfile/sampling profiles (profiling.py)
+- Fixed-memory hashed semantic vectors (semantic.py)
+- Pluggable vectorized scoring components (scoring.py)
+- Single-flight coalescing of identical requests (singleflight.py)
+- Version-stamped ETags for conditional responses (conditional.py)
+- Candidate filters compiled to SQL before scoring (filters.py)
 """
 
-# Import main classes for easy access
-try:
-    from .resume_parser import ResumeParser
-    from .skill_extractor import SkillExtractor
-    from .matcher import JobMatcher
-    
-    __all__ = ['ResumeParser', 'SkillExtractor', 'JobMatcher']
-    
-except ImportError as e:
-    print(f"Warning: Could not import all utils modules: {e}")
-    __all__ = []
+# Main classes for easy access, imported on first use so that importing one
+# light submodule (e.g. extraction.py in a worker fork server) does not load
+# spaCy, scikit-learn and the matching engine
+_EXPORTS = {
+    'ResumeParser': 'resume_parser',
+    'SkillExtractor': 'skill_extractor',
+    'JobMatcher': 'matcher',
+    'MatchEngine': 'engine',
+    'FeatureStore': 'feature_store',
+    'CandidateCache': 'candidate_cache',
+    'JobIndex': 'job_index'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    value = getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+    globals()[name] = value
+    return value
 
 # Version information
 __version__ = '1.0.0'
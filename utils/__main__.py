@@ -0,0 +1,5 @@
+"""Entry point for ``python -m utils``: the offline batch screener"""
+from .screener import main
+
+if __name__ == '__main__':
+    main()
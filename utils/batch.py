@@ -0,0 +1,262 @@
+"""
+All-pairs batch matching: every candidate scored against every job.
+
+Candidates are read in id order, one tile at a time, and scored against the
+whole job set with the sparse matrix products of JobIndex. Each tile's
+results go to the ``matches`` table in a single bulk insert, so memory use
+is bounded by the tile size, not the size of the candidate pool.
+
+``BackgroundBatch`` runs one batch at a time in a daemon thread for the
+``/batch_match`` endpoint, which returns at once and reports progress
+through ``/batch_match/status``.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from . import metrics
+from .candidate_cache import CANDIDATE_RECORD_QUERY, CandidateRecord
+from .job_index import JobIndex
+from .reprocess import init_reprocess_schema
+
+MATCH_INSERT = '''
+    INSERT INTO matches
+    (candidate_id, job_id, overall_score, skill_score, experience_score, education_score,
+    semantic_score, matched_skills, missing_skills, created_at, scorer_version)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+# Dense (candidates x jobs) float64 matrices alive while a tile is scored
+_TILE_MATRICES = 16
+
+# Largest tile a caller may ask for; bigger ones gain nothing over the byte budget
+MAX_TILE_SIZE = 100000
+
+
+class BatchError(ValueError):
+    """Raised for batch arguments that cannot be used"""
+
+
+def validate_batch_args(job_ids=None, tile_size=None):
+    """Check request-supplied job ids and tile size; raises BatchError"""
+    if job_ids is not None:
+        if (not isinstance(job_ids, (list, tuple)) or
+                not all(isinstance(job_id, int) and not isinstance(job_id, bool) for job_id in job_ids)):
+            raise BatchError('job_ids must be a list of integer job ids')
+        job_ids = list(job_ids)
+    if tile_size is not None:
+        if isinstance(tile_size, bool) or not isinstance(tile_size, int) or not 1 <= tile_size <= MAX_TILE_SIZE:
+            raise BatchError(f'tile_size must be an integer from 1 to {MAX_TILE_SIZE}')
+    return job_ids, tile_size
+
+
+def tile_size_for(job_count: int, max_tile_bytes: int) -> int:
+    """Candidates per tile that keep the dense score matrices under a byte budget"""
+    return max(1, max_tile_bytes // (8 * _TILE_MATRICES * max(job_count, 1)))
+
+
+def _match_rows(index: JobIndex, candidate_ids: List[int], scores: Dict[str, np.ndarray],
+                columns: np.ndarray, created_at: datetime, scorer_version: str) -> List[tuple]:
+    """Rows for the matches table, rounded the way JobMatcher._combine_scores rounds
+
+    ``scores`` holds only the job ``columns``, as scored by ``score_tile``.
+    """
+    job_skills = [[index.skill_ids[skill] for skill in index.profiles[column]['skills']] for column in columns]
+    job_ids = index.job_ids[columns].tolist()
+    overall = scores['overall'].tolist()
+    skills = scores['skills'].tolist()
+    experience = scores['experience'].tolist()
+    education = scores['education'].tolist()
+    semantic = scores['semantic'].tolist()
+
+    rows = []
+    for row, candidate_id in enumerate(candidate_ids):
+        exact = scores['exact'][row].tolist()
+        partial = scores['partial'][row].tolist()
+        for column, job_id in enumerate(job_ids):
+            required = job_skills[column]
+            matched = [index.skill_vocab[skill] for skill in required if exact[skill]]
+            missing = [index.skill_vocab[skill] for skill in required if not exact[skill] and not partial[skill]]
+            rows.append((
+                candidate_id,
+                job_id,
+                round(overall[row][column] * 100, 2),
+                skills[row][column] * 100,
+                round(experience[row][column] * 100, 2),
+                round(education[row][column] * 100, 2),
+                round(semantic[row][column] * 100, 2),
+                json.dumps(matched),
+                json.dumps(missing),
+                created_at,
+                scorer_version
+            ))
+    return rows
+
+
+def run_batch(db_path: str, matcher, job_ids: Optional[Iterable[int]] = None,
+              tile_size: Optional[int] = None, max_tile_bytes: int = 64 * 1024 * 1024,
+              progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """Score all candidates against all (or the given) jobs and store the matrix
+
+    Returns run statistics, including throughput in pairs per second.
+    ``progress`` is called with the running statistics after every tile.
+    Raises BatchError for unusable ``job_ids`` or ``tile_size``.
+    """
+    job_ids, tile_size = validate_batch_args(None if job_ids is None else list(job_ids), tile_size)
+    started = time.perf_counter()
+
+    # A private index, so the job set cannot change in the middle of a run
+    index = JobIndex(db_path, matcher)
+    index.refresh()
+    index.close()
+
+    if job_ids is None:
+        columns, scored_columns = np.arange(len(index.jobs)), None
+    else:
+        columns = np.flatnonzero(np.isin(index.job_ids, np.array(job_ids, dtype=np.int64)))
+        scored_columns = columns
+
+    stats = {
+        'candidates': 0,
+        'jobs': len(columns),
+        'pairs': 0,
+        'tiles': 0,
+        'tile_size': tile_size or tile_size_for(len(columns), max_tile_bytes),
+        'scoring_seconds': 0.0,
+        'seconds': 0.0,
+        'pairs_per_second': 0.0
+    }
+    if not len(columns):
+        return stats
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    watermark = 0
+    try:
+        while True:
+            # Keyset pagination keeps no read statement open across the writes
+            cursor.execute(CANDIDATE_RECORD_QUERY + ' WHERE id > ? ORDER BY id LIMIT ?',
+                           (watermark, stats['tile_size']))
+            records = [CandidateRecord(row, matcher) for row in cursor.fetchall()]
+            if not records:
+                break
+            watermark = records[-1].id
+
+            tile_started = time.perf_counter()
+            scores = index.score_tile([record.profile for record in records], scored_columns)
+            stats['scoring_seconds'] += time.perf_counter() - tile_started
+
+            rows = _match_rows(index, [record.id for record in records], scores, columns, datetime.now(),
+                              matcher.scorer_version())
+            with metrics.timer('db_write'):
+                cursor.executemany(MATCH_INSERT, rows)
+                conn.commit()
+
+            stats['candidates'] += len(records)
+            stats['pairs'] += len(rows)
+            stats['tiles'] += 1
+            stats['seconds'] = time.perf_counter() - started
+            stats['pairs_per_second'] = stats['pairs'] / stats['seconds'] if stats['seconds'] else 0.0
+            if progress is not None:
+                progress(dict(stats))
+    finally:
+        conn.close()
+
+    stats['seconds'] = round(time.perf_counter() - started, 3)
+    stats['scoring_seconds'] = round(stats['scoring_seconds'], 3)
+    stats['pairs_per_second'] = round(stats['pairs'] / stats['seconds'], 1) if stats['seconds'] else 0.0
+    return stats
+
+
+class BackgroundBatch:
+    """Runs batch matching in a daemon thread, one run at a time"""
+
+    def __init__(self, db_path: str, matcher):
+        self.db_path = db_path
+        self.matcher = matcher
+        self._thread = None
+        self._lock = threading.Lock()
+        self._run = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, job_ids: Optional[List[int]] = None, tile_size: Optional[int] = None) -> bool:
+        """Start a run; False if one is already in progress. Raises BatchError"""
+        job_ids, tile_size = validate_batch_args(job_ids, tile_size)
+        with self._lock:
+            if self.running:
+                return False
+            self._run = {
+                'job_ids': job_ids,
+                'tile_size': tile_size,
+                'started_at': datetime.now().isoformat(),
+                'finished_at': None,
+                'stats': None,
+                'error': None
+            }
+            self._thread = threading.Thread(target=self._work, args=(self._run,), name='batch-match', daemon=True)
+            self._thread.start()
+            return True
+
+    def join(self, timeout: Optional[float] = None):
+        """Wait for the current run to finish"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _work(self, run: Dict):
+        def report(stats):
+            run['stats'] = stats
+
+        try:
+            run['stats'] = run_batch(self.db_path, self.matcher, run['job_ids'], run['tile_size'], progress=report)
+        except Exception as e:
+            run['error'] = str(e)
+        finally:
+            run['finished_at'] = datetime.now().isoformat()
+
+    def status(self) -> Dict:
+        with self._lock:
+            return {'running': self.running, 'run': dict(self._run) if self._run else None}
+
+
+def main(argv=None):
+    """Compute the full candidates x jobs score matrix from the command line"""
+    import argparse
+
+    from .matcher import JobMatcher
+    from .semantic import build_semantic
+
+    parser = argparse.ArgumentParser(description='All-pairs batch matching')
+    parser.add_argument('--db', default=os.path.join('database', 'candidates.db'))
+    parser.add_argument('--jobs', type=int, nargs='*', help='Job ids to score (default: all)')
+    parser.add_argument('--tile-size', type=int, default=None, help='Candidates scored per tile')
+    args = parser.parse_args(argv)
+
+    def report(stats):
+        print(f"{stats['candidates']:>8} candidates  {stats['pairs']:>10} pairs  "
+              f"{stats['pairs_per_second']:>10.0f} pairs/s")
+
+    # Databases not yet opened by the app lack the scorer_version stamp column
+    conn = sqlite3.connect(args.db)
+    try:
+        init_reprocess_schema(conn.cursor())
+        conn.commit()
+    finally:
+        conn.close()
+
+    stats = run_batch(args.db, JobMatcher(semantic=build_semantic(db_path=args.db)), args.jobs or None,
+                      args.tile_size, progress=report)
+    print(f"Scored {stats['pairs']} pairs ({stats['candidates']} candidates x {stats['jobs']} jobs) "
+          f"in {stats['seconds']}s: {stats['pairs_per_second']} pairs/s")
+
+
+if __name__ == '__main__':
+    main()
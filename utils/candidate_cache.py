@@ -0,0 +1,205 @@
+"""
+Process-local cache of decoded candidate records.
+
+Records keep the JSON columns already decoded and the scorer profile already
+built, but not ``raw_text``. Freshness is checked with ``PRAGMA data_version``
+on a long-lived connection, which only changes when another connection
+commits, and then with the ``pool_version`` change counter maintained by
+triggers on the candidates table:
+
+- ``version`` grows on every insert, update or delete
+- ``rewrites`` grows only on updates and deletes
+
+If only ``version`` moved, rows above the id watermark are loaded; if
+``rewrites`` moved, the cache is reloaded from scratch.
+
+Given a ``ScoringPipeline`` the cache builds profiles with it and also keeps
+a ``CandidateBlock`` of the same records, extended as rows are loaded.
+"""
+import json
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from . import metrics
+
+POOL_VERSION_SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS pool_version (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL,
+        rewrites INTEGER NOT NULL
+    )
+    ''',
+    'INSERT OR IGNORE INTO pool_version (id, version, rewrites) VALUES (1, 0, 0)',
+    '''
+    CREATE TRIGGER IF NOT EXISTS candidates_version_insert AFTER INSERT ON candidates
+    BEGIN
+        UPDATE pool_version SET version = version + 1 WHERE id = 1;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS candidates_version_update AFTER UPDATE ON candidates
+    BEGIN
+        UPDATE pool_version SET version = version + 1, rewrites = rewrites + 1 WHERE id = 1;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS candidates_version_delete AFTER DELETE ON candidates
+    BEGIN
+        UPDATE pool_version SET version = version + 1, rewrites = rewrites + 1 WHERE id = 1;
+    END
+    '''
+]
+
+CANDIDATE_RECORD_QUERY = '''
+    SELECT id, name, email, phone, location, experience_years, skills, education, raw_text
+    FROM candidates
+'''
+
+
+def init_pool_version(cursor):
+    """Create the pool_version counter and the triggers that maintain it"""
+    for statement in POOL_VERSION_SCHEMA:
+        cursor.execute(statement)
+
+
+def read_pool_version(cursor) -> Tuple[int, int]:
+    """Return (version, rewrites) for the candidate pool"""
+    try:
+        cursor.execute('SELECT version, rewrites FROM pool_version WHERE id = 1')
+    except sqlite3.OperationalError:
+        # Database created before the counter existed
+        return (0, 0)
+    row = cursor.fetchone()
+    return (row[0], row[1]) if row else (0, 0)
+
+
+class CandidateRecord:
+    """Decoded candidate row plus its scorer profile, without the resume text"""
+
+    __slots__ = ('id', 'name', 'email', 'phone', 'location', 'experience_years',
+                 'skills', 'education', 'profile')
+
+    def __init__(self, row, matcher):
+        skills = json.loads(row[6]) if row[6] else {}
+        education = json.loads(row[7]) if row[7] else []
+
+        self.id = row[0]
+        self.name = row[1]
+        self.email = row[2]
+        self.phone = row[3]
+        self.location = row[4]
+        self.experience_years = row[5]
+        self.skills = skills
+        self.education = education
+        self.profile = matcher.build_candidate_profile({
+            'location': row[4],
+            'experience_years': row[5],
+            'skills': skills,
+            'education': education,
+            'raw_text': row[8] or ''
+        })
+
+    def to_dict(self) -> Dict:
+        return {
+            'id': self.id,
+            'name': self.name,
+            'email': self.email,
+            'phone': self.phone,
+            'location': self.location,
+            'experience_years': self.experience_years,
+            'skills': self.skills,
+            'education': self.education
+        }
+
+
+class CandidateCache:
+    """Candidate records of one database, refreshed incrementally on demand"""
+
+    def __init__(self, db_path: str, matcher, pipeline=None):
+        self.db_path = db_path
+        self.matcher = matcher
+        self.pipeline = pipeline
+        self.records_list: List[CandidateRecord] = []
+        self.candidate_block = None
+        self.index: Dict[int, int] = {}
+        self.watermark = 0
+        self.pool_version = None
+        self.hits = 0
+        self.misses = 0
+        self._data_version = None
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        return self._conn
+
+    def _load(self, cursor, above: int):
+        cursor.execute(CANDIDATE_RECORD_QUERY + ' WHERE id > ? ORDER BY id', (above,))
+        builder = self.pipeline or self.matcher
+        added = []
+        for row in cursor:
+            self.index[row[0]] = len(self.records_list)
+            record = CandidateRecord(row, builder)
+            self.records_list.append(record)
+            added.append((record.id, record.profile))
+            self.watermark = row[0]
+        if self.pipeline is not None and (added or self.candidate_block is None):
+            self.candidate_block = self.pipeline.extend(self.candidate_block, added)
+
+    def refresh(self):
+        """Bring the cache up to date; a no-op when nothing was committed"""
+        with self._lock:
+            cursor = self._connection().cursor()
+            cursor.execute('PRAGMA data_version')
+            data_version = cursor.fetchone()[0]
+            if data_version == self._data_version:
+                self.hits += 1
+                return
+
+            pool_version = read_pool_version(cursor)
+            if self.pool_version is not None and pool_version == self.pool_version:
+                self._data_version = data_version
+                self.hits += 1
+                return
+
+            self.misses += 1
+            if self.pool_version is None or pool_version[1] != self.pool_version[1]:
+                # Rows were updated or deleted: start over
+                self.records_list, self.index, self.watermark = [], {}, 0
+                self.candidate_block = None
+            with metrics.timer('candidate_cache_load'):
+                self._load(cursor, self.watermark)
+            self.pool_version = pool_version
+            self._data_version = data_version
+
+    def records(self) -> List[CandidateRecord]:
+        """All cached records in id order"""
+        self.refresh()
+        return self.records_list
+
+    def get_many(self, candidate_ids: Iterable[int]) -> Dict[int, CandidateRecord]:
+        """Look up cached records by id, skipping unknown ids"""
+        self.refresh()
+        with self._lock:
+            records, index = self.records_list, self.index
+            return {cid: records[index[cid]] for cid in candidate_ids if cid in index}
+
+    def block(self):
+        """The cached records packed for ``ScoringPipeline.rank``; needs a pipeline"""
+        self.refresh()
+        return self.candidate_block
+
+    def version(self) -> Optional[Tuple[int, int]]:
+        """Pool version the cache currently reflects"""
+        self.refresh()
+        return self.pool_version
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,73 @@
+"""
+Version stamps for HTTP conditional responses.
+
+Match results, the dashboard and CSV exports are functions of a few change
+counters kept by triggers: ``pool_version`` (candidates), ``job_version``
+(job descriptions) and ``match_version`` (stored match rows), plus the
+scorer version. ``read_versions`` reads all three in one query, so a
+request carrying a current ``If-None-Match`` is answered without scoring or
+reading the data itself. ETags are strong: equal stamps mean byte-equal
+bodies.
+"""
+import hashlib
+import json
+import sqlite3
+from typing import Dict, Tuple
+
+MATCH_VERSION_SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS match_version (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL
+    )
+    ''',
+    'INSERT OR IGNORE INTO match_version (id, version) VALUES (1, 0)',
+    '''
+    CREATE TRIGGER IF NOT EXISTS matches_version_insert AFTER INSERT ON matches
+    BEGIN
+        UPDATE match_version SET version = version + 1 WHERE id = 1;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS matches_version_update AFTER UPDATE ON matches
+    BEGIN
+        UPDATE match_version SET version = version + 1 WHERE id = 1;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS matches_version_delete AFTER DELETE ON matches
+    BEGIN
+        UPDATE match_version SET version = version + 1 WHERE id = 1;
+    END
+    '''
+]
+
+VERSIONS_QUERY = '''
+    SELECT p.version, p.rewrites, j.version, j.rewrites, m.version
+    FROM pool_version p, job_version j, match_version m
+    WHERE p.id = 1 AND j.id = 1 AND m.id = 1
+'''
+
+
+def init_match_version(cursor):
+    """Create the match_version counter and the triggers that maintain it"""
+    for statement in MATCH_VERSION_SCHEMA:
+        cursor.execute(statement)
+
+
+def read_versions(cursor) -> Dict[str, Tuple[int, ...]]:
+    """Current pool, job and match versions"""
+    try:
+        cursor.execute(VERSIONS_QUERY)
+        row = cursor.fetchone()
+    except sqlite3.OperationalError:
+        row = None
+    if row is None:
+        row = (0, 0, 0, 0, 0)
+    return {'pool': (row[0], row[1]), 'jobs': (row[2], row[3]), 'matches': (row[4],)}
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag value (without quotes) for a JSON-serializable list of version stamps"""
+    stamp = json.dumps(parts, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(stamp.encode('utf-8')).hexdigest()[:20]
@@ -0,0 +1,223 @@
+"""
+Sharded multi-process matching engine.
+
+Candidate features live in the memory-mapped FeatureStore, which the worker
+processes open themselves, so scoring tasks only carry the job profile and a
+row range. Each shard returns its partial top-K and the engine merges them.
+"""
+import heapq
+import json
+import multiprocessing
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .feature_store import FeatureStore, FeatureStoreView
+from .matcher import JobMatcher
+from .semantic import HashingSemantic, build_semantic
+
+# Worker-side state, populated lazily in each process
+_VIEWS = {}
+_MATCHERS = {}
+
+
+def _rank_key(entry: Tuple[int, Dict]) -> Tuple[float, int]:
+    """Sort key giving the same order as a stable sort of the pool by score"""
+    candidate_id, match_result = entry
+    return (-match_result['overall_score'], candidate_id)
+
+
+def _get_worker_matcher(semantic: Optional[Dict] = None) -> JobMatcher:
+    """One matcher per semantic engine configuration (None is pair TF-IDF)"""
+    key = tuple(sorted(semantic.items())) if semantic else None
+    matcher = _MATCHERS.get(key)
+    if matcher is None:
+        matcher = _MATCHERS[key] = JobMatcher(semantic=HashingSemantic(**semantic) if semantic else None)
+    return matcher
+
+
+def _open_view(path: str, manifest: Dict) -> FeatureStoreView:
+    """Map a store generation once per process; stale views are dropped"""
+    key = (path, manifest['rows'])
+    view = _VIEWS.get(key)
+    if view is None:
+        _VIEWS.clear()
+        view = _VIEWS[key] = FeatureStoreView(path, manifest)
+    return view
+
+
+def _semantic_score(matcher: JobMatcher, view: FeatureStoreView,
+                    candidate_terms: Dict, job_terms: Dict) -> float:
+    """Semantic similarity on id-keyed terms, falling back to strings for trimming"""
+    if matcher.semantic is not None:
+        # Store ids stand for hash buckets; job terms are kept keyed by bucket
+        vocab = view.term_vocab
+        return matcher.semantic.similarity({vocab[term]: count for term, count in candidate_terms.items()},
+                                           job_terms)
+    max_features = matcher.tfidf_vectorizer.max_features
+    shared = candidate_terms.keys() & job_terms.keys()
+    if max_features and len(candidate_terms) + len(job_terms) - len(shared) > max_features:
+        vocab = view.term_vocab
+        candidate_terms = {vocab[term]: count for term, count in candidate_terms.items()}
+        job_terms = {vocab[term] if isinstance(term, int) else term: count for term, count in job_terms.items()}
+    return matcher.semantic_similarity_from_terms(candidate_terms, job_terms)
+
+
+def score_shard(store_path: str, manifest: Dict, job_profile: Dict, rows: Sequence[int],
+                top_k: Optional[int] = None,
+                semantic: Optional[Dict] = None) -> Tuple[List[Tuple[int, Dict]], int]:
+    """Score feature store rows (a range or a list of row numbers) against a job
+
+    ``semantic`` is the parent's HashingSemantic config, if it uses one.
+    Returns the shard's top-K and how many candidates were pruned.
+    """
+    view = _open_view(store_path, manifest)
+    matcher = _get_worker_matcher(semantic)
+
+    def semantic_fn(profile, job):
+        return _semantic_score(matcher, view, view.candidate_terms(profile['row']), job['terms'])
+
+    candidates = ((int(view.ids[row]), view.candidate_profile(row, with_terms=False))
+                  for row in rows)
+    return matcher.rank_profiles(candidates, job_profile, top_k, semantic_fn=semantic_fn)
+
+
+class MatchEngine:
+    """Score one job against the whole candidate pool using a process pool
+
+    The pool is split into contiguous candidate id ranges (shards). Workers
+    read candidate features from the memory-mapped feature store, so only the
+    job profile and the shard bounds are sent per task.
+    """
+
+    def __init__(self, db_path: str, store: Optional[FeatureStore] = None,
+                 workers: Optional[int] = None, shards_per_worker: int = 4,
+                 matcher: Optional[JobMatcher] = None):
+        self.db_path = db_path
+        self.store = store or FeatureStore(os.path.join(os.path.dirname(db_path) or '.', 'features'))
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.shards_per_worker = max(1, shards_per_worker)
+        self.matcher = matcher or JobMatcher()
+        self._executor = None
+
+    def refresh(self) -> FeatureStoreView:
+        """Catch the feature store up with the candidates table"""
+        return self.store.sync(self.db_path, self.matcher)
+
+    def _shards(self, rows: Sequence[int]) -> List[Sequence[int]]:
+        """Split row numbers into contiguous chunks, a few per worker"""
+        count = min(len(rows), self.workers * self.shards_per_worker) or 1
+        step = -(-len(rows) // count)
+        return [rows[start:start + step] for start in range(0, len(rows), step)]
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._executor
+
+    def _job_profile_for(self, view: FeatureStoreView, job_data: Dict) -> Dict:
+        """Build a job profile whose known terms are keyed by store term id (hash buckets stay as they are)"""
+        job_profile = self.matcher.build_job_profile(job_data)
+        if self.matcher.semantic is not None:
+            return job_profile
+        term_ids = self.store.term_ids(view)
+        vocab_size = view.manifest['term_vocab_size']
+
+        terms = {}
+        for term, count in job_profile['terms'].items():
+            term_id = term_ids.get(term)
+            terms[term_id if term_id is not None and term_id < vocab_size else term] = count
+        job_profile['terms'] = terms
+        return job_profile
+
+    def match(self, job_data: Dict, top_k: Optional[int] = None,
+              candidate_ids: Optional[Iterable[int]] = None) -> Tuple[List[Tuple[int, Dict]], int]:
+        """Return (candidate_id, match_result) pairs for the best candidates, best first,
+        and the number of candidates pruned without full scoring
+
+        ``candidate_ids`` restricts scoring to a subset of the pool, e.g. the
+        hits of a full-text search.
+        """
+        view = self.refresh()
+        if candidate_ids is None:
+            rows = range(len(view))
+        else:
+            wanted = np.fromiter(candidate_ids, dtype=np.int64)
+            rows = np.flatnonzero(np.isin(view.ids, wanted)).tolist()
+        if not len(rows):
+            return [], 0
+
+        job_profile = self._job_profile_for(view, job_data)
+        shards = self._shards(rows)
+        semantic = self.matcher.semantic.config() if self.matcher.semantic is not None else None
+
+        if self.workers == 1:
+            partials = [score_shard(view.path, view.manifest, job_profile, shard, top_k, semantic)
+                        for shard in shards]
+        else:
+            executor = self._get_executor()
+            futures = [executor.submit(score_shard, view.path, view.manifest, job_profile, shard, top_k, semantic)
+                       for shard in shards]
+            partials = [future.result() for future in futures]
+
+        pruned = sum(shard_pruned for _, shard_pruned in partials)
+        # Worker counters live in other processes; account for them here
+        self.matcher.pruned_total += pruned
+        self.matcher.scored_total += len(rows) - pruned
+        merged = heapq.merge(*(ranking for ranking, _ in partials), key=_rank_key)
+        if top_k is None:
+            return list(merged), pruned
+        return [entry for _, entry in zip(range(top_k), merged)], pruned
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+def main(argv=None):
+    """Rank the candidate pool for one stored job from the command line"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Sharded candidate matching')
+    parser.add_argument('job_id', type=int)
+    parser.add_argument('--db', default=os.path.join('database', 'candidates.db'))
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--top-k', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.db)
+    row = conn.execute(
+        'SELECT title, company, description, required_skills, required_experience, education_requirements '
+        'FROM job_descriptions WHERE id = ?', (args.job_id,)
+    ).fetchone()
+    conn.close()
+    if not row:
+        parser.error(f'Job description {args.job_id} not found')
+
+    job_data = {
+        'title': row[0],
+        'company': row[1],
+        'description': row[2],
+        'required_skills': json.loads(row[3]) if row[3] else [],
+        'required_experience': row[4],
+        'education_requirements': json.loads(row[5]) if row[5] else []
+    }
+
+    engine = MatchEngine(args.db, workers=args.workers, matcher=JobMatcher(semantic=build_semantic(db_path=args.db)))
+    try:
+        ranked, pruned = engine.match(job_data, args.top_k)
+        for rank, (candidate_id, match_result) in enumerate(ranked, 1):
+            print(f"{rank:>4}  candidate {candidate_id:>8}  {match_result['overall_score']:6.2f}%")
+        print(f"{pruned} candidates pruned by score upper bounds")
+    finally:
+        engine.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,290 @@
+"""
+Budgeted text extraction in supervised worker processes.
+
+A ParseBudget caps the pages read, the characters kept, the wall-clock time
+and the memory of one extraction. Extraction runs in a long-lived child
+process; when it overruns the timeout or its memory ceiling the child is
+killed and the document is extracted again in a cheap text-only mode
+(pdfminer without layout analysis for PDF, raw document.xml text for DOCX)
+under a shorter timeout. Results carry the reasons they were truncated, so
+callers can flag partial data instead of failing.
+"""
+import html
+import io
+import multiprocessing
+import os
+import queue
+import re
+import threading
+import zipfile
+from typing import List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows has no rlimits; the timeout still applies
+    resource = None
+
+
+class ParseBudget:
+    """Limits for extracting the text of one document"""
+
+    def __init__(self, max_pages: int = 30, max_chars: int = 100000, timeout: float = 15.0,
+                 max_memory_mb: Optional[int] = 512, fallback_timeout: float = 5.0):
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self.timeout = timeout
+        self.max_memory_mb = max_memory_mb
+        self.fallback_timeout = fallback_timeout
+
+
+class ExtractionResult:
+    """Extracted text plus why it may be incomplete ('pages', 'chars', 'timeout', 'memory', 'crashed')"""
+
+    def __init__(self, text: str, reasons: List[str]):
+        self.text = text
+        self.reasons = reasons
+
+    @property
+    def truncated(self) -> bool:
+        return bool(self.reasons)
+
+
+def _limit_chars(text: str, max_chars: int, reasons: List[str]) -> str:
+    if len(text) > max_chars:
+        reasons.append('chars')
+        return text[:max_chars]
+    return text
+
+
+def extract_pdf_text(path: str, max_pages: int, max_chars: int) -> Tuple[str, List[str]]:
+    """pdfplumber extraction (as ResumeParser does) stopping at the page and character limits"""
+    import pdfplumber
+
+    reasons, text = [], ''
+    try:
+        with pdfplumber.open(path) as pdf:
+            if len(pdf.pages) > max_pages:
+                reasons.append('pages')
+            for page in pdf.pages[:max_pages]:
+                page_text = page.extract_text()
+                if page_text:
+                    text += page_text + "\n"
+                if len(text) > max_chars:
+                    break
+    except MemoryError:
+        raise
+    except Exception as e:
+        print(f"Error reading PDF: {e}")
+    return _limit_chars(text, max_chars, reasons), reasons
+
+
+def extract_docx_text(path: str, max_pages: int, max_chars: int) -> Tuple[str, List[str]]:
+    """python-docx paragraph text, stopping at the character limit"""
+    from docx import Document
+
+    reasons, text = [], ''
+    try:
+        for paragraph in Document(path).paragraphs:
+            text += paragraph.text + "\n"
+            if len(text) > max_chars:
+                break
+    except MemoryError:
+        raise
+    except Exception as e:
+        print(f"Error reading DOCX: {e}")
+    return _limit_chars(text, max_chars, reasons), reasons
+
+
+def extract_pdf_text_fast(path: str, max_pages: int, max_chars: int) -> Tuple[str, List[str]]:
+    """Text-only pdfminer pass: characters in content order, no layout analysis"""
+    from pdfminer.converter import TextConverter
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.pdfpage import PDFPage
+
+    reasons, output = [], io.StringIO()
+    try:
+        manager = PDFResourceManager(caching=False)
+        device = TextConverter(manager, output, laparams=None)
+        interpreter = PDFPageInterpreter(manager, device)
+        with open(path, 'rb') as f:
+            for number, page in enumerate(PDFPage.get_pages(f)):
+                if number >= max_pages:
+                    reasons.append('pages')
+                    break
+                interpreter.process_page(page)
+                if output.tell() > max_chars:
+                    break
+    except MemoryError:
+        raise
+    except Exception as e:
+        print(f"Error reading PDF: {e}")
+    return _limit_chars(output.getvalue(), max_chars, reasons), reasons
+
+
+def extract_docx_text_fast(path: str, max_pages: int, max_chars: int) -> Tuple[str, List[str]]:
+    """Paragraph text straight from word/document.xml, reading a bounded amount of XML"""
+    reasons, text = [], ''
+    try:
+        with zipfile.ZipFile(path) as package, package.open('word/document.xml') as document:
+            # Markup outweighs text several times over; this bounds a decompression bomb
+            xml = document.read(max_chars * 20).decode('utf-8', 'replace')
+        xml = re.sub(r'</w:p>', '\n', xml)
+        text = html.unescape(re.sub(r'<[^>]*>?', '', xml))
+    except MemoryError:
+        raise
+    except Exception as e:
+        print(f"Error reading DOCX: {e}")
+    return _limit_chars(text, max_chars, reasons), reasons
+
+
+EXTRACTORS = {
+    ('pdf', 'full'): extract_pdf_text,
+    ('docx', 'full'): extract_docx_text,
+    ('pdf', 'fast'): extract_pdf_text_fast,
+    ('docx', 'fast'): extract_docx_text_fast
+}
+
+
+def _current_address_space() -> int:
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def _worker_main(conn, max_memory_mb: Optional[int]):
+    """Child loop: receive (path, file_type, mode, max_pages, max_chars), reply with text"""
+    if resource is not None and max_memory_mb:
+        # The ceiling is on top of what the freshly started child already maps
+        limit = _current_address_space() + max_memory_mb * 1024 * 1024
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ValueError, OSError):
+            pass
+    conn.send('ready')
+
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+        path, file_type, mode, max_pages, max_chars = job
+        try:
+            conn.send(('ok',) + EXTRACTORS[(file_type, mode)](path, max_pages, max_chars))
+        except MemoryError:
+            conn.send(('memory',))
+            break
+
+
+def worker_context():
+    """Multiprocessing context for workers of a threaded or pooled parent
+
+    Forking a threaded server could copy a lock another thread holds, so
+    workers come from a single-threaded fork server that preloads only this
+    module (the utils package imports its heavy modules lazily), or are
+    spawned where there is none. Like spawned processes they
+    import the parent's main module. A process that uses the fork server must
+    not fork workers that use it too, because a forked child cannot reach its
+    parent's server, so every pool that may extract starts from this context.
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload([__name__])
+        return context
+    return multiprocessing.get_context('spawn')
+
+
+class _WorkerLost(Exception):
+    """The worker overran its budget or died; the argument says why"""
+
+
+class _ExtractionWorker:
+    def __init__(self, context, max_memory_mb: Optional[int]):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, max_memory_mb), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+
+    def run(self, job: tuple, timeout: float) -> tuple:
+        try:
+            if not self.ready:
+                # Start-up is not charged to the document's timeout
+                if not self.conn.poll(30) or self.conn.recv() != 'ready':
+                    raise _WorkerLost('crashed')
+                self.ready = True
+            self.conn.send(job)
+            if not self.conn.poll(timeout):
+                raise _WorkerLost('timeout')
+            reply = self.conn.recv()
+        except (EOFError, OSError):
+            raise _WorkerLost('crashed')
+        if reply[0] != 'ok':
+            raise _WorkerLost(reply[0])
+        return reply[1], reply[2]
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(1)
+        self.conn.close()
+
+
+class ExtractionSupervisor:
+    """Pool of extraction processes enforcing a ParseBudget
+
+    At most ``max_workers`` documents are extracted at once; further
+    callers wait for a free worker.
+    """
+
+    def __init__(self, budget: ParseBudget, max_workers: int = 2):
+        self.budget = budget
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_workers)
+        # A child receives nothing but the job paths and limits
+        self._context = worker_context()
+
+    def _run(self, job: tuple, timeout: float) -> Tuple[str, List[str]]:
+        try:
+            worker = self._idle.get_nowait()
+        except queue.Empty:
+            worker = _ExtractionWorker(self._context, self.budget.max_memory_mb)
+        try:
+            result = worker.run(job, timeout)
+        except _WorkerLost:
+            worker.kill()
+            raise
+        self._idle.put(worker)
+        return result
+
+    def extract(self, path: str, file_type: str) -> ExtractionResult:
+        budget = self.budget
+        file_type = file_type.lower()
+        if (file_type, 'full') not in EXTRACTORS:
+            raise ValueError("Unsupported file type")
+
+        with self._slots:
+            try:
+                text, reasons = self._run((path, file_type, 'full', budget.max_pages, budget.max_chars),
+                                          budget.timeout)
+                return ExtractionResult(text, reasons)
+            except _WorkerLost as e:
+                lost = [str(e)]
+
+            try:
+                text, reasons = self._run((path, file_type, 'fast', budget.max_pages, budget.max_chars),
+                                          budget.fallback_timeout)
+            except _WorkerLost as e:
+                text, reasons = '', [str(e)]
+            return ExtractionResult(text, lost + [reason for reason in reasons if reason not in lost])
+
+    def close(self):
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            worker.kill()
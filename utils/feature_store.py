@@ -0,0 +1,452 @@
+"""
+Columnar on-disk store of candidate scoring features.
+
+Every column is a flat binary file of a fixed dtype. Variable-length features
+(skills, TF-IDF term counts, education text) are stored CSR-style as an
+``indptr`` column plus a values column. Files are only ever appended to, and
+``manifest.json`` records how many entries of each are committed, so readers
+memory-map a consistent prefix and share it through the page cache.
+"""
+import json
+import os
+import shutil
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .candidate_cache import read_pool_version
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development only
+    fcntl = None
+
+COLUMNS = {
+    'ids': np.int64,
+    'experience': np.int32,
+    'skill_count': np.int32,
+    'education_level': np.int8,
+    'skill_indptr': np.int64,
+    'skill_indices': np.int32,
+    'term_indptr': np.int64,
+    'term_indices': np.int32,
+    'term_data': np.int32,
+    'education_indptr': np.int64,
+    'education_bytes': np.uint8
+}
+
+# Manifest counter holding the committed length of each column
+COLUMN_LENGTHS = {
+    'ids': 'rows',
+    'experience': 'rows',
+    'skill_count': 'rows',
+    'education_level': 'rows',
+    'skill_indptr': 'rows_plus_one',
+    'skill_indices': 'skill_nnz',
+    'term_indptr': 'rows_plus_one',
+    'term_indices': 'term_nnz',
+    'term_data': 'term_nnz',
+    'education_indptr': 'rows_plus_one',
+    'education_bytes': 'education_size'
+}
+
+
+def _empty_manifest(generation: int, semantic: str) -> Dict:
+    return {
+        'generation': generation,
+        'semantic': semantic,
+        'rows': 0,
+        'skill_nnz': 0,
+        'term_nnz': 0,
+        'education_size': 0,
+        'skill_vocab_size': 0,
+        'skill_vocab_bytes': 0,
+        'term_vocab_size': 0,
+        'term_vocab_bytes': 0,
+        'max_candidate_id': 0,
+        'pool_rewrites': 0
+    }
+
+
+def _column_length(manifest: Dict, column: str) -> int:
+    counter = COLUMN_LENGTHS[column]
+    if counter == 'rows_plus_one':
+        return manifest['rows'] + 1
+    return manifest[counter]
+
+
+def _read_vocab(path: str, count: int, offset: int = 0) -> Tuple[List[str], int]:
+    """Read `count` JSON lines from a vocabulary file starting at a byte offset"""
+    words = []
+    if count <= 0:
+        return words, offset
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        for _ in range(count):
+            line = f.readline()
+            words.append(json.loads(line))
+        return words, f.tell()
+
+
+class FeatureStoreView:
+    """Read-only memory-mapped view of the rows committed in one manifest"""
+
+    def __init__(self, path: str, manifest: Dict):
+        self.path = path
+        self.manifest = manifest
+        for column, dtype in COLUMNS.items():
+            length = _column_length(manifest, column)
+            if length:
+                array = np.memmap(os.path.join(path, f'{column}.bin'), dtype=dtype, mode='r', shape=(length,))
+            else:
+                array = np.zeros(0, dtype=dtype)
+            setattr(self, column, array)
+        self.skill_vocab, _ = _read_vocab(os.path.join(path, 'skills.jsonl'), manifest['skill_vocab_size'])
+        self._term_vocab = None
+        self._term_ids = None
+
+    def __len__(self):
+        return self.manifest['rows']
+
+    @property
+    def term_vocab(self) -> List[str]:
+        """Term strings by id, only loaded when a caller needs them"""
+        if self._term_vocab is None:
+            self._term_vocab, _ = _read_vocab(os.path.join(self.path, 'terms.jsonl'),
+                                              self.manifest['term_vocab_size'])
+        return self._term_vocab
+
+    def term_ids(self) -> Dict[str, int]:
+        """Map term strings to store term ids"""
+        if self._term_ids is None:
+            self._term_ids = {term: index for index, term in enumerate(self.term_vocab)}
+        return self._term_ids
+
+    def candidate_terms(self, row: int) -> Dict[int, int]:
+        """Term counts of one candidate, keyed by store term id"""
+        start, end = self.term_indptr[row], self.term_indptr[row + 1]
+        return dict(zip(self.term_indices[start:end].tolist(), self.term_data[start:end].tolist()))
+
+    def candidate_profile(self, row: int, with_terms: bool = True) -> Dict:
+        """Rebuild the scorer profile of one candidate
+
+        Without terms the profile carries its ``row`` instead, so callers can
+        fetch the term counts only for candidates they actually score.
+        """
+        skills = self.skill_indices[self.skill_indptr[row]:self.skill_indptr[row + 1]]
+        education = bytes(self.education_bytes[self.education_indptr[row]:self.education_indptr[row + 1]])
+
+        profile = {
+            'skills': [self.skill_vocab[index] for index in skills],
+            'skill_count': int(self.skill_count[row]),
+            'experience_years': int(self.experience[row]),
+            'education_text': education.decode('utf-8'),
+            'education_level': int(self.education_level[row]),
+            'row': row
+        }
+        if with_terms:
+            profile['terms'] = self.candidate_terms(row)
+        return profile
+
+
+class FeatureStore:
+    """Append-only candidate feature store shared by all processes on the host
+
+    Appends happen on ingest; a rebuild writes a fresh generation directory
+    and switches ``CURRENT`` to it, so open views are never modified in place.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        # Vocabulary lookups cached by this process, refreshed from disk on write
+        self._vocab_cache = {}
+        self._cache_lock = threading.Lock()
+        self._view = None
+
+    # ------------------------
+    # Layout helpers
+    # ------------------------
+    def _generation_path(self, generation: int) -> str:
+        return os.path.join(self.root, 'gen-%06d' % generation)
+
+    def current_path(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.root, 'CURRENT')) as f:
+                return os.path.join(self.root, f.read().strip())
+        except FileNotFoundError:
+            return None
+
+    def _read_manifest(self, path: str) -> Dict:
+        with open(os.path.join(path, 'manifest.json')) as f:
+            return json.load(f)
+
+    def _write_manifest(self, path: str, manifest: Dict):
+        staging = os.path.join(path, f'manifest.json.{os.getpid()}.tmp')
+        with open(staging, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(staging, os.path.join(path, 'manifest.json'))
+
+    def _set_current(self, path: str):
+        staging = os.path.join(self.root, f'CURRENT.{os.getpid()}.tmp')
+        with open(staging, 'w') as f:
+            f.write(os.path.basename(path))
+        os.replace(staging, os.path.join(self.root, 'CURRENT'))
+
+    @contextmanager
+    def _lock(self):
+        """Exclusive inter-process lock for writers"""
+        with open(os.path.join(self.root, '.lock'), 'a+') as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _create_generation(self, generation: int, semantic: str) -> str:
+        path = self._generation_path(generation)
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path)
+        for column, dtype in COLUMNS.items():
+            with open(os.path.join(path, f'{column}.bin'), 'wb') as f:
+                if COLUMN_LENGTHS[column] == 'rows_plus_one':
+                    f.write(np.zeros(1, dtype=dtype).tobytes())
+        for vocab in ('skills.jsonl', 'terms.jsonl'):
+            open(os.path.join(path, vocab), 'wb').close()
+        self._write_manifest(path, _empty_manifest(generation, semantic))
+        return path
+
+    def _vocab_lookup(self, path: str, manifest: Dict, name: str) -> Dict[str, int]:
+        """Return this process's term->id lookup, catching up on other writers' appends"""
+        key = (path, name)
+        with self._cache_lock:
+            lookup, count, offset = self._vocab_cache.get(key, ({}, 0, 0))
+            size = manifest[f'{name}_vocab_size']
+            if size > count:
+                words, offset = _read_vocab(os.path.join(path, f'{name}s.jsonl'), size - count, offset)
+                for word in words:
+                    lookup[word] = len(lookup)
+                count = size
+            self._vocab_cache = {k: v for k, v in self._vocab_cache.items() if k[0] == path}
+            self._vocab_cache[key] = (lookup, count, offset)
+            return lookup
+
+    # ------------------------
+    # Public API
+    # ------------------------
+    def view(self) -> Optional[FeatureStoreView]:
+        """Open the committed rows of the current generation"""
+        while True:
+            path = self.current_path()
+            if path is None:
+                return None
+            try:
+                manifest = self._read_manifest(path)
+                if self._view is None or (self._view.path, self._view.manifest) != (path, manifest):
+                    self._view = FeatureStoreView(path, manifest)
+                return self._view
+            except FileNotFoundError:
+                # A rebuild swept this generation after we read CURRENT; follow it to the new one
+                if self.current_path() == path:
+                    raise
+
+    def term_ids(self, view: FeatureStoreView) -> Dict[str, int]:
+        """Term->id lookup covering at least the terms of a view, kept incrementally"""
+        return self._vocab_lookup(view.path, view.manifest, 'term')
+
+    def append(self, records: Iterable[Tuple[int, Dict]], semantic: str = 'tfidf'):
+        """Append (candidate_id, profile) records to the current generation
+
+        ``semantic`` (JobMatcher.semantic_name()) labels a newly created
+        generation; sync() rebuilds a store whose terms are in another space.
+        """
+        records = list(records)
+        if not records:
+            return
+        with self._lock():
+            path = self.current_path()
+            if path is None:
+                path = self._create_generation(1, semantic)
+                self._set_current(path)
+            self._append_locked(path, records)
+
+    def _append_locked(self, path: str, records: List[Tuple[int, Dict]]):
+        try:
+            self._write_records(path, records)
+        except Exception:
+            # In-memory vocabularies may hold uncommitted words; reload from disk
+            with self._cache_lock:
+                self._vocab_cache = {}
+            raise
+
+    def _write_records(self, path: str, records: List[Tuple[int, Dict]]):
+        manifest = self._read_manifest(path)
+        # Ids at or below the high-water mark arrived out of order; the next
+        # sync sees the row count mismatch and rebuilds with them included
+        records = [record for record in records if record[0] > manifest['max_candidate_id']]
+        if not records:
+            return
+        skill_lookup = self._vocab_lookup(path, manifest, 'skill')
+        term_lookup = self._vocab_lookup(path, manifest, 'term')
+        new_skills, new_terms = [], []
+
+        columns = {column: [] for column in COLUMNS}
+        skill_nnz, term_nnz = manifest['skill_nnz'], manifest['term_nnz']
+        education_size = manifest['education_size']
+
+        for candidate_id, profile in records:
+            columns['ids'].append(candidate_id)
+            columns['experience'].append(profile['experience_years'])
+            columns['skill_count'].append(profile['skill_count'])
+            columns['education_level'].append(profile['education_level'])
+
+            for skill in profile['skills']:
+                if skill not in skill_lookup:
+                    skill_lookup[skill] = len(skill_lookup)
+                    new_skills.append(skill)
+                columns['skill_indices'].append(skill_lookup[skill])
+            skill_nnz += len(profile['skills'])
+            columns['skill_indptr'].append(skill_nnz)
+
+            for term, count in profile['terms'].items():
+                if term not in term_lookup:
+                    term_lookup[term] = len(term_lookup)
+                    new_terms.append(term)
+                columns['term_indices'].append(term_lookup[term])
+                columns['term_data'].append(count)
+            term_nnz += len(profile['terms'])
+            columns['term_indptr'].append(term_nnz)
+
+            encoded = profile['education_text'].encode('utf-8')
+            columns['education_bytes'].append(encoded)
+            education_size += len(encoded)
+            columns['education_indptr'].append(education_size)
+
+        # Truncate anything an interrupted writer left past the committed lengths
+        for column, dtype in COLUMNS.items():
+            file_path = os.path.join(path, f'{column}.bin')
+            with open(file_path, 'r+b') as f:
+                f.truncate(_column_length(manifest, column) * np.dtype(dtype).itemsize)
+                f.seek(0, os.SEEK_END)
+                if column == 'education_bytes':
+                    f.write(b''.join(columns[column]))
+                else:
+                    f.write(np.asarray(columns[column], dtype=dtype).tobytes())
+
+        vocab_sizes = {}
+        for name, words in (('skill', new_skills), ('term', new_terms)):
+            vocab_path = os.path.join(path, f'{name}s.jsonl')
+            with open(vocab_path, 'r+b') as f:
+                f.truncate(manifest[f'{name}_vocab_bytes'])
+                f.seek(0, os.SEEK_END)
+                f.write(''.join(json.dumps(word) + '\n' for word in words).encode('utf-8'))
+                vocab_sizes[name] = f.tell()
+            lookup, _, _ = self._vocab_cache[(path, name)]
+            self._vocab_cache[(path, name)] = (lookup, len(lookup), vocab_sizes[name])
+
+        manifest.update({
+            'rows': manifest['rows'] + len(records),
+            'skill_nnz': skill_nnz,
+            'term_nnz': term_nnz,
+            'education_size': education_size,
+            'skill_vocab_size': len(skill_lookup),
+            'skill_vocab_bytes': vocab_sizes['skill'],
+            'term_vocab_size': len(term_lookup),
+            'term_vocab_bytes': vocab_sizes['term'],
+            'max_candidate_id': max(manifest['max_candidate_id'], max(cid for cid, _ in records))
+        })
+        self._write_manifest(path, manifest)
+
+    def rebuild(self, records: Iterable[Tuple[int, Dict]], batch_size: int = 1000,
+                pool_rewrites: int = 0, semantic: str = 'tfidf'):
+        """Write all records into a new generation and make it current"""
+        with self._lock():
+            previous = self.current_path()
+            generation = self._read_manifest(previous)['generation'] + 1 if previous else 1
+            path = self._create_generation(generation, semantic)
+
+            batch = []
+            for record in records:
+                batch.append(record)
+                if len(batch) >= batch_size:
+                    self._append_locked(path, batch)
+                    batch = []
+            if batch:
+                self._append_locked(path, batch)
+
+            manifest = self._read_manifest(path)
+            manifest['pool_rewrites'] = pool_rewrites
+            self._write_manifest(path, manifest)
+            self._set_current(path)
+
+            # The replaced generation stays for readers that resolved CURRENT before
+            # the switch; older ones are swept (open mappings survive on POSIX, and
+            # on Windows the files stay until released)
+            keep = {os.path.basename(path), os.path.basename(previous or '')}
+            for name in os.listdir(self.root):
+                if name.startswith('gen-') and name not in keep:
+                    shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+
+    def sync(self, db_path: str, matcher, batch_size: int = 1000) -> FeatureStoreView:
+        """Bring the store up to date with the candidates table and return a view
+
+        New candidates (ids above the store's high-water mark) are appended;
+        if rows were updated or deleted since the last rebuild (the
+        pool_version rewrite counter moved), or the store holds terms of another
+        semantic space, the store is rebuilt.
+        """
+        conn = sqlite3.connect(db_path)
+        try:
+            cursor = conn.cursor()
+            cursor.execute('SELECT COUNT(*), COALESCE(MAX(id), 0) FROM candidates')
+            db_rows, db_max_id = cursor.fetchone()
+            rewrites = read_pool_version(cursor)[1]
+
+            current = self.view()
+            semantic = matcher.semantic_name()
+            # Stores written before the label existed hold pair TF-IDF terms
+            same_space = current is not None and current.manifest.get('semantic', 'tfidf') == semantic
+            if same_space and current.manifest.get('pool_rewrites') == rewrites:
+                if (len(current), current.manifest['max_candidate_id']) == (db_rows, db_max_id):
+                    return current
+
+                if db_max_id > current.manifest['max_candidate_id']:
+                    cursor.execute(CANDIDATE_FEATURES_QUERY + ' WHERE id > ? ORDER BY id',
+                                   (current.manifest['max_candidate_id'],))
+                    while True:
+                        rows = cursor.fetchmany(batch_size)
+                        if not rows:
+                            break
+                        self.append(profile_records(matcher, rows), semantic)
+                    current = self.view()
+
+            if (not same_space or current.manifest.get('pool_rewrites') != rewrites or
+                    len(current) != db_rows):
+                # Rows changed below the high-water mark, or the term space changed; start over
+                cursor.execute(CANDIDATE_FEATURES_QUERY + ' ORDER BY id')
+                self.rebuild(profile_records(matcher, cursor), batch_size, pool_rewrites=rewrites,
+                             semantic=semantic)
+                current = self.view()
+        finally:
+            conn.close()
+
+        return current
+
+
+CANDIDATE_FEATURES_QUERY = 'SELECT id, experience_years, skills, education, raw_text FROM candidates'
+
+
+def profile_records(matcher, rows) -> Iterable[Tuple[int, Dict]]:
+    """Turn CANDIDATE_FEATURES_QUERY rows into (candidate_id, profile) records"""
+    for row in rows:
+        yield row[0], matcher.build_candidate_profile({
+            'experience_years': row[1],
+            'skills': json.loads(row[2]) if row[2] else {},
+            'education': json.loads(row[3]) if row[3] else [],
+            'raw_text': row[4] or ''
+        })
@@ -0,0 +1,195 @@
+"""
+Candidate filters pushed down to SQL before scoring.
+
+``/match_candidates`` and ``/search`` accept:
+
+- ``min_experience`` / ``max_experience``: years, inclusive
+- ``location``: any of several places (repeat the parameter or separate by
+  commas), matched case-insensitively anywhere in the location
+- ``skill``: must-have skills, all required
+- ``uploaded_after`` / ``uploaded_before``: ``YYYY-MM-DD``, inclusive
+- ``education``: minimum degree, a key of ``JobMatcher.education_levels``
+  such as ``bachelor``, ``master`` or ``phd``
+
+``CandidateFilters.where()`` compiles them into one SQL predicate over the
+candidates table. Experience and upload date use indexes; must-have skills
+are narrowed with the FTS5 index on the skills column and then checked
+exactly against the skills JSON. Education uses the matcher's substring
+rule, so a candidate passes exactly when its profile's education level
+reaches the minimum.
+"""
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+FILTER_INDEXES = [
+    'CREATE INDEX IF NOT EXISTS idx_candidates_experience ON candidates (experience_years)',
+    'CREATE INDEX IF NOT EXISTS idx_candidates_uploaded_at ON candidates (uploaded_at)'
+]
+
+FILTER_PARAMS = ('min_experience', 'max_experience', 'location', 'skill', 'uploaded_after', 'uploaded_before',
+                 'education')
+
+_SKILL_VALUES = '''
+    EXISTS (SELECT 1
+            FROM json_each(CASE WHEN json_valid({row}.skills) THEN {row}.skills END) AS category,
+                 json_each(category.value) AS skill
+            WHERE trim(lower(skill.value)) IN ({placeholders}))
+'''
+
+_EDUCATION_VALUES = '''
+    EXISTS (SELECT 1
+            FROM json_each(CASE WHEN json_valid({row}.education) THEN {row}.education END) AS line
+            WHERE {keywords})
+'''
+
+
+class FilterError(ValueError):
+    """Raised for a filter parameter that cannot be parsed"""
+
+
+def init_filter_indexes(cursor):
+    """Create the indexes the filters rely on"""
+    for statement in FILTER_INDEXES:
+        cursor.execute(statement)
+
+
+def _values(args, name: str) -> List[str]:
+    """Repeated and comma-separated values of one query parameter"""
+    values = []
+    for raw in args.getlist(name) if hasattr(args, 'getlist') else [args.get(name) or '']:
+        values.extend(value.strip() for value in raw.split(',') if value.strip())
+    return values
+
+
+def _number(args, name: str) -> Optional[int]:
+    raw = (args.get(name) or '').strip()
+    if not raw:
+        return None
+    try:
+        return int(float(raw))
+    except ValueError:
+        raise FilterError(f'{name} must be a number of years')
+
+
+def _date(args, name: str) -> Optional[date]:
+    raw = (args.get(name) or '').strip()
+    if not raw:
+        return None
+    try:
+        return date.fromisoformat(raw)
+    except ValueError:
+        raise FilterError(f'{name} must be a date as YYYY-MM-DD')
+
+
+def _fts_phrase(text: str) -> str:
+    return '"' + text.replace('"', '""') + '"'
+
+
+class CandidateFilters:
+    """Restrictions on the candidate pool, applied before scoring"""
+
+    def __init__(self, min_experience: Optional[int] = None, max_experience: Optional[int] = None,
+                 locations: Sequence[str] = (), skills: Sequence[Tuple[str, ...]] = (),
+                 uploaded_after: Optional[date] = None, uploaded_before: Optional[date] = None,
+                 education_level: int = 0, education_keywords: Sequence[str] = ()):
+        self.min_experience = min_experience
+        self.max_experience = max_experience
+        self.locations = [location.lower() for location in locations]
+        # Each must-have skill as the spellings that satisfy it
+        self.skills = [tuple(spellings) for spellings in skills]
+        self.uploaded_after = uploaded_after
+        self.uploaded_before = uploaded_before
+        self.education_level = education_level
+        self.education_keywords = list(education_keywords)
+
+    @classmethod
+    def from_args(cls, args, matcher) -> 'CandidateFilters':
+        """Parse request arguments (see the module docstring); raises FilterError"""
+        # A candidate skill satisfies a must-have one when both normalize to the same name
+        skills = []
+        for skill in _values(args, 'skill'):
+            normalized = matcher.normalize_skill_name(skill)
+            aliases = [alias for alias, name in matcher.skill_aliases.items() if name == normalized]
+            skills.append(tuple(sorted({normalized, *aliases})))
+
+        education_level, education_keywords = 0, []
+        education = (args.get('education') or '').strip().lower()
+        if education:
+            levels = matcher.education_levels
+            if education not in levels:
+                raise FilterError(f'education must be one of: {", ".join(sorted(levels))}')
+            education_level = levels[education]
+            education_keywords = [keyword for keyword, level in levels.items() if level >= education_level]
+
+        filters = cls(
+            min_experience=_number(args, 'min_experience'),
+            max_experience=_number(args, 'max_experience'),
+            locations=_values(args, 'location'),
+            skills=skills,
+            uploaded_after=_date(args, 'uploaded_after'),
+            uploaded_before=_date(args, 'uploaded_before'),
+            education_level=education_level,
+            education_keywords=education_keywords
+        )
+        if (filters.min_experience is not None and filters.max_experience is not None and
+                filters.min_experience > filters.max_experience):
+            raise FilterError('min_experience is greater than max_experience')
+        return filters
+
+    def __bool__(self):
+        return bool(self.where()[1])
+
+    def stamp(self) -> Dict:
+        """Canonical JSON-serializable form, for cache keys and ETags"""
+        return {
+            'min_experience': self.min_experience,
+            'max_experience': self.max_experience,
+            'locations': sorted(self.locations),
+            'skills': sorted(self.skills),
+            'uploaded_after': self.uploaded_after.isoformat() if self.uploaded_after else None,
+            'uploaded_before': self.uploaded_before.isoformat() if self.uploaded_before else None,
+            'education_level': self.education_level
+        }
+
+    def where(self, row: str = 'c') -> Tuple[str, List]:
+        """SQL predicate over the candidates table aliased ``row``, and its parameters"""
+        clauses, params = [], []
+        if self.min_experience is not None:
+            clauses.append(f'{row}.experience_years >= ?')
+            params.append(self.min_experience)
+        if self.max_experience is not None:
+            clauses.append(f'{row}.experience_years <= ?')
+            params.append(self.max_experience)
+        if self.uploaded_after is not None:
+            clauses.append(f'{row}.uploaded_at >= ?')
+            params.append(self.uploaded_after.isoformat())
+        if self.uploaded_before is not None:
+            # Stored as 'YYYY-MM-DD HH:MM:SS...', so the whole last day is below the next one
+            clauses.append(f'{row}.uploaded_at < ?')
+            params.append((self.uploaded_before + timedelta(days=1)).isoformat())
+        if self.locations:
+            clauses.append('(' + ' OR '.join(f'instr(lower({row}.location), ?) > 0' for _ in self.locations) + ')')
+            params.extend(self.locations)
+
+        for spellings in self.skills:
+            clauses.append(_SKILL_VALUES.format(row=row, placeholders=', '.join('?' for _ in spellings)))
+            params.extend(spellings)
+            searchable = [_fts_phrase(spelling) for spelling in spellings if any(char.isalnum() for char in spelling)]
+            if len(searchable) == len(spellings):
+                # The FTS index narrows the rows whose JSON is checked above
+                clauses.append(f'{row}.id IN (SELECT rowid FROM candidates_fts WHERE candidates_fts MATCH ?)')
+                params.append('skills : (' + ' OR '.join(searchable) + ')')
+
+        if self.education_keywords:
+            keywords = ' OR '.join('instr(lower(line.value), ?) > 0' for _ in self.education_keywords)
+            clauses.append(_EDUCATION_VALUES.format(row=row, keywords=keywords))
+            params.extend(self.education_keywords)
+
+        return (' AND '.join(clauses) if clauses else '1'), params
+
+
+def filter_candidate_ids(cursor, filters: CandidateFilters) -> List[int]:
+    """Ids of every candidate passing the filters, in id order"""
+    where, params = filters.where('c')
+    cursor.execute(f'SELECT c.id FROM candidates c WHERE {where} ORDER BY c.id', params)
+    return [row[0] for row in cursor.fetchall()]
@@ -0,0 +1,147 @@
+"""
+Bulk import of job descriptions from JSONL or CSV exports.
+
+Rows are validated one by one, skills are extracted for all valid rows with
+one ``nlp.pipe`` pass, and every job is inserted in a single transaction.
+Each input row gets its own result (the new job id and extracted skills, or
+why it was rejected), so one bad requisition does not fail the whole file.
+"""
+import csv
+import io
+import json
+import sqlite3
+import time
+from datetime import datetime
+from typing import Dict, List, Union
+
+from . import metrics
+from .nlp_batch import DEFAULT_BATCH_SIZE
+
+FORMATS = ('jsonl', 'csv')
+
+JOB_INSERT = '''
+    INSERT INTO job_descriptions
+    (title, company, description, required_skills, required_experience, education_requirements, created_at,
+    skills_version)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+class JobImportError(ValueError):
+    """Raised when an import file cannot be read at all"""
+
+
+def read_job_rows(data: str, fmt: str) -> List[Union[Dict, Exception]]:
+    """Split an export into raw row dicts, or the error that made a row unreadable"""
+    if fmt not in FORMATS:
+        raise JobImportError(f"Unsupported import format '{fmt}' (expected jsonl or csv)")
+
+    rows: List[Union[Dict, Exception]] = []
+    if fmt == 'jsonl':
+        for line in data.splitlines():
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                rows.append(ValueError(f'Invalid JSON: {e}'))
+                continue
+            rows.append(row if isinstance(row, dict) else ValueError('Row is not a JSON object'))
+        return rows
+
+    reader = csv.DictReader(io.StringIO(data))
+    if not reader.fieldnames:
+        raise JobImportError('CSV file has no header row')
+    for row in reader:
+        if None in row:
+            rows.append(ValueError('Row has more fields than the header'))
+        else:
+            rows.append(row)
+    return rows
+
+
+def normalize_job(row: Dict) -> Dict:
+    """Validate one raw row into the fields stored for a job description"""
+    title = str(row.get('title') or '').strip()
+    description = str(row.get('description') or '').strip()
+    if not title or not description:
+        raise ValueError('title and description are required')
+
+    try:
+        required_experience = int(float(row.get('required_experience') or 0))
+    except (TypeError, ValueError):
+        raise ValueError('required_experience must be a number')
+
+    # CSV exports carry education requirements as one ';'-separated cell
+    education = row.get('education_requirements') or []
+    if isinstance(education, str):
+        education = [item.strip() for item in education.split(';') if item.strip()]
+    if not isinstance(education, list):
+        raise ValueError('education_requirements must be a list')
+
+    return {
+        'title': title,
+        'company': str(row.get('company') or '').strip() or None,
+        'description': description,
+        'required_experience': required_experience,
+        'education_requirements': education
+    }
+
+
+def import_jobs(db_path: str, rows: List[Union[Dict, Exception]], skill_extractor,
+                batch_size: int = DEFAULT_BATCH_SIZE, n_process: int = 1) -> Dict:
+    """Insert every valid row as a job description in one transaction
+
+    Returns counts, timing and a result per input row (1-based ``row``).
+    """
+    started = time.perf_counter()
+    results: List[Dict] = []
+    jobs: List[Dict] = []
+    for number, row in enumerate(rows, 1):
+        try:
+            if isinstance(row, Exception):
+                raise row
+            jobs.append(normalize_job(row))
+            results.append({'row': number, 'success': True})
+        except ValueError as e:
+            results.append({'row': number, 'success': False, 'error': str(e)})
+
+    accepted = [result for result in results if result['success']]
+    extracted = skill_extractor.extract_all_skills_many([job['description'] for job in jobs], batch_size, n_process)
+    taxonomy_version = skill_extractor.taxonomy_version()
+
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        cursor = conn.cursor()
+        created_at = datetime.now()
+        for result, job, skills in zip(accepted, jobs, extracted):
+            if isinstance(skills, Exception):
+                result.update(success=False, error=f'Skill extraction failed: {skills}')
+                continue
+            required_skills = []
+            for category_skills in skills.values():
+                required_skills.extend(category_skills)
+
+            cursor.execute(JOB_INSERT, (
+                job['title'],
+                job['company'],
+                job['description'],
+                json.dumps(required_skills),
+                job['required_experience'],
+                json.dumps(job['education_requirements']),
+                created_at,
+                taxonomy_version
+            ))
+            result.update(job_id=cursor.lastrowid, extracted_skills=required_skills)
+        with metrics.timer('db_write'):
+            conn.commit()
+    finally:
+        conn.close()
+
+    imported = sum(1 for result in results if result['success'])
+    return {
+        'imported': imported,
+        'failed': len(results) - imported,
+        'seconds': round(time.perf_counter() - started, 3),
+        'results': results
+    }
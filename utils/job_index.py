@@ -0,0 +1,416 @@
+"""
+Job-side index for reverse and batch matching.
+
+Job descriptions are cached as scorer profiles and packed into sparse
+matrices: term counts (jobs x terms) and required-skill counts (jobs x
+distinct skills). A tile of candidates is then scored against every job
+with a few sparse matrix products. Reverse matching uses a tile of one and
+gives only the top-K jobs the full breakdown from
+``JobMatcher.score_profiles``.
+
+Freshness follows the same scheme as the candidate cache: ``PRAGMA
+data_version`` first, then the ``job_version`` counter maintained by triggers.
+"""
+import copy
+import json
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from . import metrics
+from .matcher import PAIR_IDF_SHARED, PAIR_IDF_UNIQUE
+
+JOB_VERSION_SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS job_version (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL,
+        rewrites INTEGER NOT NULL
+    )
+    ''',
+    'INSERT OR IGNORE INTO job_version (id, version, rewrites) VALUES (1, 0, 0)',
+    '''
+    CREATE TRIGGER IF NOT EXISTS jobs_version_insert AFTER INSERT ON job_descriptions
+    BEGIN
+        UPDATE job_version SET version = version + 1 WHERE id = 1;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS jobs_version_update AFTER UPDATE ON job_descriptions
+    BEGIN
+        UPDATE job_version SET version = version + 1, rewrites = rewrites + 1 WHERE id = 1;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS jobs_version_delete AFTER DELETE ON job_descriptions
+    BEGIN
+        UPDATE job_version SET version = version + 1, rewrites = rewrites + 1 WHERE id = 1;
+    END
+    '''
+]
+
+JOB_RECORD_QUERY = '''
+    SELECT id, title, company, description, required_skills, required_experience,
+           education_requirements, created_at
+    FROM job_descriptions
+'''
+
+
+def init_job_version(cursor):
+    """Create the job_version counter and the triggers that maintain it"""
+    for statement in JOB_VERSION_SCHEMA:
+        cursor.execute(statement)
+
+
+def read_job_version(cursor) -> Tuple[int, int]:
+    """Return (version, rewrites) for the job descriptions table"""
+    try:
+        cursor.execute('SELECT version, rewrites FROM job_version WHERE id = 1')
+    except sqlite3.OperationalError:
+        return (0, 0)
+    row = cursor.fetchone()
+    return (row[0], row[1]) if row else (0, 0)
+
+
+def job_from_row(row) -> Dict:
+    """Decode a JOB_RECORD_QUERY row into the job dict used by the matcher"""
+    return {
+        'id': row[0],
+        'title': row[1],
+        'company': row[2],
+        'description': row[3],
+        'required_skills': json.loads(row[4]) if row[4] else [],
+        'required_experience': row[5],
+        'education_requirements': json.loads(row[6]) if row[6] else [],
+        'created_at': row[7]
+    }
+
+
+class JobIndex:
+    """Cached job profiles plus the sparse matrices used to rank them"""
+
+    def __init__(self, db_path: str, matcher):
+        self.db_path = db_path
+        self.matcher = matcher
+        self.jobs: List[Dict] = []
+        self.profiles: List[Dict] = []
+        self.watermark = 0
+        self.job_version = None
+        self.hits = 0
+        self.misses = 0
+        self._data_version = None
+        self._conn = None
+        self._lock = threading.Lock()
+        self._reset_arrays()
+
+    def _reset_arrays(self):
+        self.job_ids = np.zeros(0, dtype=np.int64)
+        self.term_ids: Dict[str, int] = {}
+        self.skill_ids: Dict[str, int] = {}
+        self.skill_vocab: List[str] = []
+        self.term_matrix = sparse.csr_matrix((0, 0))
+        self.skill_matrix = sparse.csr_matrix((0, 0))
+        # Resume skill -> required skills (skill_vocab columns) it partially matches
+        self._partial_columns: Dict[str, np.ndarray] = {}
+
+    def _connection(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        return self._conn
+
+    def refresh(self):
+        """Reload job profiles and rebuild the matrices if jobs changed"""
+        with self._lock:
+            cursor = self._connection().cursor()
+            cursor.execute('PRAGMA data_version')
+            data_version = cursor.fetchone()[0]
+            if data_version == self._data_version:
+                self.hits += 1
+                return
+
+            job_version = read_job_version(cursor)
+            if self.job_version is not None and job_version == self.job_version:
+                self._data_version = data_version
+                self.hits += 1
+                return
+
+            self.misses += 1
+            if self.job_version is None or job_version[1] != self.job_version[1]:
+                self.jobs, self.profiles, self.watermark = [], [], 0
+            with metrics.timer('job_index_load'):
+                cursor.execute(JOB_RECORD_QUERY + ' WHERE id > ? ORDER BY id', (self.watermark,))
+                for row in cursor:
+                    job = job_from_row(row)
+                    self.jobs.append(job)
+                    self.profiles.append(self.matcher.build_job_profile(job))
+                    self.watermark = row[0]
+
+                self._build_arrays()
+            self.job_version = job_version
+            self._data_version = data_version
+
+    def _build_arrays(self):
+        """Pack the cached job profiles into per-job arrays and sparse matrices"""
+        self._reset_arrays()
+        profiles = self.profiles
+        self.job_ids = np.array([job['id'] for job in self.jobs], dtype=np.int64)
+
+        term_rows, term_cols, term_counts = [], [], []
+        skill_rows, skill_cols = [], []
+        for row, profile in enumerate(profiles):
+            for term, count in profile['terms'].items():
+                term_rows.append(row)
+                term_cols.append(self.term_ids.setdefault(term, len(self.term_ids)))
+                term_counts.append(count)
+            # Duplicated required skills count once per occurrence, as in the matcher
+            for skill in profile['skills']:
+                if skill not in self.skill_ids:
+                    self.skill_ids[skill] = len(self.skill_vocab)
+                    self.skill_vocab.append(skill)
+                skill_rows.append(row)
+                skill_cols.append(self.skill_ids[skill])
+
+        shape = (len(profiles), len(self.term_ids))
+        self.term_matrix = sparse.csr_matrix((np.array(term_counts, dtype=np.float64), (term_rows, term_cols)),
+                                             shape=shape)
+        self.term_presence = self.term_matrix.copy()
+        self.term_presence.data[:] = 1.0
+        self.term_squares = self.term_matrix.multiply(self.term_matrix).tocsr()
+        self.skill_matrix = sparse.csr_matrix((np.ones(len(skill_rows)), (skill_rows, skill_cols)),
+                                              shape=(len(profiles), len(self.skill_vocab)))
+
+        # Hash bucket of each term column when the matcher uses a hashing semantic engine
+        self.term_buckets = (np.fromiter(self.term_ids.keys(), dtype=np.int64, count=len(self.term_ids))
+                             if self.matcher.semantic is not None else None)
+        self.term_totals = np.array([len(p['terms']) for p in profiles], dtype=np.int64)
+        self.term_total_sq = np.array([sum(c * c for c in p['terms'].values()) for p in profiles],
+                                      dtype=np.float64)
+        self.skill_counts = np.array([p['skill_count'] for p in profiles], dtype=np.float64)
+        self.required_skills = np.array([len(p['skills']) for p in profiles], dtype=np.float64)
+        self.required_experience = np.array([p['required_experience'] for p in profiles], dtype=np.float64)
+        self.weights = {
+            component: np.array([p['weights'][component] for p in profiles], dtype=np.float64)
+            for component in ('skills', 'semantic', 'experience', 'education')
+        }
+
+    def __len__(self):
+        self.refresh()
+        return len(self.jobs)
+
+    def _partial_matches(self, resume_skill: str) -> np.ndarray:
+        """Columns of the required skills a resume skill partially matches, computed once per skill"""
+        columns = self._partial_columns.get(resume_skill)
+        if columns is None:
+            overlap = self.matcher._calculate_word_overlap
+            columns = np.array([index for index, jd_skill in enumerate(self.skill_vocab)
+                                if jd_skill in resume_skill or resume_skill in jd_skill or
+                                overlap(jd_skill, resume_skill) > 0.5], dtype=np.int64)
+            self._partial_columns[resume_skill] = columns
+        return columns
+
+    def _skill_flags(self, candidate_profiles: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+        """Per candidate and required skill: exact match and partial match flags
+
+        Candidates become a sparse incidence matrix over the tile's distinct
+        resume skills, which is multiplied by sparse (resume skill x required
+        skill) exact and partial match matrices.
+        """
+        vocab: Dict[str, int] = {}
+        rows, cols = [], []
+        for row, profile in enumerate(candidate_profiles):
+            for skill in set(profile['skills']):
+                rows.append(row)
+                cols.append(vocab.setdefault(skill, len(vocab)))
+        incidence = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)),
+                                      shape=(len(candidate_profiles), len(vocab)))
+
+        same_rows, same_cols, partial_rows, partial_cols = [], [], [], []
+        for skill, column in vocab.items():
+            index = self.skill_ids.get(skill)
+            if index is not None:
+                same_rows.append(column)
+                same_cols.append(index)
+            matches = self._partial_matches(skill)
+            partial_rows.extend([column] * len(matches))
+            partial_cols.extend(matches.tolist())
+        shape = (len(vocab), len(self.skill_vocab))
+        same = sparse.csr_matrix((np.ones(len(same_rows)), (same_rows, same_cols)), shape=shape)
+        overlapping = sparse.csr_matrix((np.ones(len(partial_rows)), (partial_rows, partial_cols)), shape=shape)
+
+        exact = (incidence @ same).toarray() > 0
+        partial = ~exact & ((incidence @ overlapping).toarray() > 0)
+        return exact.astype(np.float64), partial.astype(np.float64)
+
+    def _skill_scores(self, exact: np.ndarray, partial: np.ndarray) -> np.ndarray:
+        """Skill coverage of every candidate/job pair, as in _match_normalized_skills"""
+        required = self.required_skills
+        exact_counts = np.asarray((self.skill_matrix @ exact.T).T)
+        partial_counts = np.asarray((self.skill_matrix @ partial.T).T)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            exact_score = exact_counts / required
+            partial_score = (partial_counts * 0.5) / required
+        return np.where(required > 0, np.minimum(1.0, exact_score + partial_score), 0.0)
+
+    def _experience_scores(self, candidate_profiles: List[Dict]) -> np.ndarray:
+        """Vectorized JobMatcher.calculate_experience_match"""
+        experience = np.array([[float(p['experience_years'])] for p in candidate_profiles])
+        required = self.required_experience
+        with np.errstate(divide='ignore', invalid='ignore'):
+            below = np.maximum(0.2, experience / required)
+        return np.select(
+            [np.broadcast_to(required == 0, below.shape), experience >= required,
+             experience >= required * 0.8, experience >= required * 0.6, experience >= required * 0.4],
+            [1.0, 1.0, 0.9, 0.7, 0.5],
+            below
+        )
+
+    def _candidate_term_matrix(self, candidate_profiles: List[Dict]) -> sparse.csr_matrix:
+        """Candidates' counts of the terms the cached jobs use"""
+        rows, cols, counts = [], [], []
+        for row, profile in enumerate(candidate_profiles):
+            for term, count in profile['terms'].items():
+                term_id = self.term_ids.get(term)
+                if term_id is not None:
+                    rows.append(row)
+                    cols.append(term_id)
+                    counts.append(count)
+        shape = (len(candidate_profiles), len(self.term_ids))
+        return sparse.csr_matrix((np.array(counts, dtype=np.float64), (rows, cols)), shape=shape)
+
+    def _hashed_semantic_scores(self, candidate_profiles: List[Dict]) -> np.ndarray:
+        """IDF-weighted cosine of hashed term counts, as in HashingSemantic.similarity"""
+        semantic = self.matcher.semantic
+        candidates = self._candidate_term_matrix(candidate_profiles)
+        idf_sq = semantic.idf[self.term_buckets] ** 2
+        dot = (candidates @ self.term_matrix.multiply(idf_sq).tocsr().T).toarray()
+        jd_norm = np.sqrt(self.term_squares @ idf_sq)
+        resume_norm = np.array([[semantic.norm(p['terms'])] for p in candidate_profiles])
+        scores = np.zeros(dot.shape)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            np.divide(dot, resume_norm * jd_norm, out=scores, where=dot > 0)
+        return scores
+
+    def _semantic_scores(self, candidate_profiles: List[Dict]) -> np.ndarray:
+        """Pair-fitted TF-IDF cosine of every candidate/job pair via sparse products"""
+        if self.matcher.semantic is not None:
+            return self._hashed_semantic_scores(candidate_profiles)
+        candidates = self._candidate_term_matrix(candidate_profiles)
+        shape = candidates.shape
+        presence = candidates.copy()
+        presence.data[:] = 1.0
+        squares = candidates.multiply(candidates).tocsr()
+
+        shared = (presence @ self.term_presence.T).toarray()
+        dot = (candidates @ self.term_matrix.T).toarray()
+        resume_shared_sq = (squares @ self.term_presence.T).toarray()
+        jd_shared_sq = (presence @ self.term_squares.T).toarray()
+        resume_total_sq = np.array([[float(sum(c * c for c in p['terms'].values()))] for p in candidate_profiles])
+
+        unique_sq = PAIR_IDF_UNIQUE * PAIR_IDF_UNIQUE
+        resume_norm = np.sqrt(resume_shared_sq + unique_sq * (resume_total_sq - resume_shared_sq))
+        jd_norm = np.sqrt(jd_shared_sq + unique_sq * (self.term_total_sq - jd_shared_sq))
+        valid = (shared > 0) & (resume_norm > 0) & (jd_norm > 0)
+        scores = np.zeros(shape[:1] + (len(self.jobs),))
+        scores[valid] = dot[valid] * PAIR_IDF_SHARED * PAIR_IDF_SHARED / (resume_norm[valid] * jd_norm[valid])
+
+        # Pairs over the vectorizer's max_features are trimmed first; score those one by one
+        max_features = self.matcher.tfidf_vectorizer.max_features
+        if max_features:
+            term_counts = np.array([[len(p['terms'])] for p in candidate_profiles])
+            union = term_counts + self.term_totals - shared
+            for row, column in zip(*np.nonzero(valid & (union > max_features))):
+                scores[row, column] = self.matcher.semantic_similarity_from_terms(
+                    candidate_profiles[row]['terms'], self.profiles[column]['terms']
+                )
+        return scores
+
+    def _education_scores(self, candidate_profiles: List[Dict]) -> np.ndarray:
+        """Education score of every pair, reusing scores of repeated requirement lists"""
+        scores = np.empty((len(candidate_profiles), len(self.jobs)))
+        for row, candidate_profile in enumerate(candidate_profiles):
+            seen = {}
+            for column, profile in enumerate(self.profiles):
+                key = tuple(profile['education_requirements'])
+                if key not in seen:
+                    seen[key] = self.matcher.score_education(candidate_profile, profile)
+                scores[row, column] = seen[key]
+        return scores
+
+    def _columns_view(self, columns: np.ndarray) -> 'JobIndex':
+        """A shallow copy holding only the given job columns, sharing the skill and term vocabularies"""
+        view = copy.copy(self)
+        view.jobs = [self.jobs[column] for column in columns]
+        view.profiles = [self.profiles[column] for column in columns]
+        for name in ('job_ids', 'term_totals', 'term_total_sq', 'skill_counts', 'required_skills',
+                     'required_experience'):
+            setattr(view, name, getattr(self, name)[columns])
+        for name in ('term_matrix', 'term_presence', 'term_squares', 'skill_matrix'):
+            setattr(view, name, getattr(self, name)[columns])
+        view.weights = {component: weights[columns] for component, weights in self.weights.items()}
+        return view
+
+    def score_tile(self, candidate_profiles: List[Dict],
+                   columns: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """Unrounded component and overall scores of candidates x cached jobs
+
+        Returns (candidates, jobs) matrices keyed like the match result
+        components, plus the ``exact`` and ``partial`` skill flags
+        (candidates x ``skill_vocab``) for building matched/missing lists.
+        With ``columns`` only those jobs are scored, in that order.
+        """
+        if columns is not None:
+            return self._columns_view(np.asarray(columns, dtype=np.int64)).score_tile(candidate_profiles)
+        weights = self.weights
+        components = {}
+        self.matcher.refresh_semantic()
+        with metrics.timer('score_skills'):
+            exact, partial = self._skill_flags(candidate_profiles)
+            components['skills'] = self._skill_scores(exact, partial)
+        with metrics.timer('score_semantic'):
+            components['semantic'] = self._semantic_scores(candidate_profiles)
+        with metrics.timer('score_experience'):
+            components['experience'] = self._experience_scores(candidate_profiles)
+        with metrics.timer('score_education'):
+            components['education'] = self._education_scores(candidate_profiles)
+        self.matcher.scored_total += len(candidate_profiles) * len(self.jobs)
+        overall = (
+            components['skills'] * weights['skills'] +
+            components['semantic'] * weights['semantic'] +
+            components['experience'] * weights['experience'] +
+            components['education'] * weights['education']
+        )
+
+        skill_count = np.array([[p['skill_count']] for p in candidate_profiles], dtype=np.float64)
+        required = self.skill_counts
+        diversity = np.where(skill_count > required,
+                             np.minimum(0.05, skill_count / np.maximum(required, 1) - 1), 0.0)
+        components['overall'] = np.minimum(1.0, overall + diversity)
+        components['exact'] = exact
+        components['partial'] = partial
+        return components
+
+    def rank_jobs(self, candidate_profile: Dict, top_k: Optional[int] = None) -> List[Tuple[Dict, Dict]]:
+        """Return (job, match_result) pairs for the best jobs, best first (ties by job id)"""
+        self.refresh()
+        with self._lock:
+            if not self.jobs or (top_k is not None and top_k <= 0):
+                return []
+
+            # Round like overall_score so ordering and ties agree with the full result
+            overall = self.score_tile([candidate_profile])['overall'][0]
+            scores = [round(score * 100, 2) for score in overall.tolist()]
+            order = sorted(range(len(scores)), key=lambda row: (-scores[row], self.jobs[row]['id']))
+            if top_k is not None:
+                order = order[:top_k]
+
+            return [(self.jobs[row], self.matcher.score_profiles(candidate_profile, self.profiles[row]))
+                    for row in order]
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
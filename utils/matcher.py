@@ -1,11 +1,58 @@
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
-from typing import Dict, List, Tuple
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import hashlib
+import heapq
+import json
+import math
 import re
+import time
+
+from . import metrics
+
+# Inverse document frequencies of a smoothed TF-IDF fit on exactly two
+# documents: terms present in both get idf 1, terms in only one get 1 + ln(1.5)
+PAIR_IDF_SHARED = 1.0
+PAIR_IDF_UNIQUE = 1.0 + math.log(1.5)
+
+# Bump whenever scoring logic changes in a way scorer_version() cannot see
+# (weights in _calculate_dynamic_weights, skill_aliases, score formulas)
+SCORER_REVISION = 1
+
 
 class JobMatcher:
-    def __init__(self):
+    # Define education hierarchy
+    education_levels = {
+        'phd': 5, 'doctorate': 5, 'doctoral': 5,
+        'master': 4, 'mba': 4, 'ms': 4, 'ma': 4, 'mtech': 4,
+        'bachelor': 3, 'ba': 3, 'bs': 3, 'btech': 3, 'be': 3,
+        'associate': 2, 'diploma': 2,
+        'certificate': 1, 'certification': 1
+    }
+
+    # Common abbreviations and variations
+    skill_aliases = {
+        'js': 'javascript',
+        'ts': 'typescript',
+        'py': 'python',
+        'ml': 'machine learning',
+        'ai': 'artificial intelligence',
+        'dl': 'deep learning',
+        'cv': 'computer vision',
+        'nlp': 'natural language processing',
+        'aws': 'amazon web services',
+        'gcp': 'google cloud platform',
+        'k8s': 'kubernetes',
+        'tf': 'tensorflow',
+        'sklearn': 'scikit-learn',
+        'cv2': 'opencv',
+        'pd': 'pandas',
+        'np': 'numpy'
+    }
+
+    def __init__(self, semantic=None):
         self.tfidf_vectorizer = TfidfVectorizer(
             max_features=5000,
             stop_words='english',
@@ -13,6 +60,15 @@ class JobMatcher:
             lowercase=True,
             strip_accents='unicode'
         )
+        self._analyzer = self.tfidf_vectorizer.build_analyzer()
+        # Optional fixed-memory engine (utils.semantic.HashingSemantic) replacing the
+        # pair-fitted TF-IDF; profile terms are then keyed by hash bucket
+        self.semantic = semantic
+        
+        # Candidates skipped by top-K upper-bound pruning since startup
+        self.pruned_total = 0
+        # Candidates given a full score by rank_profiles since startup
+        self.scored_total = 0
         
         # Skill importance weights (higher = more important)
         self.skill_weights = {
@@ -26,31 +82,18 @@ class JobMatcher:
             'data_science': 0.9
         }
     
+    def scorer_version(self) -> str:
+        """Fingerprint of the scoring configuration; match rows scored under another are stale"""
+        config = [SCORER_REVISION, self.education_levels, self.skill_weights]
+        if self.semantic is not None:
+            config.append(self.semantic.name)
+        config = json.dumps(config, sort_keys=True)
+        return hashlib.sha1(config.encode('utf-8')).hexdigest()[:12]
+    
     def normalize_skill_name(self, skill: str) -> str:
         """Normalize skill names for better matching"""
         skill = skill.lower().strip()
-        
-        # Common abbreviations and variations
-        skill_mapping = {
-            'js': 'javascript',
-            'ts': 'typescript',
-            'py': 'python',
-            'ml': 'machine learning',
-            'ai': 'artificial intelligence',
-            'dl': 'deep learning',
-            'cv': 'computer vision',
-            'nlp': 'natural language processing',
-            'aws': 'amazon web services',
-            'gcp': 'google cloud platform',
-            'k8s': 'kubernetes',
-            'tf': 'tensorflow',
-            'sklearn': 'scikit-learn',
-            'cv2': 'opencv',
-            'pd': 'pandas',
-            'np': 'numpy'
-        }
-        
-        return skill_mapping.get(skill, skill)
+        return self.skill_aliases.get(skill, skill)
     
     def calculate_skill_match(self, resume_skills: List[str], jd_skills: List[str]) -> Dict:
         """Calculate skill-based matching score with advanced matching"""
@@ -61,6 +104,13 @@ class JobMatcher:
         resume_skills_norm = [self.normalize_skill_name(skill) for skill in resume_skills]
         jd_skills_norm = [self.normalize_skill_name(skill) for skill in jd_skills]
         
+        return self._match_normalized_skills(resume_skills_norm, jd_skills_norm)
+    
+    def _match_normalized_skills(self, resume_skills_norm: List[str], jd_skills_norm: List[str]) -> Dict:
+        """Skill matching on already normalized skill lists"""
+        if not jd_skills_norm:
+            return {'score': 0, 'matched_skills': [], 'missing_skills': [], 'partial_matches': []}
+        
         matched_skills = []
         partial_matches = []
         
@@ -117,6 +167,8 @@ class JobMatcher:
     
     def calculate_semantic_similarity(self, resume_text: str, jd_text: str) -> float:
         """Calculate semantic similarity using TF-IDF"""
+        if self.semantic is not None:
+            return self.semantic.similarity(self.build_term_counts(resume_text), self.build_term_counts(jd_text))
         try:
             # Clean and prepare texts
             resume_clean = self._clean_text(resume_text)
@@ -178,75 +230,284 @@ class JobMatcher:
             return 0.3  # Some credit for experience over education
         
         resume_edu_text = ' '.join(resume_education).lower()
-        
-        # Define education hierarchy
-        education_levels = {
-            'phd': 5, 'doctorate': 5, 'doctoral': 5,
-            'master': 4, 'mba': 4, 'ms': 4, 'ma': 4, 'mtech': 4,
-            'bachelor': 3, 'ba': 3, 'bs': 3, 'btech': 3, 'be': 3,
-            'associate': 2, 'diploma': 2,
-            'certificate': 1, 'certification': 1
-        }
-        
-        # Find highest education level in resume
-        resume_level = 0
-        for edu_item in resume_education:
-            edu_lower = edu_item.lower()
-            for level_key, level_value in education_levels.items():
-                if level_key in edu_lower:
-                    resume_level = max(resume_level, level_value)
-        
+        return self._education_match_from_text(
+            resume_edu_text, self.get_education_level(resume_edu_text),
+            self.education_requirement_specs(jd_requirements)
+        )
+    
+    def get_education_level(self, education_text: str) -> int:
+        """Find the highest education level mentioned in a lowercased text"""
+        level = 0
+        for level_key, level_value in self.education_levels.items():
+            if level_key in education_text:
+                level = max(level, level_value)
+        return level
+    
+    def education_requirement_specs(self, jd_requirements: List[str]) -> List[Tuple[Tuple[str, ...], int]]:
+        """Keywords and required degree level of each requirement, derived once per job"""
+        specs = []
+        for requirement in jd_requirements:
+            req_lower = requirement.lower()
+            specs.append((tuple(req_lower.split()), self.get_education_level(req_lower)))
+        return specs
+    
+    def _education_match_from_text(self, resume_edu_text: str, resume_level: int,
+                                   requirement_specs: List[Tuple[Tuple[str, ...], int]]) -> float:
+        """Education score from the joined education text and its highest level"""
         # Calculate match score
         matches = 0
-        total_requirements = len(jd_requirements)
+        total_requirements = len(requirement_specs)
         
-        for requirement in jd_requirements:
-            req_lower = requirement.lower()
-            
+        for keywords, required_level in requirement_specs:
             # Direct keyword match
-            if any(keyword in resume_edu_text for keyword in req_lower.split()):
+            if any(keyword in resume_edu_text for keyword in keywords):
                 matches += 1
             # Level-based matching
-            else:
-                required_level = 0
-                for level_key, level_value in education_levels.items():
-                    if level_key in req_lower:
-                        required_level = max(required_level, level_value)
-                
-                if resume_level >= required_level and required_level > 0:
-                    matches += 0.8  # Partial credit for meeting level requirement
+            elif resume_level >= required_level and required_level > 0:
+                matches += 0.8  # Partial credit for meeting level requirement
         
         return min(1.0, matches / total_requirements) if total_requirements > 0 else 1.0
     
-    def calculate_overall_match(self, resume_data: Dict, job_data: Dict) -> Dict:
-        """Calculate comprehensive matching score with detailed breakdown"""
-        # Extract skills from both resume and JD
-        resume_skills = []
-        if 'skills' in resume_data:
-            for category, category_skills in resume_data['skills'].items():
+    def build_term_counts(self, text: str) -> Dict:
+        """Count the TF-IDF analyzer terms (unigrams and bigrams) of a text
+        
+        With a semantic engine the counts are keyed by hash bucket instead.
+        """
+        cleaned = self._clean_text(text)
+        if not cleaned:
+            return {}
+        if self.semantic is not None:
+            return self.semantic.term_counts(cleaned)
+        return dict(Counter(self._analyzer(cleaned)))
+    
+    def semantic_name(self) -> str:
+        """Which vector space profile terms live in"""
+        return self.semantic.name if self.semantic is not None else 'tfidf'
+    
+    def refresh_semantic(self):
+        """Pick up document frequencies other processes added since the last call"""
+        if self.semantic is not None:
+            self.semantic.refresh()
+    
+    def record_documents(self, cursor, term_counts: Iterable[Dict], counted: bool = False):
+        """Add new resumes' terms to the engine's document frequencies in the caller's transaction
+
+        ``counted`` resumes were recorded before (without text): only their terms are added.
+        """
+        if self.semantic is not None:
+            self.semantic.add_documents(term_counts, cursor, counted)
+    
+    def semantic_similarity_from_terms(self, resume_terms: Dict[str, int], jd_terms: Dict[str, int]) -> float:
+        """Calculate semantic similarity from precomputed term counts
+        
+        Gives the same cosine as fitting the TF-IDF vectorizer on the two
+        documents (see calculate_semantic_similarity) without re-tokenizing.
+        """
+        if self.semantic is not None:
+            return self.semantic.similarity(resume_terms, jd_terms)
+        if not resume_terms or not jd_terms:
+            return 0.0
+        
+        shared = resume_terms.keys() & jd_terms.keys()
+        if not shared:
+            return 0.0
+        
+        max_features = self.tfidf_vectorizer.max_features
+        if max_features and len(resume_terms) + len(jd_terms) - len(shared) > max_features:
+            resume_terms, jd_terms = self._limit_terms(resume_terms, jd_terms, max_features)
+            shared = resume_terms.keys() & jd_terms.keys()
+            if not shared:
+                return 0.0
+        
+        dot = sum(resume_terms[term] * jd_terms[term] for term in shared)
+        resume_shared_sq = sum(resume_terms[term] ** 2 for term in shared)
+        jd_shared_sq = sum(jd_terms[term] ** 2 for term in shared)
+        resume_total_sq = sum(count * count for count in resume_terms.values())
+        jd_total_sq = sum(count * count for count in jd_terms.values())
+        
+        return self._pair_cosine(dot, resume_shared_sq, resume_total_sq, jd_shared_sq, jd_total_sq)
+    
+    @staticmethod
+    def _pair_cosine(dot, resume_shared_sq, resume_total_sq, jd_shared_sq, jd_total_sq) -> float:
+        """Cosine of two pair-fitted TF-IDF vectors from their count statistics"""
+        unique_sq = PAIR_IDF_UNIQUE * PAIR_IDF_UNIQUE
+        resume_norm = math.sqrt(resume_shared_sq + unique_sq * (resume_total_sq - resume_shared_sq))
+        jd_norm = math.sqrt(jd_shared_sq + unique_sq * (jd_total_sq - jd_shared_sq))
+        if not resume_norm or not jd_norm:
+            return 0.0
+        return float(dot * PAIR_IDF_SHARED * PAIR_IDF_SHARED / (resume_norm * jd_norm))
+    
+    @staticmethod
+    def _limit_terms(resume_terms: Dict[str, int], jd_terms: Dict[str, int],
+                     max_features: int) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """Keep the max_features most frequent terms of the pair, as the vectorizer does"""
+        totals = Counter(resume_terms)
+        totals.update(jd_terms)
+        kept = {term for term, _ in sorted(totals.items(), key=lambda item: (-item[1], item[0]))[:max_features]}
+        return ({term: count for term, count in resume_terms.items() if term in kept},
+                {term: count for term, count in jd_terms.items() if term in kept})
+    
+    def _flatten_skills(self, skills) -> List[str]:
+        """Flatten a categorized skills dict into a single list"""
+        flat = []
+        if isinstance(skills, dict):
+            for category, category_skills in skills.items():
                 if isinstance(category_skills, list):
-                    resume_skills.extend(category_skills)
+                    flat.extend(category_skills)
+        return flat
+    
+    def build_candidate_profile(self, resume_data: Dict) -> Dict:
+        """Precompute everything the scorer needs from a candidate record"""
+        resume_skills = self._flatten_skills(resume_data.get('skills'))
+        education_text = ' '.join(resume_data.get('education') or []).lower()
         
-        jd_skills = job_data.get('required_skills', [])
+        return {
+            'skills': [self.normalize_skill_name(skill) for skill in resume_skills],
+            'skill_count': len(resume_skills),
+            'experience_years': resume_data.get('experience_years') or 0,
+            'education_text': education_text,
+            'education_level': self.get_education_level(education_text),
+            'terms': self.build_term_counts(resume_data.get('raw_text', ''))
+        }
+    
+    def build_job_profile(self, job_data: Dict) -> Dict:
+        """Precompute everything the scorer needs from a job description"""
+        jd_skills = job_data.get('required_skills', []) or []
+        education_requirements = job_data.get('education_requirements', []) or []
         
-        # Calculate individual scores
-        skill_match = self.calculate_skill_match(resume_skills, jd_skills)
-        semantic_score = self.calculate_semantic_similarity(
-            resume_data.get('raw_text', ''), 
-            job_data.get('description', '')
+        return {
+            'skills': [self.normalize_skill_name(skill) for skill in jd_skills],
+            'skill_count': len(jd_skills),
+            'required_experience': job_data.get('required_experience') or 0,
+            'education_requirements': education_requirements,
+            'education_specs': self.education_requirement_specs(education_requirements),
+            'weights': self._calculate_dynamic_weights(job_data),
+            'terms': self.build_term_counts(job_data.get('description', ''))
+        }
+    
+    def score_education(self, candidate_profile: Dict, job_profile: Dict) -> float:
+        """Education component of a candidate/job profile pair"""
+        specs = job_profile['education_specs']
+        if not specs:
+            return 1.0
+        if not candidate_profile['education_text']:
+            return 0.3
+        return self._education_match_from_text(
+            candidate_profile['education_text'], candidate_profile['education_level'], specs
         )
+    
+    def score_profiles(self, candidate_profile: Dict, job_profile: Dict) -> Dict:
+        """Calculate the full match result for precomputed profiles"""
+        skill_match = self._match_normalized_skills(candidate_profile['skills'], job_profile['skills'])
         experience_score = self.calculate_experience_match(
-            resume_data.get('experience_years', 0),
-            job_data.get('required_experience', 0)
-        )
-        education_score = self.calculate_education_match(
-            resume_data.get('education', []),
-            job_data.get('education_requirements', [])
+            candidate_profile['experience_years'], job_profile['required_experience']
         )
+        semantic_score = self.semantic_similarity_from_terms(candidate_profile['terms'], job_profile['terms'])
+        education_score = self.score_education(candidate_profile, job_profile)
         
-        # Dynamic weights based on job requirements
-        weights = self._calculate_dynamic_weights(job_data)
-        
+        return self._combine_scores(
+            skill_match, semantic_score, experience_score, education_score,
+            candidate_profile['skill_count'], job_profile['skill_count'], job_profile['weights']
+        )
+    
+    def rank_profiles(self, candidates: Iterable[Tuple[int, Dict]], job_profile: Dict,
+                      top_k: Optional[int] = None,
+                      semantic_fn: Optional[Callable[[Dict, Dict], float]] = None) -> Tuple[List[Tuple[int, Dict]], int]:
+        """Rank (candidate_id, profile) pairs, best first, returning (ranking, pruned count)
+        
+        With top_k, the cheap components (skills, experience, diversity bonus)
+        are scored first and semantic/education are assumed perfect to get
+        an upper bound. Candidates are then fully scored in order of that
+        bound until no remaining bound can beat the current K-th best, so
+        the result equals the first top_k entries of an exhaustive ranking
+        (ties broken by candidate id).
+        """
+        if top_k is not None and top_k <= 0:
+            return [], 0
+        self.refresh_semantic()
+        if semantic_fn is None:
+            semantic_fn = lambda profile, job: self.semantic_similarity_from_terms(profile['terms'], job['terms'])
+        weights = job_profile['weights']
+        expensive_ceiling = weights['semantic'] + weights['education']
+        
+        # Component times are summed over the call and recorded once per stage
+        timing = metrics.recording()
+        clock = time.perf_counter
+        skills_seconds = experience_seconds = semantic_seconds = education_seconds = 0.0
+        
+        staged = []
+        for candidate_id, profile in candidates:
+            started = clock() if timing else 0.0
+            skill_match = self._match_normalized_skills(profile['skills'], job_profile['skills'])
+            skills_done = clock() if timing else 0.0
+            experience_score = self.calculate_experience_match(
+                profile['experience_years'], job_profile['required_experience']
+            )
+            if timing:
+                experience_seconds += clock() - skills_done
+                skills_seconds += skills_done - started
+            cheap = (skill_match['score'] * weights['skills'] + experience_score * weights['experience'] +
+                     self._diversity_bonus(profile['skill_count'], job_profile['skill_count']))
+            # Rounded like overall_score; the epsilon absorbs float summation order
+            bound = round(min(1.0, cheap + expensive_ceiling + 1e-9) * 100, 2)
+            staged.append((bound, candidate_id, profile, skill_match, experience_score))
+        
+        if top_k is not None:
+            staged.sort(key=lambda item: (-item[0], item[1]))
+        
+        # Min-heap whose root is the current worst of the best top_k
+        heap = []
+        ranked = []
+        scored = 0
+        for bound, candidate_id, profile, skill_match, experience_score in staged:
+            if top_k is not None and len(heap) >= top_k and (bound, -candidate_id) < heap[0][:2]:
+                break
+            
+            started = clock() if timing else 0.0
+            semantic_score = semantic_fn(profile, job_profile)
+            semantic_done = clock() if timing else 0.0
+            education_score = self.score_education(profile, job_profile)
+            if timing:
+                education_seconds += clock() - semantic_done
+                semantic_seconds += semantic_done - started
+            
+            match_result = self._combine_scores(
+                skill_match, semantic_score, experience_score, education_score,
+                profile['skill_count'], job_profile['skill_count'], weights
+            )
+            scored += 1
+            
+            if top_k is None:
+                ranked.append((candidate_id, match_result))
+            else:
+                entry = (match_result['overall_score'], -candidate_id, match_result)
+                if len(heap) < top_k:
+                    heapq.heappush(heap, entry)
+                elif entry[:2] > heap[0][:2]:
+                    heapq.heapreplace(heap, entry)
+        
+        if top_k is not None:
+            ranked = [(-neg_id, match_result) for _, neg_id, match_result in heap]
+        ranked.sort(key=lambda item: (-item[1]['overall_score'], item[0]))
+        
+        pruned = len(staged) - scored
+        self.pruned_total += pruned
+        self.scored_total += scored
+        if timing and staged:
+            metrics.observe('score_skills', skills_seconds)
+            metrics.observe('score_experience', experience_seconds)
+            metrics.observe('score_semantic', semantic_seconds)
+            metrics.observe('score_education', education_seconds)
+        return ranked, pruned
+    
+    def calculate_overall_match(self, resume_data: Dict, job_data: Dict) -> Dict:
+        """Calculate comprehensive matching score with detailed breakdown"""
+        return self.score_profiles(self.build_candidate_profile(resume_data), self.build_job_profile(job_data))
+    
+    def _combine_scores(self, skill_match: Dict, semantic_score: float, experience_score: float,
+                        education_score: float, resume_skill_count: int, jd_skill_count: int,
+                        weights: Dict) -> Dict:
+        """Combine component scores into the weighted overall match result"""
         # Calculate weighted overall score
         overall_score = (
             skill_match['score'] * weights['skills'] +
@@ -256,7 +517,7 @@ class JobMatcher:
         )
         
         # Bonus for skill diversity (if candidate has more skills than required)
-        diversity_bonus = min(0.05, len(resume_skills) / max(len(jd_skills), 1) - 1) if len(resume_skills) > len(jd_skills) else 0
+        diversity_bonus = self._diversity_bonus(resume_skill_count, jd_skill_count)
         overall_score = min(1.0, overall_score + diversity_bonus)
         
         return {
@@ -268,14 +529,21 @@ class JobMatcher:
             'diversity_bonus': round(diversity_bonus * 100, 2),
             'breakdown': weights,
             'detailed_analysis': {
-                'total_resume_skills': len(resume_skills),
-                'required_skills': len(jd_skills),
+                'total_resume_skills': resume_skill_count,
+                'required_skills': jd_skill_count,
                 'exact_skill_matches': skill_match.get('exact_matches', 0),
                 'partial_skill_matches': len(skill_match.get('partial_matches', [])),
                 'skill_coverage_percentage': round(skill_match['score'] * 100, 1)
             }
         }
     
+    @staticmethod
+    def _diversity_bonus(resume_skill_count: int, jd_skill_count: int) -> float:
+        """Bonus for skill diversity, capped at 0.05"""
+        if resume_skill_count > jd_skill_count:
+            return min(0.05, resume_skill_count / max(jd_skill_count, 1) - 1)
+        return 0
+    
     def _calculate_dynamic_weights(self, job_data: Dict) -> Dict:
         """Calculate dynamic weights based on job requirements"""
         base_weights = {
@@ -308,6 +576,21 @@ class JobMatcher:
         
         return base_weights
     
+    def summarize_match(self, match_result: Dict) -> Dict:
+        """Scores and skill counts of a match result, without the skill lists and per-row weights"""
+        skill_match = match_result['skill_match']
+        summary = {key: value for key, value in match_result.items()
+                   if key.endswith('_score') and isinstance(value, (int, float))}
+        summary.update({
+            'skill_score': round(skill_match['score'] * 100, 2),
+            'diversity_bonus': match_result['diversity_bonus'],
+            'matched_skill_count': len(skill_match['matched_skills']),
+            'missing_skill_count': len(skill_match['missing_skills']),
+            'partial_skill_count': len(skill_match.get('partial_matches', [])),
+            'required_skill_count': skill_match.get('total_required', 0)
+        })
+        return summary
+
     def generate_match_explanation(self, match_result: Dict) -> str:
         """Generate human-readable explanation of the match"""
         score = match_result['overall_score']
@@ -320,7 +603,8 @@ class JobMatcher:
         else:
             explanation = "Fair match with significant skill gaps. "
         
-        explanation += f"The candidate matches {skill_match['exact_matches']} out of {skill_match['total_required']} required skills exactly"
+        explanation += (f"The candidate matches {skill_match.get('exact_matches', 0)} out of "
+                        f"{skill_match.get('total_required', 0)} required skills exactly")
         
         if skill_match.get('partial_matches'):
             explanation += f" and has partial matches for {len(skill_match['partial_matches'])} additional skills"
@@ -0,0 +1,269 @@
+"""
+In-process metrics rendered in the Prometheus text exposition format.
+
+Hot paths record into a few module-level metrics: ``STAGE_SECONDS`` times
+each processing stage (file save, text extraction, spaCy, each skill
+extraction strategy, database writes, scoring components) and ``DOCUMENTS``
+counts extracted documents. Recording is a ``perf_counter`` pair plus a
+locked bucket increment, and ``enable(False)`` turns timers into no-ops.
+Values that already live elsewhere (cache hit counters, pool and index
+sizes) are registered as callbacks and only read when ``/metrics`` is
+scraped.
+
+Stage timings are also summed per request while ``collect_stages`` is
+active in the current context, which is what the Server-Timing header
+reports.
+"""
+import abc
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Seconds; stages range from microsecond scoring components to multi-second PDFs
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_enabled = True
+
+# stage -> [seconds, calls] for the request being handled in this context
+_request_stages: ContextVar[Optional[Dict[str, list]]] = ContextVar('request_stages', default=None)
+
+
+def enable(on: bool = True):
+    """Switch recording on or off; callback metrics are unaffected"""
+    global _enabled
+    _enabled = on
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def recording() -> bool:
+    """Whether a stage timing would be kept anywhere (histograms or the current request)"""
+    return _enabled or _request_stages.get() is not None
+
+
+def collect_stages():
+    """Start summing stage timings for the current context; pass the token to ``stop_collecting``"""
+    return _request_stages.set({})
+
+
+def collected_stages() -> Dict[str, list]:
+    """Stage -> [seconds, calls] summed since ``collect_stages`` (empty when not collecting)"""
+    return _request_stages.get() or {}
+
+
+def stop_collecting(token):
+    _request_stages.reset(token)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric(abc.ABC):
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+
+    @abc.abstractmethod
+    def samples(self) -> List[str]:
+        """Exposition lines for every label set"""
+
+
+class Counter(_Metric):
+    """Monotonic count per label set"""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f'{self.name}{_format_labels(self.labels, key)} {_format_value(value)}' for key, value in values]
+
+
+class Histogram(_Metric):
+    """Observation counts per bucket, plus sum and count, per label set"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last is +Inf), sum]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, seconds: float, *label_values: str):
+        position = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            entry = self._values.get(label_values)
+            if entry is None:
+                entry = self._values[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][position] += 1
+            entry[1] += seconds
+
+    def count(self, *label_values: str) -> int:
+        entry = self._values.get(label_values)
+        return sum(entry[0]) if entry else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        lines = []
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                labels = _format_labels(self.labels, key, ('le', _format_value(float(bound))))
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.labels, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+class CallbackMetric(_Metric):
+    """Counter or gauge whose values are read from a function at scrape time
+
+    The function returns a number, or for labelled metrics an iterable of
+    (label values tuple, number) pairs.
+    """
+
+    def __init__(self, name: str, documentation: str, fn: Callable, labels: Sequence[str] = (),
+                 kind: str = 'gauge'):
+        super().__init__(name, documentation, labels)
+        self.kind = kind
+        self.fn = fn
+
+    def samples(self) -> List[str]:
+        try:
+            result = self.fn()
+        except Exception:
+            # A failing source must not break the whole scrape
+            return []
+        if not self.labels:
+            return [f'{self.name} {_format_value(result)}']
+        return [f'{self.name}{_format_labels(self.labels, key)} {_format_value(value)}' for key, value in result]
+
+
+class Registry:
+    """Named metrics rendered together"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        # Re-registering replaces, so re-imports and app reloads do not fail
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    def gauge(self, name: str, documentation: str, fn: Callable, labels: Sequence[str] = ()) -> CallbackMetric:
+        return self.register(CallbackMetric(name, documentation, fn, labels, 'gauge'))
+
+    def counter(self, name: str, documentation: str, fn: Callable, labels: Sequence[str] = ()) -> CallbackMetric:
+        return self.register(CallbackMetric(name, documentation, fn, labels, 'counter'))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            samples = metric.samples()
+            if samples:
+                lines.extend(metric.header())
+                lines.extend(samples)
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    'resume_screener_stage_seconds', 'Time spent in each processing stage', ['stage']
+))
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    'resume_screener_request_seconds', 'HTTP request latency by endpoint', ['endpoint', 'status']
+))
+DOCUMENTS = REGISTRY.register(Counter(
+    'resume_screener_documents_total', 'Documents whose text was extracted', ['type', 'outcome']
+))
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def observe(stage: str, seconds: float):
+    """Record one timing for ``stage``"""
+    if _enabled:
+        STAGE_SECONDS.observe(seconds, stage)
+    stages = _request_stages.get()
+    if stages is not None:
+        entry = stages.get(stage)
+        if entry is None:
+            stages[stage] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+
+@contextmanager
+def timer(stage: str):
+    """Time the enclosed block as ``stage``"""
+    if not recording():
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - started)
+
+
+def server_timing(total_seconds: Optional[float] = None) -> str:
+    """Server-Timing header value for the stages collected in this context, slowest first"""
+    stages = sorted(collected_stages().items(), key=lambda item: -item[1][0])
+    parts = [f'{stage};dur={seconds * 1000:.2f};desc="{calls}x"' for stage, (seconds, calls) in stages]
+    if total_seconds is not None:
+        parts.append(f'total;dur={total_seconds * 1000:.2f}')
+    return ', '.join(parts)
+
+
+def render() -> str:
+    """All registered metrics in Prometheus text format"""
+    return REGISTRY.render()
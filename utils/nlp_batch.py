@@ -0,0 +1,43 @@
+"""
+Batched spaCy processing with per-item error isolation.
+
+``nlp.pipe`` is much faster than calling ``nlp(text)`` in a loop, but one
+bad text makes it raise and lose the rest of its batch. ``pipe_docs`` redoes
+that batch one text at a time, so the failing item yields its exception and
+every other item still gets its Doc, in input order.
+"""
+import time
+from typing import Iterable, Iterator, Union
+
+from . import metrics
+
+DEFAULT_BATCH_SIZE = 64
+
+
+def pipe_docs(nlp, texts: Iterable[str], batch_size: int = DEFAULT_BATCH_SIZE,
+              n_process: int = 1) -> Iterator[Union[object, Exception]]:
+    """Yield a Doc, or the exception raised for it, for every text in order"""
+    texts = list(texts)
+    position = 0
+    while position < len(texts):
+        try:
+            docs = nlp.pipe(texts[position:], batch_size=batch_size, n_process=n_process)
+            while True:
+                # Only time spent inside spaCy is recorded, not the caller's work between docs
+                started = time.perf_counter()
+                doc = next(docs, None)
+                if doc is None:
+                    break
+                metrics.observe('spacy', time.perf_counter() - started)
+                position += 1
+                yield doc
+        except Exception:
+            # The failure is somewhere in the next batch; isolate it item by item
+            for text in texts[position:position + batch_size]:
+                try:
+                    with metrics.timer('spacy'):
+                        doc = nlp(text)
+                except Exception as e:
+                    doc = e
+                position += 1
+                yield doc
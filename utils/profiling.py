@@ -0,0 +1,133 @@
+"""
+Profiling of single requests.
+
+``RequestProfiler`` profiles the thread that starts it, either
+deterministically with cProfile (saved as a ``.pstats`` file for pstats or
+snakeviz) or by sampling the thread's stack from a helper thread (saved as a
+``.speedscope.json`` file for https://www.speedscope.app). Sampling costs
+little per call, so it suits requests that spend most of their time in many
+small Python functions, where cProfile's overhead would distort the picture.
+"""
+import cProfile
+import json
+import os
+import re
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+MODES = ('pstats', 'speedscope')
+
+DEFAULT_INTERVAL = 0.001
+
+
+class _StackSampler:
+    """Records the stack of one thread every ``interval`` seconds"""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.frames: List[Dict] = []
+        self.frame_ids: Dict[Tuple[str, str, int], int] = {}
+        self.samples: List[List[int]] = []
+        self.weights: List[float] = []
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='request-sampler', daemon=True)
+
+    def _frame_id(self, code) -> int:
+        key = (code.co_name, code.co_filename, code.co_firstlineno)
+        frame_id = self.frame_ids.get(key)
+        if frame_id is None:
+            frame_id = self.frame_ids[key] = len(self.frames)
+            self.frames.append({'name': code.co_name, 'file': code.co_filename, 'line': code.co_firstlineno})
+        return frame_id
+
+    def _run(self):
+        started = last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            now = time.perf_counter()
+            if frame is None:
+                break
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_id(frame.f_code))
+                frame = frame.f_back
+            stack.reverse()
+            self.samples.append(stack)
+            self.weights.append(now - last)
+            last = now
+        self.duration = time.perf_counter() - started
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def speedscope(self, name: str) -> Dict:
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'name': name,
+            'exporter': 'flask-resume-screener',
+            'shared': {'frames': self.frames},
+            'profiles': [{
+                'type': 'sampled',
+                'name': name,
+                'unit': 'seconds',
+                'startValue': 0,
+                'endValue': self.duration,
+                'samples': self.samples,
+                'weights': self.weights
+            }]
+        }
+
+
+class RequestProfiler:
+    """Profiles the calling thread between ``start`` and ``stop``"""
+
+    def __init__(self, mode: str = 'pstats', interval: float = DEFAULT_INTERVAL):
+        if mode not in MODES:
+            raise ValueError(f"Unknown profiling mode '{mode}' (expected one of {', '.join(MODES)})")
+        self.mode = mode
+        self.interval = interval
+        self._profile: Optional[cProfile.Profile] = None
+        self._sampler: Optional[_StackSampler] = None
+
+    def start(self) -> bool:
+        """Begin profiling; False if another profiler already owns the interpreter"""
+        if self.mode == 'pstats':
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Only one deterministic profiler can be active at a time
+                return False
+            self._profile = profile
+        else:
+            self._sampler = _StackSampler(threading.get_ident(), self.interval)
+            self._sampler.start()
+        return True
+
+    def stop(self):
+        if self._profile is not None:
+            self._profile.disable()
+        if self._sampler is not None:
+            self._sampler.stop()
+
+    def save(self, directory: str, label: str) -> str:
+        """Write the profile to ``directory`` and return its path"""
+        os.makedirs(directory, exist_ok=True)
+        stem = f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{re.sub(r'[^A-Za-z0-9_.-]+', '_', label)}"
+        if self.mode == 'pstats':
+            path = os.path.join(directory, stem + '.pstats')
+            self._profile.dump_stats(path)
+        else:
+            path = os.path.join(directory, stem + '.speedscope.json')
+            with open(path, 'w') as f:
+                json.dump(self._sampler.speedscope(label), f)
+        return path
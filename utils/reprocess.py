@@ -0,0 +1,477 @@
+"""
+Resumable background reprocessing after a taxonomy or scorer change.
+
+Derived data is stamped with the version of the code that produced it:
+
+- ``candidates.skills_version`` and ``job_descriptions.skills_version`` hold
+  ``SkillExtractor.taxonomy_version()`` of the extracted skills
+- ``matches.scorer_version`` holds ``JobMatcher.scorer_version()`` of the scores
+
+A run brings every stale row up to the current versions in three phases:
+job skills, candidate skills (re-extracted from the stored resume text with
+``nlp.pipe``) and match scores. Changing a job's or candidate's skills clears
+the stamp of its match rows, so the last phase re-scores exactly the affected
+pairs. Each batch is written in one short transaction together with the run's
+phase and id watermark in ``reprocess_runs``, so readers only ever wait for a
+single batch and an interrupted run continues where it stopped. The usual
+triggers keep the search index and the candidate/job caches in step.
+
+Only one process works on a run at a time: the run row holds a lease that
+every batch renews. A process that dies leaves the run to whoever starts one
+after the lease expires. Rows whose extraction fails keep their old stamp;
+the run then finishes as ``done_with_errors`` and the next run retries them.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from .candidate_cache import CANDIDATE_RECORD_QUERY, CandidateRecord
+from .job_index import JOB_RECORD_QUERY, job_from_row
+
+PHASES = ('jobs', 'candidates', 'matches')
+
+REPROCESS_SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS reprocess_runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        taxonomy_version TEXT NOT NULL,
+        scorer_version TEXT NOT NULL,
+        status TEXT NOT NULL,
+        phase TEXT NOT NULL,
+        watermark INTEGER NOT NULL DEFAULT 0,
+        jobs_updated INTEGER NOT NULL DEFAULT 0,
+        candidates_updated INTEGER NOT NULL DEFAULT 0,
+        matches_rescored INTEGER NOT NULL DEFAULT 0,
+        errors INTEGER NOT NULL DEFAULT 0,
+        error TEXT,
+        started_at TIMESTAMP,
+        updated_at TIMESTAMP,
+        finished_at TIMESTAMP,
+        owner TEXT,
+        lease_expires_at REAL
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_matches_candidate ON matches (candidate_id)',
+    'CREATE INDEX IF NOT EXISTS idx_matches_job ON matches (job_id)'
+]
+
+# (table, column) version stamps added to databases created before reprocessing existed
+VERSION_COLUMNS = [
+    ('candidates', 'skills_version', 'TEXT'),
+    ('job_descriptions', 'skills_version', 'TEXT'),
+    ('matches', 'scorer_version', 'TEXT')
+]
+
+# Lease columns added to reprocess_runs tables created before runs were leased
+LEASE_COLUMNS = [
+    ('reprocess_runs', 'owner', 'TEXT'),
+    ('reprocess_runs', 'lease_expires_at', 'REAL')
+]
+
+FINISHED_STATUSES = ('done', 'done_with_errors', 'superseded')
+
+RUN_COLUMNS = ['id', 'taxonomy_version', 'scorer_version', 'status', 'phase', 'watermark',
+               'jobs_updated', 'candidates_updated', 'matches_rescored', 'errors', 'error',
+               'started_at', 'updated_at', 'finished_at']
+
+
+def init_reprocess_schema(cursor):
+    """Add the version stamp columns and the reprocess_runs progress table"""
+    _add_columns(cursor, VERSION_COLUMNS)
+    for statement in REPROCESS_SCHEMA:
+        cursor.execute(statement)
+    _add_columns(cursor, LEASE_COLUMNS)
+
+
+def _add_columns(cursor, columns):
+    for table, column, kind in columns:
+        cursor.execute(f'PRAGMA table_info({table})')
+        if column not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} {kind}')
+
+
+def _run_from_row(row) -> Dict:
+    return dict(zip(RUN_COLUMNS, row))
+
+
+def latest_run(cursor) -> Optional[Dict]:
+    """The most recent reprocessing run, or None"""
+    try:
+        cursor.execute(f"SELECT {', '.join(RUN_COLUMNS)} FROM reprocess_runs ORDER BY id DESC LIMIT 1")
+    except sqlite3.OperationalError:
+        return None
+    row = cursor.fetchone()
+    return _run_from_row(row) if row else None
+
+
+class _LeaseLost(Exception):
+    """Another process took the run over after this one's lease expired"""
+
+
+def _flatten(skills: Dict[str, List[str]]) -> List[str]:
+    flat = []
+    for category_skills in skills.values():
+        flat.extend(category_skills)
+    return flat
+
+
+class Reprocessor:
+    """Re-extracts skills and re-scores matches that were produced by older code
+
+    ``parser`` (a ResumeParser) is only needed for candidates whose stored
+    text is empty; their resume file is extracted again when it still exists.
+    ``lease_seconds`` must exceed the time one batch takes.
+    """
+
+    def __init__(self, db_path: str, skill_extractor, matcher, parser=None,
+                 batch_size: int = 200, n_process: int = 1, lease_seconds: float = 600.0):
+        self.db_path = db_path
+        self.skill_extractor = skill_extractor
+        self.matcher = matcher
+        self.parser = parser
+        self.batch_size = batch_size
+        self.n_process = n_process
+        self.taxonomy_version = skill_extractor.taxonomy_version()
+        self.scorer_version = matcher.scorer_version()
+        self.lease_seconds = lease_seconds
+        self.owner = f'{os.getpid()}-{uuid.uuid4().hex[:8]}'
+
+    def stale_counts(self, cursor) -> Dict[str, int]:
+        """Rows whose stamps differ from the current versions"""
+        counts = {}
+        for name, table, column, version in (
+            ('jobs', 'job_descriptions', 'skills_version', self.taxonomy_version),
+            ('candidates', 'candidates', 'skills_version', self.taxonomy_version),
+            ('matches', 'matches', 'scorer_version', self.scorer_version)
+        ):
+            cursor.execute(f'SELECT COUNT(*) FROM {table} WHERE {column} IS NOT ?', (version,))
+            counts[name] = cursor.fetchone()[0]
+        return counts
+
+    def _open_run(self, cursor) -> Optional[Dict]:
+        """Resume the unfinished run for the current versions, or start a new one, and lease it
+
+        Returns None while another process holds the lease of a running run.
+        """
+        now = datetime.now()
+        lease_expires_at = time.time() + self.lease_seconds
+        cursor.execute('''
+            SELECT 1 FROM reprocess_runs WHERE status = 'running' AND owner != ? AND lease_expires_at >= ?
+        ''', (self.owner, time.time()))
+        if cursor.fetchone():
+            return None
+
+        # Runs for other versions can never finish; their work is redone against the new stamps
+        cursor.execute(f'''
+            UPDATE reprocess_runs SET status = 'superseded', updated_at = ?, owner = NULL, lease_expires_at = NULL
+            WHERE status NOT IN ({', '.join('?' * len(FINISHED_STATUSES))})
+            AND (taxonomy_version != ? OR scorer_version != ?)
+        ''', (now, *FINISHED_STATUSES, self.taxonomy_version, self.scorer_version))
+
+        cursor.execute(f'''
+            SELECT {', '.join(RUN_COLUMNS)} FROM reprocess_runs
+            WHERE status IN ('running', 'paused', 'failed') AND taxonomy_version = ? AND scorer_version = ?
+            ORDER BY id DESC LIMIT 1
+        ''', (self.taxonomy_version, self.scorer_version))
+        row = cursor.fetchone()
+        if row:
+            run = _run_from_row(row)
+            cursor.execute('''
+                UPDATE reprocess_runs SET status = 'running', error = NULL, updated_at = ?, owner = ?,
+                lease_expires_at = ? WHERE id = ?
+            ''', (now, self.owner, lease_expires_at, run['id']))
+            run['status'], run['error'] = 'running', None
+            return run
+
+        cursor.execute('''
+            INSERT INTO reprocess_runs (taxonomy_version, scorer_version, status, phase, started_at, updated_at,
+            owner, lease_expires_at)
+            VALUES (?, ?, 'running', ?, ?, ?, ?, ?)
+        ''', (self.taxonomy_version, self.scorer_version, PHASES[0], now, now, self.owner, lease_expires_at))
+        return latest_run(cursor)
+
+    def _save_run(self, cursor, run: Dict):
+        """Write the run's progress, renewing the lease while it runs and releasing it otherwise"""
+        run['updated_at'] = datetime.now()
+        running = run['status'] == 'running'
+        cursor.execute('''
+            UPDATE reprocess_runs SET status = ?, phase = ?, watermark = ?, jobs_updated = ?,
+            candidates_updated = ?, matches_rescored = ?, errors = ?, error = ?, updated_at = ?, finished_at = ?,
+            owner = ?, lease_expires_at = ?
+            WHERE id = ? AND owner = ?
+        ''', (run['status'], run['phase'], run['watermark'], run['jobs_updated'], run['candidates_updated'],
+              run['matches_rescored'], run['errors'], run['error'], run['updated_at'], run['finished_at'],
+              self.owner if running else None, time.time() + self.lease_seconds if running else None,
+              run['id'], self.owner))
+        if not cursor.rowcount:
+            raise _LeaseLost()
+
+    def _extract(self, texts: List[str]) -> List:
+        return self.skill_extractor.extract_all_skills_many(texts, self.batch_size, self.n_process)
+
+    def _jobs_batch(self, cursor, run: Dict) -> int:
+        cursor.execute('''
+            SELECT id, description, required_skills FROM job_descriptions
+            WHERE id > ? AND skills_version IS NOT ? ORDER BY id LIMIT ?
+        ''', (run['watermark'], self.taxonomy_version, self.batch_size))
+        rows = cursor.fetchall()
+        if not rows:
+            return 0
+
+        for (job_id, _, stored), skills in zip(rows, self._extract([row[1] or '' for row in rows])):
+            if isinstance(skills, Exception):
+                run['errors'] += 1
+                continue
+            required = json.dumps(_flatten(skills))
+            cursor.execute('UPDATE job_descriptions SET required_skills = ?, skills_version = ? WHERE id = ?',
+                           (required, self.taxonomy_version, job_id))
+            if required != stored:
+                cursor.execute('UPDATE matches SET scorer_version = NULL WHERE job_id = ?', (job_id,))
+            run['jobs_updated'] += 1
+        run['watermark'] = rows[-1][0]
+        return len(rows)
+
+    def _resume_text(self, resume_path: Optional[str]) -> str:
+        """Text of a resume file, for candidates stored without any"""
+        if self.parser is None or not resume_path or not os.path.exists(resume_path):
+            return ''
+        try:
+            return self.parser.extract_text(resume_path, os.path.splitext(resume_path)[1].lstrip('.'))[0]
+        except Exception:
+            return ''
+
+    def _candidates_batch(self, cursor, run: Dict) -> int:
+        cursor.execute('''
+            SELECT id, raw_text, resume_path, skills FROM candidates
+            WHERE id > ? AND skills_version IS NOT ? ORDER BY id LIMIT ?
+        ''', (run['watermark'], self.taxonomy_version, self.batch_size))
+        rows = cursor.fetchall()
+        if not rows:
+            return 0
+
+        recovered = {}
+        texts = []
+        for candidate_id, raw_text, resume_path, _ in rows:
+            if not raw_text:
+                raw_text = recovered[candidate_id] = self._resume_text(resume_path)
+            texts.append(raw_text or '')
+
+        for (candidate_id, _, _, stored), text, skills in zip(rows, texts, self._extract(texts)):
+            if isinstance(skills, Exception):
+                run['errors'] += 1
+                continue
+            encoded = json.dumps(skills)
+            if candidate_id in recovered and text:
+                cursor.execute('UPDATE candidates SET skills = ?, raw_text = ?, skills_version = ? WHERE id = ?',
+                               (encoded, text, self.taxonomy_version, candidate_id))
+                # The upload counted this resume as a document without terms; add its terms only
+                self.matcher.record_documents(cursor, [self.matcher.build_term_counts(text)], counted=True)
+            else:
+                cursor.execute('UPDATE candidates SET skills = ?, skills_version = ? WHERE id = ?',
+                               (encoded, self.taxonomy_version, candidate_id))
+            if encoded != stored or candidate_id in recovered:
+                cursor.execute('UPDATE matches SET scorer_version = NULL WHERE candidate_id = ?', (candidate_id,))
+            run['candidates_updated'] += 1
+        run['watermark'] = rows[-1][0]
+        return len(rows)
+
+    def _matches_batch(self, cursor, run: Dict, job_profiles: Dict[int, Optional[Dict]]) -> int:
+        cursor.execute('''
+            SELECT id, candidate_id, job_id FROM matches
+            WHERE id > ? AND scorer_version IS NOT ? ORDER BY id LIMIT ?
+        ''', (run['watermark'], self.scorer_version, self.batch_size))
+        rows = cursor.fetchall()
+        if not rows:
+            return 0
+
+        candidate_ids = sorted({row[1] for row in rows})
+        cursor.execute(CANDIDATE_RECORD_QUERY + f" WHERE id IN ({', '.join('?' * len(candidate_ids))})",
+                       candidate_ids)
+        candidates = {row[0]: CandidateRecord(row, self.matcher).profile for row in cursor.fetchall()}
+
+        missing_jobs = sorted({row[2] for row in rows} - job_profiles.keys())
+        if missing_jobs:
+            cursor.execute(JOB_RECORD_QUERY + f" WHERE id IN ({', '.join('?' * len(missing_jobs))})", missing_jobs)
+            for job_row in cursor.fetchall():
+                job_profiles[job_row[0]] = self.matcher.build_job_profile(job_from_row(job_row))
+            for job_id in missing_jobs:
+                job_profiles.setdefault(job_id, None)
+
+        updates, orphans = [], []
+        for match_id, candidate_id, job_id in rows:
+            if candidate_id not in candidates or job_profiles[job_id] is None:
+                # The candidate or job is gone; the row keeps its scores but is no longer stale
+                orphans.append((self.scorer_version, match_id))
+                continue
+            result = self.matcher.score_profiles(candidates[candidate_id], job_profiles[job_id])
+            updates.append((
+                result['overall_score'],
+                result['skill_match']['score'] * 100,
+                result['experience_score'],
+                result['education_score'],
+                result['semantic_score'],
+                json.dumps(result['skill_match']['matched_skills']),
+                json.dumps(result['skill_match']['missing_skills']),
+                self.scorer_version,
+                match_id
+            ))
+
+        cursor.executemany('''
+            UPDATE matches SET overall_score = ?, skill_score = ?, experience_score = ?, education_score = ?,
+            semantic_score = ?, matched_skills = ?, missing_skills = ?, scorer_version = ?
+            WHERE id = ?
+        ''', updates)
+        cursor.executemany('UPDATE matches SET scorer_version = ? WHERE id = ?', orphans)
+        run['matches_rescored'] += len(updates)
+        run['watermark'] = rows[-1][0]
+        return len(rows)
+
+    def run(self, stop: Optional[threading.Event] = None,
+            progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """Process stale rows until none are left (or ``stop`` is set) and return the run
+
+        Setting ``stop`` pauses the run after the current batch; calling
+        ``run`` again resumes it. Returns None when another process is
+        working on the run, or took it over from this one.
+        """
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        cursor = conn.cursor()
+        try:
+            cursor.execute('BEGIN IMMEDIATE')
+            run = self._open_run(cursor)
+            conn.commit()
+            if run is None:
+                return None
+            job_profiles: Dict[int, Optional[Dict]] = {}
+            try:
+                while run['phase'] != 'done':
+                    if stop is not None and stop.is_set():
+                        run['status'] = 'paused'
+                        break
+                    batch = getattr(self, f"_{run['phase']}_batch")
+                    args = (cursor, run, job_profiles) if run['phase'] == 'matches' else (cursor, run)
+                    if not batch(*args):
+                        # Phase finished; the next one starts from the lowest id
+                        following = PHASES.index(run['phase']) + 1
+                        run['phase'] = PHASES[following] if following < len(PHASES) else 'done'
+                        run['watermark'] = 0
+                    if run['phase'] == 'done':
+                        run['status'], run['finished_at'] = 'done', datetime.now()
+                        if run['errors']:
+                            run['status'] = 'done_with_errors'
+                            run['error'] = (f"{run['errors']} rows could not be re-extracted; they keep their "
+                                            f"old stamps and the next run retries them")
+                    self._save_run(cursor, run)
+                    conn.commit()
+                    if progress is not None:
+                        progress(dict(run))
+            except _LeaseLost:
+                # This process stalled past its lease; the batch is redone by the new owner
+                conn.rollback()
+                return None
+            except Exception as e:
+                conn.rollback()
+                run['status'], run['error'] = 'failed', str(e)
+            if run['status'] not in FINISHED_STATUSES:
+                # Paused or failed; a finished run was saved with its last batch
+                try:
+                    self._save_run(cursor, run)
+                except _LeaseLost:
+                    conn.rollback()
+                    return None
+                conn.commit()
+            return run
+        finally:
+            conn.close()
+
+
+class BackgroundReprocessor:
+    """Runs a Reprocessor in a daemon thread, one run at a time"""
+
+    def __init__(self, reprocessor: Reprocessor):
+        self.reprocessor = reprocessor
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> bool:
+        """Start (or resume) a run; False if one is already in progress"""
+        with self._lock:
+            if self.running:
+                return False
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.reprocessor.run, args=(self._stop,),
+                                            name='reprocess', daemon=True)
+            self._thread.start()
+            return True
+
+    def stop(self, timeout: Optional[float] = None):
+        """Pause the run after its current batch"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def status(self) -> Dict:
+        conn = sqlite3.connect(self.reprocessor.db_path)
+        try:
+            cursor = conn.cursor()
+            return {
+                'running': self.running,
+                'taxonomy_version': self.reprocessor.taxonomy_version,
+                'scorer_version': self.reprocessor.scorer_version,
+                'stale': self.reprocessor.stale_counts(cursor),
+                'run': latest_run(cursor)
+            }
+        finally:
+            conn.close()
+
+
+def main(argv=None):
+    """Reprocess stale skills and match scores from the command line"""
+    import argparse
+
+    from .matcher import JobMatcher
+    from .semantic import build_semantic
+    from .skill_extractor import SkillExtractor
+
+    parser = argparse.ArgumentParser(description='Re-extract skills and re-score matches after a taxonomy '
+                                                 'or scorer change')
+    parser.add_argument('--db', default=os.path.join('database', 'candidates.db'))
+    parser.add_argument('--batch-size', type=int, default=200, help='Rows per transaction')
+    parser.add_argument('--n-process', type=int, default=1, help='spaCy worker processes for extraction')
+    args = parser.parse_args(argv)
+
+    reprocessor = Reprocessor(args.db, SkillExtractor(), JobMatcher(semantic=build_semantic(db_path=args.db)),
+                              batch_size=args.batch_size, n_process=args.n_process)
+    conn = sqlite3.connect(args.db)
+    try:
+        init_reprocess_schema(conn.cursor())
+        conn.commit()
+    finally:
+        conn.close()
+
+    started = time.perf_counter()
+
+    def report(run):
+        print(f"{run['phase']:>10}  jobs {run['jobs_updated']:>6}  candidates {run['candidates_updated']:>8}  "
+              f"matches {run['matches_rescored']:>10}  errors {run['errors']}")
+
+    run = reprocessor.run(progress=report)
+    if run is None:
+        print('Another process is reprocessing this database')
+        return
+    print(f"Run {run['id']} {run['status']} in {time.perf_counter() - started:.1f}s"
+          + (f": {run['error']}" if run['error'] else ''))
+
+
+if __name__ == '__main__':
+    main()
@@ -3,12 +3,114 @@ import pdfplumber
 from docx import Document
 import re
 import spacy
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterable, Optional, Tuple, Union
+
+from . import metrics
+from .extraction import ExtractionSupervisor, ParseBudget
+from .nlp_batch import DEFAULT_BATCH_SIZE, pipe_docs
+
+# Location entities are looked for in the first lines of a resume only, up to
+# the first section heading; the rest of the document never goes through NER
+HEADER_MAX_LINES = 12
+HEADER_MAX_CHARS = 800
+SECTION_HEADING = re.compile(
+    r'^\s*(?:professional\s+)?(?:summary|objective|profile|experience|work\s+(?:experience|history)|'
+    r'employment|education|skills|technical\s+skills|projects|certifications?)\s*:?\s*$',
+    re.IGNORECASE
+)
+
+
+def header_region(text: str) -> str:
+    """The contact block at the top of a resume"""
+    lines = []
+    for line in text[:HEADER_MAX_CHARS].split('\n')[:HEADER_MAX_LINES]:
+        if lines and SECTION_HEADING.match(line):
+            break
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+class FieldScanner:
+    """Precompiled patterns for the structured resume fields
+    
+    ``scan`` lowercases the text once and makes one pass for each kind of
+    field: the first email and phone number, the years around every
+    occurrence of "experience", and the lines containing an education
+    keyword.
+    """
+    
+    EMAIL = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+    PHONE = re.compile(r'(\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
+    # Experience mentions are anchored on the word itself: "<n> years|yrs (of) experience"
+    # is matched backwards from it on the reversed text, "experience (of) <n> years" forwards
+    EXPERIENCE_WORD = 'experience'
+    YEARS_BEFORE = re.compile(r'(?:\s*fo)?\s*(?:s?raey|s?ry)\s*\+?(\d+)')
+    YEARS_AFTER = re.compile(r'\s*(?:of\s*)?(\d+)\+?\s*years?')
+    EDUCATION_KEYWORDS = [
+        'bachelor', 'master', 'phd', 'doctorate', 'diploma',
+        'btech', 'mtech', 'bsc', 'msc', 'ba', 'ma', 'mba',
+        'engineering', 'computer science', 'information technology'
+    ]
+    EDUCATION = re.compile('|'.join(re.escape(keyword) for keyword in EDUCATION_KEYWORDS))
+    
+    def scan(self, text: str) -> Dict[str, Any]:
+        """Email, phone, experience years, education lines and the header region of a text"""
+        email = self.EMAIL.search(text)
+        phone = self.PHONE.search(text)
+        lowered = text.lower()
+        return {
+            'email': email.group(0) if email else None,
+            'phone': phone.group(0) if phone else None,
+            'experience_years': self.experience_years(lowered),
+            'education': self.education_lines(lowered),
+            'header': header_region(text)
+        }
+    
+    def experience_years(self, lowered: str) -> int:
+        """Largest number of years mentioned next to "experience" in a lowercased text"""
+        years = 0
+        reversed_text = None
+        word, length = self.EXPERIENCE_WORD, len(self.EXPERIENCE_WORD)
+        position = lowered.find(word)
+        while position >= 0:
+            if reversed_text is None:
+                reversed_text = lowered[::-1]
+            before = self.YEARS_BEFORE.match(reversed_text, len(lowered) - position)
+            if before:
+                years = max(years, int(before.group(1)[::-1]))
+            after = self.YEARS_AFTER.match(lowered, position + length)
+            if after:
+                years = max(years, int(after.group(1)))
+            position = lowered.find(word, position + length)
+        return years
+    
+    def education_lines(self, lowered: str) -> List[str]:
+        """Distinct stripped lines of a lowercased text that contain an education keyword"""
+        # Jump from each keyword hit to the next line, so every line is tested once
+        lines = {}
+        position = 0
+        search = self.EDUCATION.search
+        while True:
+            match = search(lowered, position)
+            if match is None:
+                break
+            start = lowered.rfind('\n', 0, match.start()) + 1
+            end = lowered.find('\n', match.end())
+            if end < 0:
+                end = len(lowered)
+            lines.setdefault(lowered[start:end].strip(), None)
+            position = end + 1
+        return list(lines)
+
 
 class ResumeParser:
-    def __init__(self):
+    def __init__(self, budget: Optional[ParseBudget] = None):
         self.nlp = spacy.load("en_core_web_sm")
         
+        # With a budget, text extraction runs in supervised worker processes
+        self.extractor = ExtractionSupervisor(budget) if budget else None
+        self.fields = FieldScanner()
+        
     def extract_text_from_pdf(self, pdf_path: str) -> str:
         """Extract text from PDF resume"""
         text = ""
@@ -33,77 +135,98 @@ class ResumeParser:
             print(f"Error reading DOCX: {e}")
         return text
     
-    def extract_contact_info(self, text: str) -> Dict[str, str]:
-        """Extract email, phone, and location"""
-        contact_info = {}
-        
-        # Email extraction
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, text)
-        contact_info['email'] = emails[0] if emails else None
-        
-        # Phone extraction
-        phone_pattern = r'(\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-        phones = re.findall(phone_pattern, text)
-        contact_info['phone'] = phones[0] if phones else None
+    def extract_contact_info(self, text: str, doc=None) -> Dict[str, str]:
+        """Extract email, phone, and location
         
-        # Location extraction (basic)
-        doc = self.nlp(text)
+        Location comes from the entities of the header region; pass ``doc`` if
+        that region (or the whole text) was already run through nlp.
+        """
+        return self._contact_info(self.fields.scan(text), doc)
+    
+    def _contact_info(self, fields: Dict[str, Any], doc=None) -> Dict[str, str]:
+        if doc is None:
+            with metrics.timer('spacy'):
+                doc = self.nlp(fields['header'])
         locations = [ent.text for ent in doc.ents if ent.label_ in ["GPE", "LOC"]]
-        contact_info['location'] = locations[0] if locations else None
-        
-        return contact_info
+        return {
+            'email': fields['email'],
+            'phone': fields['phone'],
+            'location': locations[0] if locations else None
+        }
     
     def extract_experience_years(self, text: str) -> int:
         """Extract years of experience"""
-        experience_patterns = [
-            r'(\d+)\+?\s*years?\s*(?:of\s*)?experience',
-            r'experience\s*(?:of\s*)?(\d+)\+?\s*years?',
-            r'(\d+)\+?\s*yrs?\s*(?:of\s*)?experience',
-        ]
-        
-        years = []
-        for pattern in experience_patterns:
-            matches = re.findall(pattern, text.lower())
-            years.extend([int(match) for match in matches])
-        
-        return max(years) if years else 0
+        return self.fields.experience_years(text.lower())
     
     def extract_education(self, text: str) -> List[str]:
         """Extract education details"""
-        education_keywords = [
-            'bachelor', 'master', 'phd', 'doctorate', 'diploma',
-            'btech', 'mtech', 'bsc', 'msc', 'ba', 'ma', 'mba',
-            'engineering', 'computer science', 'information technology'
-        ]
+        return self.fields.education_lines(text.lower())
+    
+    def extract_text(self, file_path: str, file_type: str) -> Tuple[str, List[str]]:
+        """Extract the text of a resume file, with the reasons it was truncated (if any)"""
+        file_type = file_type.lower()
+        if file_type not in ('pdf', 'docx'):
+            raise ValueError("Unsupported file type")
         
-        education = []
-        lines = text.lower().split('\n')
+        with metrics.timer(f'extract_{file_type}'):
+            if self.extractor is not None:
+                result = self.extractor.extract(file_path, file_type)
+                text, reasons = result.text, result.reasons
+            elif file_type == 'pdf':
+                text, reasons = self.extract_text_from_pdf(file_path), []
+            else:
+                text, reasons = self.extract_text_from_docx(file_path), []
         
-        for line in lines:
-            for keyword in education_keywords:
-                if keyword in line:
-                    education.append(line.strip())
-                    break
+        metrics.DOCUMENTS.inc(file_type, 'truncated' if reasons else ('ok' if text else 'empty'))
+        return text, reasons
+    
+    def parse_text(self, text: str, truncation_reasons: Optional[List[str]] = None, doc=None) -> Dict[str, Any]:
+        """Parse already extracted resume text (``doc``: nlp output for its header region)"""
+        truncation_reasons = truncation_reasons or []
+        with metrics.timer('parse_fields'):
+            fields = self.fields.scan(text)
         
-        return list(set(education))  # Remove duplicates
+        return {
+            'raw_text': text,
+            'contact_info': self._contact_info(fields, doc),
+            'experience_years': fields['experience_years'],
+            'education': fields['education'],
+            'truncated': bool(truncation_reasons),
+            'truncation_reasons': truncation_reasons
+        }
     
     def parse_resume(self, file_path: str, file_type: str) -> Dict[str, Any]:
         """Main parsing function"""
-        if file_type.lower() == 'pdf':
-            text = self.extract_text_from_pdf(file_path)
-        elif file_type.lower() == 'docx':
-            text = self.extract_text_from_docx(file_path)
-        else:
-            raise ValueError("Unsupported file type")
+        text, truncation_reasons = self.extract_text(file_path, file_type)
+        return self.parse_text(text, truncation_reasons)
+    
+    def parse_many(self, files: Iterable[Tuple[str, str]], batch_size: int = DEFAULT_BATCH_SIZE,
+                   n_process: int = 1) -> List[Union[Dict[str, Any], Exception]]:
+        """Parse (file_path, file_type) pairs, running all header regions through nlp.pipe
         
-        contact_info = self.extract_contact_info(text)
-        experience_years = self.extract_experience_years(text)
-        education = self.extract_education(text)
+        Results are in input order; a file that fails yields its exception
+        instead of a parsed dict, without affecting the others.
+        """
+        extracted = []
+        for file_path, file_type in files:
+            try:
+                extracted.append(self.extract_text(file_path, file_type))
+            except Exception as e:
+                extracted.append(e)
         
-        return {
-            'raw_text': text,
-            'contact_info': contact_info,
-            'experience_years': experience_years,
-            'education': education
-        }
\ No newline at end of file
+        headers = [header_region(item[0]) for item in extracted if not isinstance(item, Exception)]
+        docs = pipe_docs(self.nlp, headers, batch_size, n_process)
+        
+        results = []
+        for item in extracted:
+            if isinstance(item, Exception):
+                results.append(item)
+                continue
+            doc = next(docs)
+            try:
+                if isinstance(doc, Exception):
+                    raise doc
+                results.append(self.parse_text(item[0], item[1], doc))
+            except Exception as e:
+                results.append(e)
+        return results
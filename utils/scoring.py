@@ -0,0 +1,549 @@
+"""
+Pluggable scoring components over columnar candidate features.
+
+``JobMatcher.score_profiles`` scores one candidate/job pair at a time. Here
+each term of the overall score is a ``ScoringComponent`` that:
+
+- declares the profile features it reads (``candidate_keys``/``job_keys``)
+  and can derive extra ones, once per candidate and once per job, when the
+  profile is built (``candidate_features``/``job_features``)
+- packs the features of many candidates into arrays (``pack``), once, when
+  the candidates are loaded
+- scores one job against a whole ``CandidateBlock`` with array operations
+  (``score_many``)
+
+``ScoringPipeline`` holds the components, weights and sums their scores
+like ``JobMatcher._combine_scores`` and ranks a block for a job; only the
+top-K rows get the full per-pair breakdown. The four built-in components
+reproduce the matcher's formulas exactly. Another component (location
+proximity, resume recency, ...) is a subclass passed in ``components``; its
+weight comes from ``weight()`` and its score is added to the overall.
+
+A ranking that only needs the first rows (or the rows above a minimum
+score) bounds every row first with the ``deferred`` components assumed
+perfect, like ``JobMatcher.rank_profiles``, and fully scores only the rows
+whose bound can still make it.
+"""
+import abc
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from . import metrics
+from .matcher import PAIR_IDF_SHARED, PAIR_IDF_UNIQUE
+
+
+def _grow(matrix: sparse.csr_matrix, columns: int) -> sparse.csr_matrix:
+    """The same rows with more (empty) columns, sharing the arrays"""
+    return sparse.csr_matrix((matrix.data, matrix.indices, matrix.indptr), shape=(matrix.shape[0], columns))
+
+
+def _stack(previous: Optional[sparse.csr_matrix], rows: List[int], cols: List[int], values: List[float],
+           n_rows: int, columns: int) -> sparse.csr_matrix:
+    """Append new rows given as coordinates to a CSR matrix"""
+    added = sparse.csr_matrix((np.array(values, dtype=np.float64), (rows, cols)), shape=(n_rows, columns))
+    if previous is None or previous.shape[0] == 0:
+        return added
+    return sparse.vstack([_grow(previous, columns), added], format='csr')
+
+
+def _rounded(scores: np.ndarray) -> np.ndarray:
+    """Scores in [0, 1] as percentages rounded like overall_score"""
+    return np.array([round(score * 100, 2) for score in scores.tolist()])
+
+
+def _concat(previous: Optional[np.ndarray], values: Sequence, dtype=np.float64) -> np.ndarray:
+    added = np.array(values, dtype=dtype)
+    return added if previous is None else np.concatenate([previous, added])
+
+
+class Vocabulary:
+    """Append-only mapping of keys to column numbers, shared by successive blocks"""
+
+    def __init__(self):
+        self.ids: Dict = {}
+        self.keys: List = []
+
+    def add(self, key) -> int:
+        column = self.ids.get(key)
+        if column is None:
+            column = self.ids[key] = len(self.keys)
+            self.keys.append(key)
+        return column
+
+    def __len__(self):
+        return len(self.keys)
+
+
+class CandidateBlock:
+    """Features of a list of candidates packed into columns, one row per candidate
+
+    Blocks are never modified: ``ScoringPipeline.extend`` returns a new block,
+    so a request can keep scoring the block it started with. Column numbers
+    come from the components' vocabularies, so a block is only scored by the
+    pipeline that packed it.
+    """
+
+    def __init__(self, ids: np.ndarray, profiles: List[Dict], skill_counts: np.ndarray, columns: Dict[str, Dict]):
+        self.ids = ids
+        self.profiles = profiles
+        self.skill_counts = skill_counts
+        self.columns = columns
+        self._rows = None
+
+    def __len__(self):
+        return len(self.profiles)
+
+    def rows_for(self, candidate_ids: Iterable[int]) -> np.ndarray:
+        """Rows of the given candidate ids, skipping unknown ids"""
+        if self._rows is None:
+            self._rows = {candidate_id: row for row, candidate_id in enumerate(self.ids.tolist())}
+        rows = self._rows
+        return np.array(sorted(rows[cid] for cid in candidate_ids if cid in rows), dtype=np.int64)
+
+    def take(self, rows: np.ndarray) -> 'CandidateBlock':
+        """A block of the given rows only, in that order, scored by the same pipeline"""
+        columns = {name: {key: values[rows] for key, values in features.items()}
+                   for name, features in self.columns.items()}
+        return CandidateBlock(self.ids[rows], [self.profiles[row] for row in rows.tolist()],
+                              self.skill_counts[rows], columns)
+
+
+class ScoringComponent(abc.ABC):
+    """One weighted term of the overall score
+
+    ``pack`` returns this component's columns for a block given the columns
+    of the block being extended (None for a new block) and the profiles of
+    the added candidates. ``score_many`` returns unrounded scores in [0, 1],
+    one per block row. A ``deferred`` component is taken as 1.0 when scores
+    are bounded for pruning and only scored for the rows that survive.
+    """
+
+    name = ''
+    deferred = False
+    candidate_keys: Tuple[str, ...] = ()
+    job_keys: Tuple[str, ...] = ()
+
+    def __init__(self, matcher):
+        self.matcher = matcher
+
+    def candidate_features(self, resume_data: Dict) -> Dict:
+        """Extra candidate profile entries, computed once per candidate"""
+        return {}
+
+    def job_features(self, job_data: Dict) -> Dict:
+        """Extra job profile entries, computed once per job"""
+        return {}
+
+    def weight(self, job_profile: Dict) -> float:
+        return job_profile['weights'].get(self.name, 0.0)
+
+    @abc.abstractmethod
+    def pack(self, previous: Optional[Dict], profiles: List[Dict]) -> Dict:
+        """Columns of a block holding ``previous`` rows followed by ``profiles``"""
+
+    @abc.abstractmethod
+    def score_many(self, job_profile: Dict, block: CandidateBlock) -> np.ndarray:
+        """Unrounded scores in [0, 1] of every block row"""
+
+
+class SkillsComponent(ScoringComponent):
+    """Required-skill coverage, as in JobMatcher._match_normalized_skills"""
+
+    name = 'skills'
+    candidate_keys = ('skills',)
+    job_keys = ('skills',)
+
+    def __init__(self, matcher):
+        super().__init__(matcher)
+        self.vocab = Vocabulary()
+        # Required skill -> partial-match flags over the vocabulary seen so far
+        self._partial: Dict[str, np.ndarray] = {}
+
+    def pack(self, previous, profiles):
+        rows, cols = [], []
+        for row, profile in enumerate(profiles):
+            for skill in set(profile['skills']):
+                rows.append(row)
+                cols.append(self.vocab.add(skill))
+        presence = _stack(previous and previous['presence'], rows, cols, [1.0] * len(rows),
+                          len(profiles), len(self.vocab))
+        return {'presence': presence}
+
+    def _partial_flags(self, jd_skill: str, columns: int) -> np.ndarray:
+        """Which vocabulary skills partially match a required skill"""
+        flags = self._partial.get(jd_skill)
+        if flags is None or len(flags) < columns:
+            known = 0 if flags is None else len(flags)
+            overlap = self.matcher._calculate_word_overlap
+            added = [jd_skill in skill or skill in jd_skill or overlap(jd_skill, skill) > 0.5
+                     for skill in self.vocab.keys[known:columns]]
+            flags = _concat(flags, added, dtype=bool)
+            self._partial[jd_skill] = flags
+        return flags[:columns]
+
+    def score_many(self, job_profile, block):
+        jd_skills = job_profile['skills']
+        if not jd_skills or not len(block):
+            return np.zeros(len(block))
+        presence = block.columns[self.name]['presence']
+        columns = presence.shape[1]
+        required = Counter(jd_skills)
+        counts = np.fromiter(required.values(), dtype=np.float64, count=len(required))
+
+        # Columns of each distinct required skill, then of the skills partially matching it
+        selectors = np.zeros((columns, 2 * len(required)))
+        for index, jd_skill in enumerate(required):
+            column = self.vocab.ids.get(jd_skill)
+            if column is not None and column < columns:
+                selectors[column, index] = 1.0
+            selectors[:, len(required) + index] = self._partial_flags(jd_skill, columns)
+        hits = np.asarray(presence @ selectors) > 0
+        exact = hits[:, :len(required)]
+        partial = ~exact & hits[:, len(required):]
+
+        # Counted per required skill occurrence, divided like the per-pair scorer
+        total = len(jd_skills)
+        exact_score = (exact @ counts) / total
+        partial_score = ((partial @ counts) * 0.5) / total
+        return np.minimum(1.0, exact_score + partial_score)
+
+
+class ExperienceComponent(ScoringComponent):
+    """Vectorized JobMatcher.calculate_experience_match"""
+
+    name = 'experience'
+    candidate_keys = ('experience_years',)
+    job_keys = ('required_experience',)
+
+    def pack(self, previous, profiles):
+        years = _concat(previous and previous['years'], [p['experience_years'] for p in profiles])
+        return {'years': years}
+
+    def score_many(self, job_profile, block):
+        years = block.columns[self.name]['years']
+        required = float(job_profile['required_experience'])
+        if required == 0:
+            return np.ones(len(block))
+        return np.select(
+            [years >= required, years >= required * 0.8, years >= required * 0.6, years >= required * 0.4],
+            [1.0, 0.9, 0.7, 0.5],
+            np.maximum(0.2, years / required)
+        )
+
+
+class SemanticComponent(ScoringComponent):
+    """Text similarity from term counts, for pair TF-IDF or a hashing engine"""
+
+    name = 'semantic'
+    deferred = True
+    candidate_keys = ('terms',)
+    job_keys = ('terms',)
+
+    def __init__(self, matcher):
+        super().__init__(matcher)
+        self.vocab = Vocabulary()
+        self._buckets = np.zeros(0, dtype=np.int64)
+
+    def pack(self, previous, profiles):
+        rows, cols, counts = [], [], []
+        for row, profile in enumerate(profiles):
+            for term, count in profile['terms'].items():
+                rows.append(row)
+                cols.append(self.vocab.add(term))
+                counts.append(count)
+        columns = len(self.vocab)
+        matrix = _stack(previous and previous['counts'], rows, cols, counts, len(profiles), columns)
+        presence = matrix.copy()
+        presence.data[:] = 1.0
+        return {
+            'counts': matrix,
+            'presence': presence,
+            'squares': matrix.multiply(matrix).tocsr(),
+            'n_terms': _concat(previous and previous['n_terms'], [len(p['terms']) for p in profiles]),
+            'total_sq': _concat(previous and previous['total_sq'],
+                                [sum(c * c for c in p['terms'].values()) for p in profiles])
+        }
+
+    def _job_vector(self, jd_terms: Dict, columns: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Columns and counts of the job's terms that occur in the block"""
+        ids = self.vocab.ids
+        known = [(ids[term], count) for term, count in jd_terms.items() if ids.get(term, columns) < columns]
+        cols = np.array([column for column, _ in known], dtype=np.int64)
+        values = np.array([count for _, count in known], dtype=np.float64)
+        return cols, values
+
+    def _hashed(self, job_profile, block, columns, cols, values) -> np.ndarray:
+        """IDF-weighted cosine, as in HashingSemantic.similarity"""
+        semantic = self.matcher.semantic
+        if len(self._buckets) < columns:
+            self._buckets = np.array(self.vocab.keys[:columns], dtype=np.int64)
+        idf_sq = semantic.idf[self._buckets[:columns]] ** 2
+        weighted = np.zeros(columns)
+        weighted[cols] = values * idf_sq[cols]
+        dot = block.columns[self.name]['counts'] @ weighted
+        resume_norm = np.sqrt(block.columns[self.name]['squares'] @ idf_sq)
+        jd_norm = semantic.norm(job_profile['terms'])
+        scores = np.zeros(len(block))
+        np.divide(dot, resume_norm * jd_norm, out=scores, where=dot > 0)
+        return scores
+
+    def score_many(self, job_profile, block):
+        jd_terms = job_profile['terms']
+        if not jd_terms or not len(block):
+            return np.zeros(len(block))
+        features = block.columns[self.name]
+        columns = features['counts'].shape[1]
+        cols, values = self._job_vector(jd_terms, columns)
+        if self.matcher.semantic is not None:
+            return self._hashed(job_profile, block, columns, cols, values)
+
+        jd_counts = np.zeros(columns)
+        jd_counts[cols] = values
+        jd_presence = (jd_counts > 0).astype(np.float64)
+        shared = features['presence'] @ jd_presence
+        dot = features['counts'] @ jd_counts
+        resume_shared_sq = features['squares'] @ jd_presence
+        jd_shared_sq = features['presence'] @ (jd_counts * jd_counts)
+        jd_total_sq = float(sum(c * c for c in jd_terms.values()))
+
+        unique_sq = PAIR_IDF_UNIQUE * PAIR_IDF_UNIQUE
+        resume_norm = np.sqrt(resume_shared_sq + unique_sq * (features['total_sq'] - resume_shared_sq))
+        jd_norm = np.sqrt(jd_shared_sq + unique_sq * (jd_total_sq - jd_shared_sq))
+        valid = (shared > 0) & (resume_norm > 0) & (jd_norm > 0)
+        scores = np.zeros(len(block))
+        scores[valid] = dot[valid] * PAIR_IDF_SHARED * PAIR_IDF_SHARED / (resume_norm[valid] * jd_norm[valid])
+
+        # Pairs over the vectorizer's max_features are trimmed first; score those one by one
+        max_features = self.matcher.tfidf_vectorizer.max_features
+        if max_features:
+            union = features['n_terms'] + len(jd_terms) - shared
+            for row in np.nonzero(valid & (union > max_features))[0].tolist():
+                scores[row] = self.matcher.semantic_similarity_from_terms(block.profiles[row]['terms'], jd_terms)
+        return scores
+
+
+class EducationComponent(ScoringComponent):
+    """Vectorized JobMatcher.score_education over distinct education texts"""
+
+    name = 'education'
+    deferred = True
+    candidate_keys = ('education_text', 'education_level')
+    job_keys = ('education_specs',)
+
+    def __init__(self, matcher):
+        super().__init__(matcher)
+        self.texts = Vocabulary()
+        # Requirement keyword -> whether it occurs in each distinct education text
+        self._hits: Dict[str, np.ndarray] = {}
+
+    def pack(self, previous, profiles):
+        return {
+            'codes': _concat(previous and previous['codes'],
+                             [self.texts.add(p['education_text']) for p in profiles], dtype=np.int64),
+            'levels': _concat(previous and previous['levels'], [p['education_level'] for p in profiles]),
+            'has_text': _concat(previous and previous['has_text'], [bool(p['education_text']) for p in profiles],
+                                dtype=bool)
+        }
+
+    def _keyword_hits(self, keyword: str, count: int) -> np.ndarray:
+        hits = self._hits.get(keyword)
+        if hits is None or len(hits) < count:
+            known = 0 if hits is None else len(hits)
+            hits = _concat(hits, [keyword in text for text in self.texts.keys[known:count]], dtype=bool)
+            self._hits[keyword] = hits
+        return hits
+
+    def score_many(self, job_profile, block):
+        specs = job_profile['education_specs']
+        if not specs:
+            return np.ones(len(block))
+        features = block.columns[self.name]
+        codes, levels = features['codes'], features['levels']
+        count = int(codes.max()) + 1 if len(codes) else 0
+
+        # Summed in requirement order, like the per-pair loop
+        matches = np.zeros(len(block))
+        for keywords, required_level in specs:
+            found = np.zeros(count, dtype=bool)
+            for keyword in keywords:
+                found |= self._keyword_hits(keyword, count)[:count]
+            credit = np.where(found[codes], 1.0,
+                              np.where((levels >= required_level) & (required_level > 0), 0.8, 0.0))
+            matches = matches + credit
+        scores = np.minimum(1.0, matches / len(specs))
+        return np.where(features['has_text'], scores, 0.3)
+
+
+BUILTIN_COMPONENTS = (SkillsComponent, SemanticComponent, ExperienceComponent, EducationComponent)
+
+
+class ScoringPipeline:
+    """Built-in components plus any extra ones, scoring whole candidate blocks
+
+    Profiles built here are the matcher's profiles plus every component's
+    extra features; pass the pipeline wherever a profile builder is taken
+    (``CandidateCache(..., pipeline=...)``) so they are computed at load.
+    """
+
+    def __init__(self, matcher, components: Sequence[ScoringComponent] = ()):
+        self.matcher = matcher
+        self.components = [component(matcher) for component in BUILTIN_COMPONENTS] + list(components)
+        self.extra = list(components)
+        names = [component.name for component in self.components]
+        if len(set(names)) != len(names):
+            raise ValueError(f'Duplicate scoring component names: {names}')
+
+    def build_candidate_profile(self, resume_data: Dict) -> Dict:
+        profile = self.matcher.build_candidate_profile(resume_data)
+        for component in self.extra:
+            profile.update(component.candidate_features(resume_data))
+        return profile
+
+    def build_job_profile(self, job_data: Dict) -> Dict:
+        profile = self.matcher.build_job_profile(job_data)
+        for component in self.extra:
+            profile.update(component.job_features(job_data))
+        return profile
+
+    def _check_keys(self, profile: Dict, job: bool):
+        for component in self.components:
+            missing = [key for key in (component.job_keys if job else component.candidate_keys)
+                       if key not in profile]
+            if missing:
+                kind = 'job' if job else 'candidate'
+                raise ValueError(f'{component.name} needs {kind} profile features {missing}')
+
+    def extend(self, block: Optional[CandidateBlock], candidates: Sequence[Tuple[int, Dict]]) -> CandidateBlock:
+        """A new block holding the rows of ``block`` followed by ``candidates``"""
+        ids = [candidate_id for candidate_id, _ in candidates]
+        profiles = [profile for _, profile in candidates]
+        if profiles:
+            self._check_keys(profiles[0], job=False)
+        previous = block.columns if block is not None else {}
+        columns = {component.name: component.pack(previous.get(component.name), profiles)
+                   for component in self.components}
+        return CandidateBlock(
+            _concat(block.ids if block is not None else None, ids, dtype=np.int64),
+            (block.profiles if block is not None else []) + profiles,
+            _concat(block.skill_counts if block is not None else None, [p['skill_count'] for p in profiles]),
+            columns
+        )
+
+    def _diversity(self, job_profile: Dict, block: CandidateBlock) -> np.ndarray:
+        required = job_profile['skill_count']
+        counts = block.skill_counts
+        return np.where(counts > required, np.minimum(0.05, counts / max(required, 1) - 1), 0.0)
+
+    def score_many(self, job_profile: Dict, block: CandidateBlock) -> Dict[str, np.ndarray]:
+        """Unrounded component scores and overall score of every block row"""
+        self._check_keys(job_profile, job=True)
+        self.matcher.refresh_semantic()
+        scores = {}
+        overall = np.zeros(len(block))
+        for component in self.components:
+            with metrics.timer(f'score_{component.name}'):
+                scores[component.name] = component.score_many(job_profile, block)
+            overall = overall + scores[component.name] * component.weight(job_profile)
+        scores['overall'] = np.minimum(1.0, overall + self._diversity(job_profile, block))
+        return scores
+
+    def bounds(self, job_profile: Dict, block: CandidateBlock) -> np.ndarray:
+        """Rounded upper bounds of the overall scores, with the deferred components taken as 1.0"""
+        self._check_keys(job_profile, job=True)
+        partial = self._diversity(job_profile, block)
+        ceiling = 0.0
+        for component in self.components:
+            if component.deferred:
+                ceiling += component.weight(job_profile)
+                continue
+            with metrics.timer(f'score_{component.name}'):
+                partial = partial + component.score_many(job_profile, block) * component.weight(job_profile)
+        # Rounded like overall_score; the epsilon absorbs float summation order
+        return _rounded(np.minimum(1.0, partial + ceiling + 1e-9))
+
+    def _score_rows(self, job_profile: Dict, block: CandidateBlock,
+                    rows: np.ndarray) -> Tuple[CandidateBlock, Dict[str, np.ndarray]]:
+        block = block.take(rows)
+        return block, self.score_many(job_profile, block)
+
+    def _score_top(self, job_profile: Dict, block: CandidateBlock,
+                   need: int) -> Tuple[CandidateBlock, Dict[str, np.ndarray]]:
+        """Fully score the rows that can rank among the first ``need``, best bounds first"""
+        bounds = self.bounds(job_profile, block)
+        order = np.lexsort((block.ids, -bounds))
+        first = order[:need]
+        top, scores = self._score_rows(job_profile, block, first)
+        if not need:
+            return top, scores
+
+        # The rest is pruned when its bound ranks below the need-th best score, ties by candidate id
+        overall = _rounded(scores['overall'])
+        worst = np.lexsort((top.ids, -overall))[need - 1]
+        floor, floor_id = overall[worst], top.ids[worst]
+        rest = order[need:]
+        rest = rest[(bounds[rest] > floor) | ((bounds[rest] == floor) & (block.ids[rest] < floor_id))]
+        if not len(rest):
+            return top, scores
+        _, more = self._score_rows(job_profile, block, rest)
+        return (block.take(np.concatenate([first, rest])),
+                {name: np.concatenate([scores[name], more[name]]) for name in scores})
+
+    def _result(self, job_profile: Dict, block: CandidateBlock, scores: Dict[str, np.ndarray], row: int) -> Dict:
+        match_result = self.matcher.score_profiles(block.profiles[row], job_profile)
+        if self.extra:
+            for component in self.extra:
+                match_result[f'{component.name}_score'] = round(float(scores[component.name][row]) * 100, 2)
+            match_result['overall_score'] = round(float(scores['overall'][row]) * 100, 2)
+        return match_result
+
+    def rank(self, job_profile: Dict, block: CandidateBlock, top_k: Optional[int] = None,
+             rows: Optional[np.ndarray] = None) -> List[Tuple[int, Dict]]:
+        """(candidate_id, match_result) for the best rows, best first (ties by candidate id)
+
+        ``rows`` restricts the ranking to some rows of the block; only those
+        are scored, and only the returned ones get the full breakdown.
+        """
+        return self.rank_page(job_profile, block, 0, top_k, rows)[1]
+
+    def rank_page(self, job_profile: Dict, block: CandidateBlock, offset: int = 0, limit: Optional[int] = None,
+                  rows: Optional[np.ndarray] = None,
+                  min_score: Optional[float] = None) -> Tuple[int, List[Tuple[int, Dict]], int]:
+        """(ranked count, ``limit`` results from position ``offset`` of the ranking, rows pruned)
+
+        Like ``rank``, but a page of the ranking and the number of rows in it,
+        counting only rows whose overall score reaches ``min_score``. Rows
+        whose bound cannot reach the page, or ``min_score``, are pruned
+        without scoring the deferred components.
+        """
+        if rows is not None and len(rows) < len(block):
+            block = block.take(rows)
+        if not len(block):
+            return 0, [], 0
+        need = None if limit is None else offset + max(limit, 0)
+        if min_score is not None:
+            # Every row that can reach min_score is scored, for the count
+            selected = np.nonzero(self.bounds(job_profile, block) >= min_score)[0]
+            scored, scores = self._score_rows(job_profile, block, selected)
+        elif need is not None and need < len(block):
+            scored, scores = self._score_top(job_profile, block, need)
+        else:
+            scored, scores = block, self.score_many(job_profile, block)
+        pruned = len(block) - len(scored)
+        self.matcher.scored_total += len(scored)
+        self.matcher.pruned_total += pruned
+
+        # Round like overall_score so ordering and ties agree with the full result
+        overall = _rounded(scores['overall'])
+        order = np.lexsort((scored.ids, -overall))
+        if min_score is not None:
+            order = order[overall[order] >= min_score]
+        total = len(block) if min_score is None else len(order)
+        page = order[offset:] if limit is None else order[offset:offset + max(limit, 0)]
+
+        ranked = [(int(scored.ids[row]), self._result(job_profile, scored, scores, row))
+                  for row in page.tolist()]
+        ranked.sort(key=lambda item: (-item[1]['overall_score'], item[0]))
+        return total, ranked, pruned
@@ -0,0 +1,376 @@
+"""
+Offline batch screener: rank a directory of resumes against job descriptions.
+
+Runs without Flask, straight on ResumeParser, SkillExtractor and JobMatcher:
+
+    python -m utils resumes/ data/processed_data.json --out screening/
+
+Resume files are discovered lazily and parsed in chunks by a process pool,
+with a bounded number of chunks in flight; each chunk goes through spaCy's
+nlp.pipe in one batch. Every finished file is appended to
+``results.jsonl`` in the output directory, which doubles as the checkpoint:
+an interrupted run started again with the same output directory skips files
+already recorded (unless they changed on disk). When all files are done,
+``ranked.csv`` is written with candidates ranked per job.
+"""
+import csv
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .extraction import worker_context
+
+SUPPORTED_EXTENSIONS = ('pdf', 'docx')
+
+RANKED_FIELDS = [
+    'job_id', 'job_title', 'rank', 'file', 'name', 'email', 'phone', 'location', 'experience_years',
+    'overall_score', 'skill_score', 'semantic_score', 'experience_score', 'education_score',
+    'matched_skills', 'missing_skills'
+]
+
+# Worker-side state, populated once per process by _init_worker
+_WORKER = {}
+
+
+def iter_resume_files(root: str) -> Iterator[str]:
+    """Yield supported resume files under root in a stable order, without listing everything first"""
+    for directory, subdirectories, files in os.walk(root):
+        subdirectories.sort()
+        for filename in sorted(files):
+            if '.' in filename and filename.rsplit('.', 1)[1].lower() in SUPPORTED_EXTENSIONS:
+                yield os.path.join(directory, filename)
+
+
+def _load_job_file(path: str) -> List[Dict]:
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        for key in ('job_descriptions', 'sample_job_descriptions', 'jobs'):
+            if key in data:
+                return list(data[key])
+        return [data]
+    return list(data)
+
+
+def load_jobs(paths: List[str]) -> List[Dict]:
+    """Read job descriptions from JSON files (one job, a list, or processed_data.json style)"""
+    jobs = []
+    for path in paths:
+        jobs.extend(_load_job_file(path))
+
+    extractor = None
+    for number, job in enumerate(jobs, 1):
+        if 'description' not in job:
+            raise ValueError(f"Job description {job.get('title', number)} has no description")
+        job.setdefault('id', number)
+        job.setdefault('title', f'Job {number}')
+        if not job.get('required_skills'):
+            # Same extraction as /upload_job_description; only loaded when needed
+            if extractor is None:
+                from .skill_extractor import SkillExtractor
+                extractor = SkillExtractor()
+            job['required_skills'] = [skill for skills in extractor.extract_all_skills(job['description']).values()
+                                      for skill in skills]
+    return jobs
+
+
+def _file_key(path: str) -> Tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _init_worker(jobs: List[Dict]):
+    from .extraction import ParseBudget
+    from .matcher import JobMatcher
+    from .resume_parser import ResumeParser
+    from .skill_extractor import SkillExtractor
+
+    matcher = JobMatcher()
+    # A pathological file costs one budget, not a stalled worker
+    _WORKER['parser'] = ResumeParser(budget=ParseBudget())
+    _WORKER['extractor'] = SkillExtractor()
+    _WORKER['matcher'] = matcher
+    _WORKER['jobs'] = [(job['id'], matcher.build_job_profile(job)) for job in jobs]
+
+
+def _score_parsed(parsed: Dict) -> Dict:
+    matcher = _WORKER['matcher']
+    profile = matcher.build_candidate_profile(parsed)
+
+    scores = []
+    for job_id, job_profile in _WORKER['jobs']:
+        result = matcher.score_profiles(profile, job_profile)
+        scores.append({
+            'job_id': job_id,
+            'overall_score': result['overall_score'],
+            'skill_score': round(result['skill_match']['score'] * 100, 2),
+            'semantic_score': result['semantic_score'],
+            'experience_score': result['experience_score'],
+            'education_score': result['education_score'],
+            'matched_skills': result['skill_match']['matched_skills'],
+            'missing_skills': result['skill_match']['missing_skills']
+        })
+
+    return {
+        'contact_info': parsed['contact_info'],
+        'experience_years': parsed['experience_years'],
+        'skills': parsed['skills'],
+        'education': parsed['education'],
+        'truncation_reasons': parsed['truncation_reasons'],
+        'scores': scores
+    }
+
+
+def _error_message(error: Exception) -> str:
+    return str(error) or error.__class__.__name__
+
+
+def screen_files(paths: List[str]) -> List[Dict]:
+    """Parse a chunk of resumes and score them against every job (runs in a worker)
+
+    The chunk goes through spaCy in batches; a file that fails gets an
+    ``error`` entry without affecting the rest of the chunk.
+    """
+    parser, extractor = _WORKER['parser'], _WORKER['extractor']
+
+    parsed_files = parser.parse_many((path, path.rsplit('.', 1)[1]) for path in paths)
+    texts = [parsed['raw_text'] for parsed in parsed_files if not isinstance(parsed, Exception)]
+    skills = iter(extractor.extract_all_skills_many(texts))
+
+    results = []
+    for parsed in parsed_files:
+        try:
+            if isinstance(parsed, Exception):
+                raise parsed
+            parsed['skills'] = next(skills)
+            if isinstance(parsed['skills'], Exception):
+                raise parsed['skills']
+            results.append(_score_parsed(parsed))
+        except Exception as e:
+            results.append({'error': _error_message(e)})
+    return results
+
+
+class Checkpoint:
+    """Append-only results.jsonl; each line records one finished file"""
+
+    def __init__(self, path: str, sync_every: int = 100):
+        self.path = path
+        self.sync_every = sync_every
+        self.done: Dict[str, Tuple[int, int]] = {}
+        self.failed = set()
+        self._pending = 0
+        self._load()
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        good_bytes = read_bytes = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                read_bytes += len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A damaged line only loses its own file, which is screened again
+                    continue
+                good_bytes = read_bytes
+                self.done[record['file']] = (record['size'], record['mtime_ns'])
+                if record.get('error'):
+                    self.failed.add(record['file'])
+                else:
+                    self.failed.discard(record['file'])
+        if good_bytes < read_bytes:
+            # A run killed mid-write leaves a partial last line; cut it so appends start on a new line
+            with open(self.path, 'r+b') as f:
+                f.truncate(good_bytes)
+
+    def is_done(self, file: str, key: Tuple[int, int], retry_errors: bool = False) -> bool:
+        if self.done.get(file) != key:
+            return False
+        return not (retry_errors and file in self.failed)
+
+    def record(self, record: Dict):
+        self._file.write(json.dumps(record) + '\n')
+        self._file.flush()
+        self._pending += 1
+        if self._pending >= self.sync_every:
+            os.fsync(self._file.fileno())
+            self._pending = 0
+
+    def close(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+
+
+def write_ranked_csv(results_path: str, csv_path: str, jobs: List[Dict], top: Optional[int] = None) -> int:
+    """Rank the latest result of every file per job and write them to a CSV file"""
+    latest = {}
+    with open(results_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            # Only the fields written to the CSV are kept in memory
+            record.pop('skills', None)
+            record.pop('education', None)
+            latest[record['file']] = record
+
+    per_job = {job['id']: [] for job in jobs}
+    for record in latest.values():
+        for score in record.get('scores', []):
+            if score['job_id'] in per_job:
+                per_job[score['job_id']].append((record, score))
+
+    rows = 0
+    tmp_path = csv_path + '.tmp'
+    with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=RANKED_FIELDS)
+        writer.writeheader()
+        for job in jobs:
+            ranked = sorted(per_job[job['id']], key=lambda item: (-item[1]['overall_score'], item[0]['file']))
+            for rank, (record, score) in enumerate(ranked[:top] if top else ranked, 1):
+                contact = record.get('contact_info') or {}
+                writer.writerow({
+                    'job_id': job['id'],
+                    'job_title': job['title'],
+                    'rank': rank,
+                    'file': record['file'],
+                    'name': os.path.splitext(os.path.basename(record['file']))[0],
+                    'email': contact.get('email'),
+                    'phone': contact.get('phone'),
+                    'location': contact.get('location'),
+                    'experience_years': record.get('experience_years'),
+                    'overall_score': score['overall_score'],
+                    'skill_score': score['skill_score'],
+                    'semantic_score': score['semantic_score'],
+                    'experience_score': score['experience_score'],
+                    'education_score': score['education_score'],
+                    'matched_skills': ', '.join(score['matched_skills']),
+                    'missing_skills': ', '.join(score['missing_skills'])
+                })
+                rows += 1
+    os.replace(tmp_path, csv_path)
+    return rows
+
+
+def run_screening(resume_dir: str, jobs: List[Dict], out_dir: str, workers: Optional[int] = None,
+                  retry_errors: bool = False, top: Optional[int] = None, log_every: int = 100,
+                  chunk_size: int = 16) -> Dict:
+    """Screen every resume under resume_dir, resuming from out_dir if it holds a checkpoint"""
+    os.makedirs(out_dir, exist_ok=True)
+    workers = max(1, workers or os.cpu_count() or 1)
+    # Enough queued chunks to keep every worker busy without holding the whole directory
+    max_in_flight = workers * 2
+
+    checkpoint = Checkpoint(os.path.join(out_dir, 'results.jsonl'))
+    stats = {'processed': 0, 'skipped': 0, 'failed': 0}
+    started = time.perf_counter()
+
+    def finish(path, key, result):
+        record = {'file': os.path.relpath(path, resume_dir), 'size': key[0], 'mtime_ns': key[1]}
+        record.update(result)
+        if record.get('error'):
+            stats['failed'] += 1
+        stats['processed'] += 1
+        checkpoint.record(record)
+        if log_every and stats['processed'] % log_every == 0:
+            rate = stats['processed'] / (time.perf_counter() - started)
+            print(f"{stats['processed']} resumes screened ({rate:.1f}/s), {stats['failed']} failed")
+
+    executor = _start_pool(workers, jobs)
+    in_flight = {}
+
+    def submit(chunk):
+        nonlocal executor
+        while len(in_flight) >= max_in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                executor = _collect(future, in_flight, finish, executor, workers, jobs)
+        in_flight[executor.submit(screen_files, [path for path, _ in chunk])] = chunk
+
+    try:
+        chunk = []
+        for path in iter_resume_files(resume_dir):
+            try:
+                key = _file_key(path)
+            except OSError:
+                continue
+            if checkpoint.is_done(os.path.relpath(path, resume_dir), key, retry_errors):
+                stats['skipped'] += 1
+                continue
+
+            chunk.append((path, key))
+            if len(chunk) >= chunk_size:
+                submit(chunk)
+                chunk = []
+        if chunk:
+            submit(chunk)
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                executor = _collect(future, in_flight, finish, executor, workers, jobs)
+    finally:
+        executor.shutdown()
+        checkpoint.close()
+
+    stats['seconds'] = round(time.perf_counter() - started, 2)
+    stats['ranked_rows'] = write_ranked_csv(checkpoint.path, os.path.join(out_dir, 'ranked.csv'), jobs, top)
+    return stats
+
+
+def _start_pool(workers: int, jobs: List[Dict]) -> ProcessPoolExecutor:
+    # Workers extract through their own fork server, which a forked worker could not start
+    return ProcessPoolExecutor(max_workers=workers, mp_context=worker_context(), initializer=_init_worker,
+                               initargs=(jobs,))
+
+
+def _collect(future, in_flight, finish, executor, workers, jobs):
+    """Record one finished chunk; replace the pool if a worker died (e.g. killed for memory)"""
+    chunk = in_flight.pop(future, None)
+    if chunk is None:
+        # Lost with a pool that broke earlier in the same batch of finished futures, already recorded
+        return executor
+    try:
+        results = future.result()
+    except BrokenProcessPool:
+        # Everything in flight was lost with the pool; record it so --retry-errors can redo it
+        for lost_chunk in [chunk] + list(in_flight.values()):
+            for path, key in lost_chunk:
+                finish(path, key, {'error': 'worker process died'})
+        in_flight.clear()
+        executor.shutdown(wait=False)
+        return _start_pool(workers, jobs)
+    except Exception as e:
+        results = [{'error': _error_message(e)}] * len(chunk)
+
+    for (path, key), result in zip(chunk, results):
+        finish(path, key, result)
+    return executor
+
+
+def main(argv=None):
+    """Screen a directory of resumes against job description JSON files"""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='python -m utils', description='Offline batch resume screener')
+    parser.add_argument('resume_dir', help='Directory searched recursively for PDF/DOCX resumes')
+    parser.add_argument('job_files', nargs='+', help='Job description JSON files')
+    parser.add_argument('--out', default='screening', help='Output directory (results.jsonl, ranked.csv)')
+    parser.add_argument('--workers', type=int, default=None, help='Parser processes (default: all CPUs)')
+    parser.add_argument('--top', type=int, default=None, help='Only write the best N candidates per job')
+    parser.add_argument('--retry-errors', action='store_true', help='Process files that failed before again')
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.resume_dir):
+        parser.error(f'{args.resume_dir} is not a directory')
+
+    jobs = load_jobs(args.job_files)
+    stats = run_screening(args.resume_dir, jobs, args.out, args.workers, args.retry_errors, args.top)
+    print(f"Screened {stats['processed']} resumes against {len(jobs)} jobs in {stats['seconds']}s "
+          f"({stats['skipped']} already done, {stats['failed']} failed)")
+    print(f"Ranked results: {os.path.join(args.out, 'ranked.csv')}")
@@ -0,0 +1,150 @@
+"""
+Full-text candidate search backed by SQLite FTS5.
+
+``candidates_fts`` indexes each candidate's name, skills (the skills JSON
+flattened to plain text, so category keys are not searchable) and resume
+text. Triggers on ``candidates`` keep it in sync, so searching never scans
+rows in Python and results are ranked with BM25.
+
+The index keeps its own copy of the text: FTS5 external content cannot read
+from a view that calls json_each, which the flattening needs.
+"""
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+
+from .filters import CandidateFilters
+
+# BM25 column weights for (name, skills, raw_text)
+BM25_WEIGHTS = (2.0, 4.0, 1.0)
+
+# Flattened skills of a candidates row aliased as `row`
+_SKILLS_TEXT = '''
+    (SELECT group_concat(skill.value, ', ')
+     FROM json_each(CASE WHEN json_valid({row}.skills) THEN {row}.skills END) AS category,
+          json_each(category.value) AS skill)
+'''
+
+SEARCH_SCHEMA = [
+    '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS candidates_fts USING fts5(
+        name, skills, raw_text,
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS candidates_fts_insert AFTER INSERT ON candidates
+    BEGIN
+        INSERT INTO candidates_fts (rowid, name, skills, raw_text)
+        VALUES (new.id, new.name, {new_skills}, new.raw_text);
+    END
+    '''.format(new_skills=_SKILLS_TEXT.format(row='new')),
+    '''
+    CREATE TRIGGER IF NOT EXISTS candidates_fts_delete AFTER DELETE ON candidates
+    BEGIN
+        DELETE FROM candidates_fts WHERE rowid = old.id;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS candidates_fts_update
+    AFTER UPDATE OF name, skills, raw_text ON candidates
+    BEGIN
+        DELETE FROM candidates_fts WHERE rowid = old.id;
+        INSERT INTO candidates_fts (rowid, name, skills, raw_text)
+        VALUES (new.id, new.name, {new_skills}, new.raw_text);
+    END
+    '''.format(new_skills=_SKILLS_TEXT.format(row='new'))
+]
+
+
+class SearchQueryError(ValueError):
+    """Raised when FTS5 cannot parse a search query"""
+
+
+def init_search_index(cursor):
+    """Create the FTS5 index and its triggers, backfilling existing candidates"""
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'candidates_fts'")
+    exists = cursor.fetchone() is not None
+
+    for statement in SEARCH_SCHEMA:
+        cursor.execute(statement)
+
+    if not exists:
+        cursor.execute('''
+            INSERT INTO candidates_fts (rowid, name, skills, raw_text)
+            SELECT id, name, {skills}, raw_text FROM candidates
+        '''.format(skills=_SKILLS_TEXT.format(row='candidates')))
+
+
+def _run(cursor, sql: str, params: Tuple):
+    try:
+        cursor.execute(sql, params)
+    except sqlite3.OperationalError as e:
+        # FTS5 reports query syntax errors as OperationalError
+        raise SearchQueryError(str(e))
+    return cursor.fetchall()
+
+
+def search_candidates(cursor, query: str, page: int = 1, per_page: int = 20,
+                      filters: Optional[CandidateFilters] = None) -> Tuple[int, List[Dict]]:
+    """Return (total hits, one page of BM25-ranked candidates with snippets)
+
+    ``query`` uses FTS5 syntax: keywords, "quoted phrases", AND/OR/NOT,
+    prefix* terms and column filters such as ``skills: docker``. With
+    ``filters`` only matching candidates are counted and ranked; an empty
+    query then lists every filtered candidate, newest first, unscored.
+    """
+    where, params = (filters or CandidateFilters()).where('c')
+    if not query:
+        total = _run(cursor, f'SELECT COUNT(*) FROM candidates c WHERE {where}', tuple(params))[0][0]
+        rows = _run(cursor, f'''
+            SELECT c.id, c.name, c.email, c.location, c.experience_years, NULL, NULL
+            FROM candidates c
+            WHERE {where}
+            ORDER BY c.id DESC
+            LIMIT ? OFFSET ?
+        ''', (*params, per_page, (page - 1) * per_page))
+    else:
+        total = _run(cursor, f'''
+            SELECT COUNT(*)
+            FROM candidates_fts
+            JOIN candidates c ON c.id = candidates_fts.rowid
+            WHERE candidates_fts MATCH ? AND {where}
+        ''', (query, *params))[0][0]
+        rows = _run(cursor, f'''
+            SELECT c.id, c.name, c.email, c.location, c.experience_years,
+                   bm25(candidates_fts, ?, ?, ?) AS rank,
+                   snippet(candidates_fts, -1, '<mark>', '</mark>', '…', 16) AS snippet
+            FROM candidates_fts
+            JOIN candidates c ON c.id = candidates_fts.rowid
+            WHERE candidates_fts MATCH ? AND {where}
+            ORDER BY rank
+            LIMIT ? OFFSET ?
+        ''', (*BM25_WEIGHTS, query, *params, per_page, (page - 1) * per_page))
+
+    hits = [{
+        'id': row[0],
+        'name': row[1],
+        'email': row[2],
+        'location': row[3],
+        'experience_years': row[4],
+        # bm25() is lower-is-better; flip it so larger means more relevant
+        'score': round(-row[5], 6) if row[5] is not None else None,
+        'snippet': row[6]
+    } for row in rows]
+
+    return total, hits
+
+
+def search_candidate_ids(cursor, query: str, limit: int = 1000,
+                         filters: Optional[CandidateFilters] = None) -> List[int]:
+    """Ids of the best `limit` candidates for a query, for use as a match pre-filter"""
+    where, params = (filters or CandidateFilters()).where('c')
+    rows = _run(cursor, f'''
+        SELECT candidates_fts.rowid
+        FROM candidates_fts
+        JOIN candidates c ON c.id = candidates_fts.rowid
+        WHERE candidates_fts MATCH ? AND {where}
+        ORDER BY bm25(candidates_fts, ?, ?, ?)
+        LIMIT ?
+    ''', (query, *params, *BM25_WEIGHTS, limit))
+    return [row[0] for row in rows]
@@ -0,0 +1,252 @@
+"""
+Fixed-memory semantic vectors built on feature hashing.
+
+The default semantic score fits TF-IDF on each resume/job pair, so its term
+dicts, the job index and the feature store vocabulary grow with every new
+word in the pool. ``HashingSemantic`` hashes the same analyzer terms
+(unigrams and bigrams, English stop words removed) into ``n_features``
+buckets instead: a document's vector depends only on its own text, so any
+process can vectorize any resume or job description, in any order, with no
+fitted vocabulary to share.
+
+Inverse document frequencies come from a per-bucket document-frequency table
+over the candidate pool. Ingest adds each new resume's buckets in the same
+transaction as its candidate row; the update is a sum, so concurrent writers
+need no coordination and nothing is ever refitted. Readers reload the table
+when the database changed. Memory is two arrays of ``n_features`` whatever
+the vocabulary size.
+"""
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+
+DEFAULT_FEATURES = 2 ** 18
+ENGINES = ('tfidf', 'hashing')
+
+SEMANTIC_DF_SCHEMA = [
+    'CREATE TABLE IF NOT EXISTS semantic_df (bucket INTEGER PRIMARY KEY, docs INTEGER NOT NULL)'
+]
+
+# Rows of semantic_df counting the documents added so far, the rebuilds, and the
+# terms added to documents that were counted before their text was known
+DOCS_BUCKET = -1
+REBUILDS_BUCKET = -2
+REVISIONS_BUCKET = -3
+
+DF_UPSERT = '''
+    INSERT INTO semantic_df (bucket, docs) VALUES (?, ?)
+    ON CONFLICT(bucket) DO UPDATE SET docs = docs + excluded.docs
+'''
+
+
+def build_semantic(engine: Optional[str] = None, db_path: Optional[str] = None,
+                   n_features: Optional[int] = None) -> Optional['HashingSemantic']:
+    """Semantic engine for JobMatcher(semantic=...); None keeps pair TF-IDF
+
+    Unset arguments come from the SEMANTIC_ENGINE and SEMANTIC_HASH_FEATURES
+    environment variables, so the app and the command line tools agree.
+    """
+    engine = engine or os.environ.get('SEMANTIC_ENGINE', 'tfidf')
+    if engine not in ENGINES:
+        raise ValueError(f'Unknown semantic engine {engine!r}; choose from {", ".join(ENGINES)}')
+    if engine == 'tfidf':
+        return None
+    n_features = n_features or int(os.environ.get('SEMANTIC_HASH_FEATURES', DEFAULT_FEATURES))
+    return HashingSemantic(n_features, db_path)
+
+
+def init_semantic_schema(cursor):
+    """Create the document-frequency table used by HashingSemantic"""
+    for statement in SEMANTIC_DF_SCHEMA:
+        cursor.execute(statement)
+
+
+def _read_counters(cursor) -> Dict[int, int]:
+    try:
+        cursor.execute('SELECT bucket, docs FROM semantic_df WHERE bucket < 0')
+    except sqlite3.OperationalError:
+        return {}
+    return dict(cursor.fetchall())
+
+
+def read_df_version(cursor) -> Tuple[int, int]:
+    """Return (documents counted, rebuilds) for the document-frequency table"""
+    counters = _read_counters(cursor)
+    return (counters.get(DOCS_BUCKET, 0), counters.get(REBUILDS_BUCKET, 0))
+
+
+class HashingSemantic:
+    """Hashed term counts plus an incrementally maintained document-frequency table
+
+    With a ``db_path`` the table lives in SQLite and ``refresh()`` reloads
+    it; without one, ``add_documents`` updates the in-memory table directly.
+    """
+
+    def __init__(self, n_features: int = DEFAULT_FEATURES, db_path: Optional[str] = None):
+        if n_features < 1:
+            raise ValueError('n_features must be positive')
+        self.n_features = n_features
+        self.db_path = db_path
+        self.vectorizer = HashingVectorizer(
+            n_features=n_features,
+            stop_words='english',
+            ngram_range=(1, 2),
+            lowercase=True,
+            strip_accents='unicode',
+            alternate_sign=False,
+            norm=None
+        )
+        self.doc_freq = np.zeros(n_features, dtype=np.int64)
+        self.docs = 0
+        self.version = (0, 0, 0)
+        self.idf = np.ones(n_features, dtype=np.float64)
+        self._data_version = None
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        """Identifies the vector space; vectors from different names do not mix"""
+        return f'hashing-{self.n_features}'
+
+    def config(self) -> Dict:
+        """Constructor arguments, so worker processes can build the same engine"""
+        return {'n_features': self.n_features, 'db_path': self.db_path}
+
+    def term_counts(self, cleaned_text: str) -> Dict[int, int]:
+        """Hashed term counts of one cleaned text, keyed by bucket"""
+        if not cleaned_text:
+            return {}
+        row = self.vectorizer.transform([cleaned_text])
+        return dict(zip(row.indices.tolist(), row.data.astype(np.int64).tolist()))
+
+    # ------------------------
+    # Document frequencies
+    # ------------------------
+    def _recompute_idf(self):
+        # Smoothed like TfidfVectorizer: ln((1 + n) / (1 + df)) + 1
+        self.idf = np.log((1.0 + self.docs) / (1.0 + self.doc_freq)) + 1.0
+
+    def add_documents(self, documents: Iterable[Dict[int, int]], cursor=None, counted: bool = False):
+        """Count the buckets of new documents
+
+        With a cursor the counts are written to semantic_df as part of the
+        caller's transaction and become visible on the next ``refresh()``.
+        ``counted`` documents are already in the document count (they were
+        added before their text was known), so only their buckets are added.
+        """
+        totals: Dict[int, int] = {}
+        added = 0
+        for terms in documents:
+            added += 1
+            for bucket in terms:
+                totals[bucket] = totals.get(bucket, 0) + 1
+        if not added:
+            return
+
+        if cursor is not None:
+            counter = REVISIONS_BUCKET if counted else DOCS_BUCKET
+            cursor.executemany(DF_UPSERT, [(counter, added)] + list(totals.items()))
+            return
+        with self._lock:
+            if totals:
+                np.add.at(self.doc_freq, np.fromiter(totals.keys(), dtype=np.int64),
+                          np.fromiter(totals.values(), dtype=np.int64))
+            if not counted:
+                self.docs += added
+            self._recompute_idf()
+
+    def rebuild(self, cursor, documents: Iterable[Dict[int, int]]):
+        """Replace the stored table with the counts of ``documents``"""
+        rebuilds = read_df_version(cursor)[1]
+        cursor.execute('DELETE FROM semantic_df')
+        cursor.execute(DF_UPSERT, (REBUILDS_BUCKET, rebuilds + 1))
+        self.add_documents(documents, cursor)
+
+    def _connection(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        return self._conn
+
+    def refresh(self):
+        """Reload the document frequencies if the database changed"""
+        if self.db_path is None:
+            return
+        with self._lock:
+            cursor = self._connection().cursor()
+            cursor.execute('PRAGMA data_version')
+            data_version = cursor.fetchone()[0]
+            if data_version == self._data_version:
+                return
+            self._data_version = data_version
+
+            # Only new or revised documents or a rebuild change the counts; match writes do not
+            counters = _read_counters(cursor)
+            version = tuple(counters.get(bucket, 0) for bucket in (DOCS_BUCKET, REBUILDS_BUCKET, REVISIONS_BUCKET))
+            if version == self.version:
+                return
+            doc_freq = np.zeros(self.n_features, dtype=np.int64)
+            cursor.execute('SELECT bucket, docs FROM semantic_df WHERE bucket >= 0 AND bucket < ?',
+                           (self.n_features,))
+            rows = cursor.fetchall()
+            if rows:
+                buckets, counts = zip(*rows)
+                doc_freq[list(buckets)] = counts
+            self.doc_freq, self.docs, self.version = doc_freq, version[0], version
+            self._recompute_idf()
+
+    # ------------------------
+    # Similarity
+    # ------------------------
+    def norm(self, terms: Dict[int, int]) -> float:
+        """Length of the IDF-weighted vector of a document"""
+        if not terms:
+            return 0.0
+        buckets = np.fromiter(terms.keys(), dtype=np.int64, count=len(terms))
+        counts = np.fromiter(terms.values(), dtype=np.float64, count=len(terms))
+        return float(np.sqrt(np.sum((counts * self.idf[buckets]) ** 2)))
+
+    def similarity(self, resume_terms: Dict[int, int], jd_terms: Dict[int, int]) -> float:
+        """Cosine of the IDF-weighted hashed vectors of two documents"""
+        if not resume_terms or not jd_terms:
+            return 0.0
+        if len(resume_terms) > len(jd_terms):
+            resume_terms, jd_terms = jd_terms, resume_terms
+        idf = self.idf
+        dot = 0.0
+        for bucket, count in resume_terms.items():
+            other = jd_terms.get(bucket)
+            if other is not None:
+                weight = idf[bucket]
+                dot += count * other * weight * weight
+        if not dot:
+            return 0.0
+        return float(dot / (self.norm(resume_terms) * self.norm(jd_terms)))
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def rebuild_document_frequencies(db_path: str, matcher) -> int:
+    """Recount semantic_df from every candidate's resume text; returns the documents counted
+
+    For databases that held candidates before the hashing engine was
+    enabled, or after candidates were deleted.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.cursor()
+        init_semantic_schema(cursor)
+        texts = cursor.execute('SELECT raw_text FROM candidates ORDER BY id').fetchall()
+        matcher.semantic.rebuild(cursor, (matcher.build_term_counts(text or '') for text, in texts))
+        conn.commit()
+        return len(texts)
+    finally:
+        conn.close()
@@ -0,0 +1,221 @@
+"""
+Single-flight coalescing of identical concurrent requests.
+
+``FlightGroup.run(key, compute)`` runs ``compute`` once per key however many
+callers ask at the same time:
+
+- threads of one process wait on the first caller's flight and get its
+  result (or its exception)
+- processes sharing a database take a lease row in ``match_flights``. The
+  others join it once, by counting themselves in its ``waiters`` column,
+  then poll the row with plain reads; only joining and claiming a missing
+  or expired lease take the write lock. A leader with waiters stores its
+  JSON result for them, one without only marks the flight finished. A
+  leader that fails drops its lease and a waiting process takes over; one
+  that dies is replaced when the lease expires.
+
+Stored results stay readable for ``result_ttl`` seconds, so requests
+arriving just after a shared computation finished get it too. Keys must
+change whenever the result would (e.g. include the pool and scorer
+versions).
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Optional, Tuple
+
+FLIGHT_SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS match_flights (
+        key TEXT PRIMARY KEY,
+        owner TEXT NOT NULL,
+        expires_at REAL NOT NULL,
+        result TEXT,
+        finished_at REAL,
+        waiters INTEGER NOT NULL DEFAULT 0
+    )
+    '''
+]
+
+
+def init_flight_schema(cursor):
+    """Create the lease table used to coalesce requests across processes"""
+    for statement in FLIGHT_SCHEMA:
+        cursor.execute(statement)
+    cursor.execute('PRAGMA table_info(match_flights)')
+    if 'waiters' not in [row[1] for row in cursor.fetchall()]:
+        cursor.execute('ALTER TABLE match_flights ADD COLUMN waiters INTEGER NOT NULL DEFAULT 0')
+
+
+class _Flight:
+    __slots__ = ('done', 'result', 'shared', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.shared = False
+        self.error = None
+
+
+class FlightGroup:
+    """In-flight deduplication by key, in this process and across processes sharing ``db_path``"""
+
+    def __init__(self, db_path: Optional[str] = None, lease_seconds: float = 60.0, result_ttl: float = 5.0,
+                 poll_interval: float = 0.05):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+        self.owner = f'{os.getpid()}-{uuid.uuid4().hex[:8]}'
+        # Calls answered with another call's result since startup
+        self.coalesced_total = 0
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def run(self, key: str, compute: Callable[[], Dict]) -> Tuple[Dict, bool]:
+        """Return (result, shared); ``shared`` is True when another call computed it
+
+        With a database the result must be JSON-serializable. Shared results
+        are the same object for every thread of a process: do not modify them.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            self.coalesced_total += 1
+            return flight.result, True
+
+        try:
+            flight.result, flight.shared = self._run_leased(key, compute)
+            if flight.shared:
+                self.coalesced_total += 1
+            return flight.result, flight.shared
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    # ------------------------
+    # Cross-process lease
+    # ------------------------
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _check(self, cursor, key: str, now: float) -> Optional[Tuple[str, str]]:
+        """('done', result JSON), ('wait', lease owner), or None when the lease can be claimed"""
+        cursor.execute('SELECT owner, expires_at, result, finished_at FROM match_flights WHERE key = ?', (key,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        owner, expires_at, result, finished_at = row
+        if result is not None and finished_at >= now - self.result_ttl:
+            return 'done', result
+        if finished_at is None and expires_at >= now and owner != self.owner:
+            return 'wait', owner
+        return None
+
+    def _join(self, cursor, key: str, owner: str, joined: Optional[str]) -> Optional[str]:
+        """Count this caller as a waiter of ``owner``'s lease, once per lease; the owner joined"""
+        if owner == joined:
+            return joined
+        cursor.execute('UPDATE match_flights SET waiters = waiters + 1 '
+                       'WHERE key = ? AND owner = ? AND finished_at IS NULL', (key, owner))
+        return owner if cursor.rowcount else joined
+
+    def _acquire(self, key: str, joined: Optional[str] = None) -> Tuple[str, Optional[str]]:
+        """('lead', None), ('done', result JSON) or ('wait', owner of the lease joined)
+
+        ``joined`` is the owner whose lease this caller already waits on.
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            # Polling a live lease only reads; the write lock is for joining or claiming it
+            state = self._check(cursor, key, now)
+            if state is not None:
+                if state[0] == 'done':
+                    return state
+                joined = self._join(cursor, key, state[1], joined)
+                conn.commit()
+                return 'wait', joined
+
+            cursor.execute('BEGIN IMMEDIATE')
+            state = self._check(cursor, key, now)
+            if state is not None:
+                if state[0] == 'done':
+                    conn.rollback()
+                    return state
+                joined = self._join(cursor, key, state[1], joined)
+                conn.commit()
+                return 'wait', joined
+
+            # Drop finished and abandoned flights of other keys while holding the write lock
+            cursor.execute('DELETE FROM match_flights WHERE finished_at < ? OR (result IS NULL AND expires_at < ?)',
+                           (now - self.result_ttl, now))
+            cursor.execute('''
+                INSERT OR REPLACE INTO match_flights (key, owner, expires_at, result, finished_at, waiters)
+                VALUES (?, ?, ?, NULL, NULL, 0)
+            ''', (key, self.owner, now + self.lease_seconds))
+            conn.commit()
+            return 'lead', None
+        finally:
+            conn.close()
+
+    def _complete(self, key: str, result: Dict):
+        """Mark the flight finished, storing the result only when another process waits for it"""
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            finished_at = time.time()
+            # Waiters only join unfinished flights, so none can arrive after this marker
+            cursor.execute('UPDATE match_flights SET finished_at = ? WHERE key = ? AND owner = ? AND waiters = 0',
+                           (finished_at, key, self.owner))
+            if not cursor.rowcount:
+                cursor.execute('UPDATE match_flights SET result = ?, finished_at = ? WHERE key = ? AND owner = ?',
+                               (json.dumps(result), finished_at, key, self.owner))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _release(self, key: str):
+        """Give the lease up so a waiting process computes instead"""
+        conn = self._connect()
+        try:
+            conn.execute('DELETE FROM match_flights WHERE key = ? AND owner = ?', (key, self.owner))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _run_leased(self, key: str, compute: Callable[[], Dict]) -> Tuple[Dict, bool]:
+        if self.db_path is None:
+            return compute(), False
+        joined = None
+        while True:
+            state, stored = self._acquire(key, joined)
+            if state == 'done':
+                return json.loads(stored), True
+            if state == 'wait':
+                joined = stored
+                time.sleep(self.poll_interval)
+                continue
+
+            try:
+                result = compute()
+            except BaseException:
+                self._release(key)
+                raise
+            self._complete(key, result)
+            return result, False
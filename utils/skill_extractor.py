@@ -1,10 +1,15 @@
+import hashlib
+import json
 import spacy
 import re
-from typing import List, Dict
+from typing import Dict, Iterable, List, Union
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
 
+from . import metrics
+from .nlp_batch import DEFAULT_BATCH_SIZE, pipe_docs
+
 class SkillExtractor:
     def __init__(self):
         try:
@@ -68,6 +73,11 @@ class SkillExtractor:
         for category in self.tech_skills.values():
             self.all_skills.extend(category)
     
+    def taxonomy_version(self) -> str:
+        """Fingerprint of tech_skills; skills extracted under another fingerprint are stale"""
+        taxonomy = json.dumps(self.tech_skills, sort_keys=True)
+        return hashlib.sha1(taxonomy.encode('utf-8')).hexdigest()[:12]
+    
     def extract_skills_keyword_matching(self, text: str) -> List[str]:
         """Extract skills using keyword matching with fuzzy matching"""
         text_lower = text.lower()
@@ -85,9 +95,11 @@ class SkillExtractor:
         
         return list(set(found_skills))  # Remove duplicates
     
-    def extract_skills_ner(self, text: str) -> List[str]:
+    def extract_skills_ner(self, text: str, doc=None) -> List[str]:
         """Extract skills using Named Entity Recognition"""
-        doc = self.nlp(text)
+        if doc is None:
+            with metrics.timer('spacy'):
+                doc = self.nlp(text)
         
         # Look for organizations and products (often tech companies/tools)
         tech_entities = []
@@ -163,13 +175,17 @@ class SkillExtractor:
             print(f"Error in semantic similarity calculation: {e}")
             return 0.0
     
-    def extract_all_skills(self, text: str) -> Dict[str, List[str]]:
+    def extract_all_skills(self, text: str, doc=None) -> Dict[str, List[str]]:
         """Combine all skill extraction methods"""
         # Apply different extraction methods
-        keyword_skills = self.extract_skills_keyword_matching(text)
-        ner_skills = self.extract_skills_ner(text)
-        context_skills = self.extract_skills_context(text)
-        section_skills = self.extract_skills_section_based(text)
+        with metrics.timer('skills_keyword'):
+            keyword_skills = self.extract_skills_keyword_matching(text)
+        with metrics.timer('skills_ner'):
+            ner_skills = self.extract_skills_ner(text, doc)
+        with metrics.timer('skills_context'):
+            context_skills = self.extract_skills_context(text)
+        with metrics.timer('skills_section'):
+            section_skills = self.extract_skills_section_based(text)
         
         # Combine and deduplicate
         all_extracted_skills = list(set(
@@ -193,6 +209,23 @@ class SkillExtractor:
         
         return categorized_skills
     
+    def extract_all_skills_many(self, texts: Iterable[str], batch_size: int = DEFAULT_BATCH_SIZE,
+                                n_process: int = 1) -> List[Union[Dict[str, List[str]], Exception]]:
+        """Extract skills from many texts, running NER through nlp.pipe
+        
+        Results are in input order; a text that fails yields its exception.
+        """
+        texts = list(texts)
+        results = []
+        for text, doc in zip(texts, pipe_docs(self.nlp, texts, batch_size, n_process)):
+            try:
+                if isinstance(doc, Exception):
+                    raise doc
+                results.append(self.extract_all_skills(text, doc))
+            except Exception as e:
+                results.append(e)
+        return results
+    
     def get_skill_suggestions(self, extracted_skills: List[str], job_requirements: List[str]) -> List[str]:
         """Suggest additional skills based on job requirements"""
         missing_skills = []
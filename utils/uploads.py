@@ -0,0 +1,199 @@
+"""
+Streaming multipart upload handling for resume files.
+
+The request body is fed through Werkzeug's sans-IO multipart decoder in
+fixed-size chunks, so only one chunk is held in memory at a time. The file
+part is written to a temporary file next to its final location while its
+SHA-256 is computed, and its real type is sniffed from the first bytes
+(PDF/DOCX magic numbers) so a mislabeled or oversized file is rejected
+before the rest of it is read. Accepted files are renamed into place
+atomically.
+"""
+import hashlib
+import os
+import tempfile
+import zipfile
+from datetime import datetime
+from typing import Dict, Optional
+
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.sansio.multipart import Data, Epilogue, Field, File, MultipartDecoder, NeedData
+from werkzeug.utils import secure_filename
+
+CHUNK_SIZE = 64 * 1024
+
+# Bytes needed to tell the supported formats apart
+SNIFF_BYTES = 1024
+
+# Form fields other than the file are tiny (e.g. the candidate name)
+MAX_FIELD_BYTES = 4096
+
+
+class UploadRejected(ValueError):
+    """Raised when an upload is malformed, too large or not a supported document"""
+
+
+def sniff_file_type(head: bytes) -> Optional[str]:
+    """Detect PDF or DOCX from the first bytes of a file"""
+    # Readers accept a PDF header anywhere in the first 1024 bytes
+    if b'%PDF-' in head[:SNIFF_BYTES]:
+        return 'pdf'
+    if head.startswith(b'PK\x03\x04'):
+        # DOCX is a ZIP package; the first entry name sits after the 30-byte local header
+        name_length = int.from_bytes(head[26:28], 'little')
+        first_entry = head[30:30 + name_length]
+        if first_entry in (b'[Content_Types].xml', b'_rels/.rels') or first_entry.startswith((b'word/', b'docProps/')):
+            return 'docx'
+    return None
+
+
+def _is_docx_package(path: str) -> bool:
+    try:
+        with zipfile.ZipFile(path) as package:
+            return 'word/document.xml' in package.namelist()
+    except zipfile.BadZipFile:
+        return False
+
+
+class StreamedUpload:
+    """A received file: where it was stored, its content hash and sniffed type"""
+
+    def __init__(self, path: str, original_filename: str, file_type: str, content_hash: str,
+                 size: int, form: Dict[str, str]):
+        self.path = path
+        self.original_filename = original_filename
+        self.file_type = file_type
+        self.content_hash = content_hash
+        self.size = size
+        self.form = form
+
+    def discard(self):
+        """Remove the stored file, e.g. when it turns out to be a duplicate"""
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class _FilePart:
+    """Writes one file part to a temporary file, sniffing and hashing as it goes"""
+
+    def __init__(self, dest_dir: str, filename: str, allowed_types, max_bytes: Optional[int]):
+        self.filename = filename
+        self.allowed_types = allowed_types
+        self.max_bytes = max_bytes
+        self.hash = hashlib.sha256()
+        self.size = 0
+        self.file_type = None
+        self.head = b''
+        fd, self.tmp_path = tempfile.mkstemp(prefix='.upload-', dir=dest_dir)
+        self.file = os.fdopen(fd, 'wb')
+
+    def write(self, data: bytes, more_data: bool):
+        self.size += len(data)
+        if self.max_bytes is not None and self.size > self.max_bytes:
+            raise UploadRejected('File is too large')
+
+        if self.file_type is None:
+            self.head += data
+            if len(self.head) < SNIFF_BYTES and more_data:
+                return
+            self.file_type = sniff_file_type(self.head)
+            if self.file_type not in self.allowed_types:
+                raise UploadRejected('File is not a PDF or DOCX document')
+            data, self.head = self.head, b''
+
+        self.hash.update(data)
+        self.file.write(data)
+
+    def finish(self):
+        if self.file_type is None:
+            # Whole file was shorter than the sniffing window
+            self.write(b'', more_data=False)
+        self.file.close()
+
+    def abort(self):
+        self.file.close()
+        try:
+            os.remove(self.tmp_path)
+        except OSError:
+            pass
+
+
+def receive_upload(stream, boundary: str, dest_dir: str, field_name: str = 'resume',
+                   allowed_types=('pdf', 'docx'), max_bytes: Optional[int] = None,
+                   chunk_size: int = CHUNK_SIZE) -> StreamedUpload:
+    """Stream a multipart/form-data body to disk and return the stored file
+
+    Raises UploadRejected for a missing or unsupported file; nothing is left
+    in ``dest_dir`` in that case.
+    """
+    if not boundary:
+        raise UploadRejected('Request is not multipart/form-data')
+    os.makedirs(dest_dir, exist_ok=True)
+
+    # Events are drained after every chunk, so the decoder never buffers more than a chunk
+    decoder = MultipartDecoder(boundary.encode('latin-1'))
+    form: Dict[str, str] = {}
+    field, field_data, part, finished = None, b'', None, None
+
+    try:
+        while True:
+            chunk = stream.read(chunk_size)
+            decoder.receive_data(chunk or None)
+
+            event = decoder.next_event()
+            while not isinstance(event, (NeedData, Epilogue)):
+                if isinstance(event, File):
+                    # Only the first file part with the expected name is stored
+                    field = None
+                    if event.name == field_name and part is None and finished is None:
+                        part = _FilePart(dest_dir, event.filename, allowed_types, max_bytes)
+                elif isinstance(event, Field):
+                    field, field_data = event.name, b''
+                elif isinstance(event, Data):
+                    if part is not None:
+                        part.write(event.data, event.more_data)
+                        if not event.more_data:
+                            part.finish()
+                            finished, part = part, None
+                    elif field is not None:
+                        field_data += event.data
+                        if len(field_data) > MAX_FIELD_BYTES:
+                            raise UploadRejected(f'Form field {field} is too large')
+                        if not event.more_data:
+                            form[field] = field_data.decode('utf-8', 'replace')
+                            field = None
+                event = decoder.next_event()
+
+            if isinstance(event, Epilogue) or not chunk:
+                break
+
+        if part is not None:
+            raise UploadRejected('Upload ended unexpectedly')
+        if finished is None:
+            raise UploadRejected('No file uploaded')
+    except Exception as e:
+        for unfinished in (part, finished):
+            if unfinished is not None:
+                unfinished.abort()
+        if isinstance(e, UploadRejected):
+            raise
+        if isinstance(e, RequestEntityTooLarge):
+            # The request stream itself enforces MAX_CONTENT_LENGTH
+            raise UploadRejected('File is too large')
+        raise UploadRejected(f'Malformed upload: {e}')
+
+    if finished.file_type == 'docx' and not _is_docx_package(finished.tmp_path):
+        finished.abort()
+        raise UploadRejected('File is not a PDF or DOCX document')
+
+    # The extension follows the sniffed type, not the client's filename; the hash
+    # prefix keeps two different uploads in the same second from replacing each other
+    content_hash = finished.hash.hexdigest()
+    stem = secure_filename(os.path.splitext(finished.filename or '')[0]) or 'resume'
+    filename = f"{datetime.now().strftime('%Y%m%d_%H%M%S_')}{stem}_{content_hash[:8]}.{finished.file_type}"
+    path = os.path.join(dest_dir, filename)
+    os.replace(finished.tmp_path, path)
+
+    return StreamedUpload(path, finished.filename, finished.file_type, content_hash, finished.size, form)